@@ -0,0 +1,111 @@
+"""Frame to show the airline overview tab of Flight within USA displayer"""
+import tkinter as tk
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+import matplotlib
+import charts
+from instrumentation import instrumentation
+from model import FlightDataModel
+from search_tabs import CheckBoxFrame, ComboboxFrame
+matplotlib.use("TkAgg")
+
+class AirlineOverviewTab(tk.Frame):
+    """
+    A frame that show the weekly average delays or on-time share of every airline
+    as a grid of small line graphs in one figure, under the selected filter.
+    """
+    METRICS = FlightDataModel.AIRLINE_METRICS
+
+    def __init__(self, parent, controller, **kwargs) -> None:
+        super().__init__(parent, **kwargs)
+        self.controller = controller
+        self.__data = None
+        self.graph: AirlineOverviewGraphFrame
+        self.init_components()
+        self.bind("<Map>", self.handle_map)
+
+    def init_components(self):
+        """
+        Create an AirlineOverviewGraphFrame and a frame consisted of a combobox,
+        checkboxes and a button to plot the graphs.
+        """
+        option_frame = tk.Frame(self)
+        self.metric = ComboboxFrame(option_frame, "Statistic:", self.METRICS)
+        self.metric.bind_cb(self.handle_metric)
+        self.checkboxes = CheckBoxFrame(option_frame)
+        show_button = tk.Button(option_frame, text="Show Airlines",
+                                command=lambda x=1: self.after(x, self.show_airlines))
+        self.metric.pack(side="top")
+        self.checkboxes.pack(side="top")
+        show_button.pack(side="top", pady=10)
+        option_frame.pack(side="right", padx=10)
+        self.graph = AirlineOverviewGraphFrame(self)
+        self.graph.pack(side="left", fill="both", expand=True)
+
+    def handle_map(self, event=None):
+        """
+        Event handler for the tab being shown, plot the graphs the first time so
+        they are only computed when the tab is used
+        """
+        if self.__data is None:
+            self.after(1, self.show_airlines)
+
+    def handle_metric(self, event=None):
+        """
+        Event handler for selecting a statistic, plot the data already received
+        """
+        if self.__data is not None:
+            instrumentation.begin("Airline Overview statistic")
+            self.plot_selected()
+            instrumentation.end()
+
+    def show_airlines(self):
+        """
+        Get the weekly statistics of every airline under the selected filter from the
+        controller and plot the selected statistic
+        """
+        instrumentation.begin("Show Airlines")
+        self.__data = self.controller.airline_weekly_data(self.checkboxes.week_var,
+                                                          self.checkboxes.time_blk_var)
+        self.plot_selected()
+        instrumentation.end()
+
+    def plot_selected(self):
+        """
+        Plot the selected statistic of the data received
+        """
+        metric = self.metric.cb_val
+        if metric not in self.__data:
+            metric = self.METRICS[0]
+        self.graph.plot_small_multiples(self.__data[metric], metric)
+
+class AirlineOverviewGraphFrame(tk.Frame):
+    """
+    A Frame that show a small line graph of every airline
+    """
+    def __init__(self, parent, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.canvas : FigureCanvasTkAgg
+        self.init_components()
+
+    def init_components(self):
+        """
+        Create a figure, a canvas, and a toolbar
+        """
+        fig = Figure(dpi=85)
+        self.canvas = FigureCanvasTkAgg(fig, self)
+        toolbar = NavigationToolbar2Tk(self.canvas, self)
+        toolbar.update()
+        self.canvas.get_tk_widget().pack(side="top", fill="both", expand=True)
+
+    def plot_small_multiples(self, data, metric: str):
+        """
+        Plot the weekly statistic of every airline
+        : param data : a dataframe of the statistic with airlines as rows and weeks as
+                       columns
+        : param metric : the name of the statistic
+        """
+        with instrumentation.stage("plot"):
+            charts.plot_small_multiples(self.canvas.figure, data, metric)
+        with instrumentation.stage("canvas draw"):
+            self.canvas.draw()
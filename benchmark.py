@@ -0,0 +1,207 @@
+"""Time the model on synthetic datasets of several scales and save the results as JSON"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from synthetic import SyntheticFlights
+try:
+    import resource
+except ImportError:
+    # Not available on Windows, the peak memory is then left out
+    resource = None
+
+KINDS = {"flight": ["ORIGIN", "DEST"], "airport": ["ORIGIN"],
+         "airline": ["OP_CARRIER_AIRLINE_ID"]}
+ALL_SELECTED = [True] * 5
+# Weeks of a filtered leaderboard, which cannot use the totals of every flight
+SOME_WEEKS = [True, False, True, True, True]
+
+def measure(func, repeat: int) -> dict:
+    """
+    Call func repeat times and return the fastest and median time in milliseconds
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - start) * 1000)
+    return {"min_ms": round(min(times), 3), "median_ms": round(float(np.median(times)), 3),
+            "runs": repeat}
+
+def peak_memory_mb():
+    """
+    Return the peak resident memory of the process in MB, None if it is unknown
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, kilobytes elsewhere
+    return round(peak / (1024 ** 2 if sys.platform == "darwin" else 1024), 1)
+
+def busiest_filter(df: pd.DataFrame, kind: str) -> list[str]:
+    """
+    Return the filter of the route, airport or airline with the most flights
+    """
+    key = df.groupby(KINDS[kind]).size().idxmax()
+    if kind == "flight":
+        return list(key)
+    return [str(key)]
+
+def busiest_filters(model) -> list[list[str]]:
+    """
+    Return the filters of the route, airport and airline with the most flights, counted
+    in the flights of the memory backend or queried from the database of SQLite, which
+    keeps no flights in memory
+    """
+    if model.df is not None:
+        return [busiest_filter(model.df, kind) for kind in KINDS]
+    return [filt for _, filt in model.popular_filters(1)]
+
+def flight_count(model) -> int:
+    """
+    Return the number of flights of the model
+    """
+    if model.df is not None:
+        return len(model.df)
+    return int(model.states[2].group_totals(ALL_SELECTED, ALL_SELECTED)["FLIGHTS"].sum())
+
+def run_scale(folder: str, backend: str, repeat: int) -> dict:
+    """
+    Load the datasets in folder/datasets and time every stage of the model, run in its
+    own process so the peak memory is the one of this scale
+    """
+    os.chdir(folder)
+    # Imported here so the worker process starts with the working directory set
+    from model import FlightDataModel
+    from controller import Controller
+    timings = {}
+    start = time.perf_counter()
+    model = FlightDataModel(backend)
+    elapsed = round((time.perf_counter() - start) * 1000, 3)
+    timings["model_init"] = {"min_ms": elapsed, "median_ms": elapsed, "runs": 1}
+    for index, (kind, filt) in enumerate(zip(KINDS, busiest_filters(model))):
+        state = model.states[index]
+        data = state.sort_data(filt, ALL_SELECTED, ALL_SELECTED)
+        percentiles = state.delay_percentiles(filt, ALL_SELECTED, ALL_SELECTED)
+        stages = {"sort_data": lambda: state.sort_data(filt, ALL_SELECTED, ALL_SELECTED),
+                  "delay_percentiles": lambda: state.delay_percentiles(filt, ALL_SELECTED,
+                                                                       ALL_SELECTED),
+                  "get_info_str": lambda: state.get_info_str(data, percentiles),
+                  "avg_flight_delay": lambda: state.avg_flight_delay(filt, ALL_SELECTED,
+                                                                     ALL_SELECTED),
+                  "percent_on_time": lambda: state.percent_on_time(filt, ALL_SELECTED,
+                                                                   ALL_SELECTED),
+                  "percent_time_block": lambda: state.percent_time_block(filt, ALL_SELECTED,
+                                                                         ALL_SELECTED),
+                  "leaderboard": lambda: model.get_leaderboard(
+                      index, "Cancellation Rate", 10, 50, ALL_SELECTED, ALL_SELECTED),
+                  "leaderboard_weeks": lambda: model.get_leaderboard(
+                      index, "Cancellation Rate", 10, 50, SOME_WEEKS, ALL_SELECTED)}
+        for name, stage in stages.items():
+            timings[f"{kind}.{name}"] = measure(stage, repeat)
+    timings["get_data_story_telling_data"] = measure(model.get_data_story_telling_data, 1)
+    controller = Controller(model)
+    timings["get_airport"] = measure(controller.get_airport, repeat)
+    timings["get_airline"] = measure(controller.get_airline, repeat)
+    # Recorded before reading the csv files again, which holds a second copy of the flights
+    peak = peak_memory_mb()
+    if model.df is not None:
+        # SQLite keeps no flights in memory, reading every csv file would defeat it
+        timings["gen_df"] = measure(lambda: FlightDataModel.gen_df(model), 1)
+    return {"flights": flight_count(model), "timings": timings, "peak_memory_mb": peak}
+
+def git_commit():
+    """
+    Return the commit of the working tree, None outside a git repository
+    """
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_benchmarks(scales: list[float], workdir: str, backend: str = "memory",
+                   repeat: int = 5, seed: int = 0) -> dict:
+    """
+    Write the datasets of every scale into workdir unless they exist and time them
+    : return : a dict of the environment and the timings of every scale
+    """
+    results = {"commit": git_commit(),
+               "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+               "backend": backend,
+               "python": platform.python_version(),
+               "pandas": pd.__version__,
+               "numpy": np.__version__,
+               "platform": platform.platform(),
+               "cpus": os.cpu_count(),
+               "scales": {}}
+    context = multiprocessing.get_context("spawn")
+    for scale in scales:
+        folder = os.path.abspath(os.path.join(workdir, f"scale_{scale:g}"))
+        datasets = os.path.join(folder, "datasets")
+        if not os.path.exists(os.path.join(datasets, "Airline_dataset.csv")):
+            print(f"Writing scale {scale:g} datasets into {datasets}", flush=True)
+            SyntheticFlights(seed).write(datasets, scale)
+        print(f"Timing scale {scale:g}", flush=True)
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            results["scales"][f"{scale:g}"] = pool.submit(run_scale, folder, backend,
+                                                          repeat).result()
+    return results
+
+def compare(base: dict, new: dict, key: str = "scales"):
+    """
+    Print the median times of two results files side by side with their ratio
+    : param key : the key of the results of every scale, or of every input
+    """
+    print(f"{key[:-1]:>6} {'stage':<34} {'base ms':>10} {'new ms':>10} {'ratio':>7}")
+    for scale, result in new[key].items():
+        if scale not in base.get(key, {}):
+            continue
+        base_timings = base[key][scale]["timings"]
+        for name, timing in result["timings"].items():
+            if name not in base_timings:
+                continue
+            before, after = base_timings[name]["median_ms"], timing["median_ms"]
+            ratio = after / before if before else float("nan")
+            print(f"{scale:>6} {name:<34} {before:>10.1f} {after:>10.1f} {ratio:>7.2f}")
+
+def main():
+    """
+    Parse the command line arguments, run the benchmarks and save them
+    """
+    parser = argparse.ArgumentParser(description="Time the model on synthetic datasets "
+                                                 "and save the results as JSON.")
+    parser.add_argument("-s", "--scales", nargs="+", type=float, default=[1],
+                        help="sizes of the datasets as multiples of the real one, up to 50")
+    parser.add_argument("-w", "--workdir", default=os.path.join("benchmarks", "data"),
+                        help="folder of the synthetic datasets, reused between runs")
+    parser.add_argument("-o", "--output", default=None,
+                        help="results file, benchmarks/results-<commit>.json by default")
+    parser.add_argument("-b", "--backend", choices=["memory", "sqlite"], default="memory")
+    parser.add_argument("-r", "--repeat", type=int, default=5,
+                        help="number of runs of every query")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the datasets")
+    parser.add_argument("-c", "--compare", default=None,
+                        help="results file of an earlier run to compare with")
+    args = parser.parse_args()
+    results = run_benchmarks(args.scales, args.workdir, args.backend, args.repeat, args.seed)
+    output = args.output or os.path.join("benchmarks",
+                                         f"results-{results['commit'] or 'local'}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as file:
+        json.dump(results, file, indent=2)
+    print(f"Results saved into {output}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            compare(json.load(file), results)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Bootstrap confidence intervals of delay averages and on-time share"""
+from collections.abc import Generator
+import numpy as np
+import pandas as pd
+
+RESAMPLES = 1000
+CONFIDENCE = 0.95
+# Maximum number of resampled values held in memory at once
+MAX_BATCH = 4_000_000
+
+def resample_means(values: np.ndarray, resamples: int = RESAMPLES, seed: int = 0):
+    """
+    Return the means of resamples drawn with replacement from the values, NaN are ignored.
+    When many values repeat (delays are whole minutes), the number of times each distinct
+    value is drawn is taken from a multinomial distribution, which is the same as
+    resampling the indices but needs resamples x distinct values instead of
+    resamples x values draws. Otherwise the indices are resampled as 2-D arrays
+    in batches of at most MAX_BATCH values.
+    : return : an array of resamples means, NaN if there are no values
+    """
+    values = np.asarray(values, dtype=np.float64)
+    values = values[~np.isnan(values)]
+    size = len(values)
+    if size == 0:
+        return np.full(resamples, np.nan)
+    rng = np.random.default_rng(seed)
+    distinct, counts = np.unique(values, return_counts=True)
+    if len(distinct) * 4 <= size:
+        draws = rng.multinomial(size, counts / size, size=resamples)
+        return draws @ distinct / size
+    batch = max(1, MAX_BATCH // size)
+    means = []
+    for start in range(0, resamples, batch):
+        indices = rng.integers(0, size, size=(min(batch, resamples - start), size))
+        means.append(values[indices].mean(axis=1))
+    return np.concatenate(means)
+
+def confidence_interval(values: np.ndarray, resamples: int = RESAMPLES,
+                        confidence: float = CONFIDENCE, seed: int = 0):
+    """
+    Return the percentile bootstrap confidence interval of the mean of the values
+    : return : a tuple of the lower and upper bounds
+    """
+    means = resample_means(values, resamples, seed)
+    if np.isnan(means[0]):
+        return np.nan, np.nan
+    tail = (1 - confidence) / 2 * 100
+    low, high = np.percentile(means, [tail, 100 - tail])
+    return low, high
+
+def run_steps(steps: Generator):
+    """
+    Run a generator of steps to its end
+    : return : the value returned by the generator
+    """
+    while True:
+        try:
+            next(steps)
+        except StopIteration as stop:
+            return stop.value
+
+def iter_grouped_confidence_intervals(data: pd.DataFrame, groups: pd.Series,
+                                      resamples: int = RESAMPLES,
+                                      confidence: float = CONFIDENCE) -> Generator:
+    """
+    Compute the intervals of grouped_confidence_intervals one group and column at a
+    time, yielding after each so background work can give way between them
+    : return : a generator returning the dataframe of grouped_confidence_intervals
+    """
+    codes, keys = pd.factorize(groups, sort=True)
+    order = np.argsort(codes, kind="stable")
+    bounds = np.searchsorted(codes[order], np.arange(len(keys) + 1))
+    intervals = {}
+    for column in data.columns:
+        values = data[column].to_numpy(dtype=np.float64)[order]
+        results = []
+        for code in range(len(keys)):
+            results.append(confidence_interval(values[bounds[code]:bounds[code + 1]],
+                                               resamples, confidence, code))
+            yield
+        intervals[f"{column}_LOW"] = [low for low, _ in results]
+        intervals[f"{column}_HIGH"] = [high for _, high in results]
+    return pd.DataFrame(intervals, index=pd.Index(keys, name=groups.name))
+
+def grouped_confidence_intervals(data: pd.DataFrame, groups: pd.Series,
+                                 resamples: int = RESAMPLES,
+                                 confidence: float = CONFIDENCE) -> pd.DataFrame:
+    """
+    Return the confidence interval of the mean of every column in each group
+    : param data : a dataframe of the values
+    : param groups : the group of every row of data
+    : return : a dataframe indexed by group with <column>_LOW and <column>_HIGH columns
+    """
+    return run_steps(iter_grouped_confidence_intervals(data, groups, resamples, confidence))
@@ -0,0 +1,152 @@
+"""Charts of the search and airline overview tabs drawn on any matplotlib figure"""
+import math
+import numpy as np
+from matplotlib.collections import LineCollection
+from matplotlib.figure import Figure
+from matplotlib.ticker import MaxNLocator
+from downsample import DownsampledLine
+
+# Series up to this length get a label per point, longer ones keep the default ticks
+MAX_TICK_LABELS = 31
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+# Panels of a row of the small multiples at most
+MAX_COLUMNS = 6
+
+def plot_avg_delay(figure: Figure, data):
+    """
+    Plot Average Delay Line Graph based on the data recieved
+    : param figure : the figure to be drawn on
+    : param data : data to be used to plot graph
+    """
+    figure.clf()
+    ax = figure.subplots()
+    if data.index.name == "FL_DATE":
+        ax.set_xlabel("Date")
+        figure.autofmt_xdate()
+    elif data.index.name == "DAY_OF_WEEK":
+        ax.set_xlabel("Day of the Week")
+        ax.set_xticks(data.index, [WEEKDAYS[day - 1] for day in data.index])
+    elif data.index.name == "DEP_HOUR":
+        ax.set_xlabel("Departure Hour")
+        ax.set_xticks(data.index, [f"{hour:02d}:00" for hour in data.index],
+                      rotation=90)
+    else:
+        ax.set_xlabel("Week of the Month")
+        if len(data.index) <= MAX_TICK_LABELS:
+            ax.set_xticks(data.index, [f"Week {i}" for i in data.index])
+    ax.set_ylabel("Average Delay Time (mins)")
+    ax.set_title("Average Delays")
+    for column, label, color in (("DEP_DELAY", "Departure Delay", "lime"),
+                                 ("ARR_DELAY", "Arrival Delay", "red")):
+        DownsampledLine(ax, data.index, data[column], data.get(f"{column}_LOW"),
+                        data.get(f"{column}_HIGH"), label=label, color=color)
+    ax.legend(loc="lower left", bbox_to_anchor=(0,1))
+    ax.grid(axis="y")
+
+def plot_on_time(figure: Figure, data):
+    """
+    Plot Percentage of on-time flights Graph based on the data recieved
+    : param figure : the figure to be drawn on
+    : param data : data to be used to plot graph
+    """
+    figure.clf()
+    ax = figure.subplots()
+    colors = ["lime","darkorange","cyan","red","magenta","blue"]
+    pie = ax.pie(data, colors=colors, startangle=90)
+    percent = 100.*data/data.sum()
+    labels = ["{0} - {1:1.2f} %".format(i, j) for i, j in zip(data.index,percent)]
+    ax.set_title("Percentage of Flight departing on-time")
+    ax.legend(pie[0], labels, title="Flight", loc="lower right",
+              bbox_to_anchor=(1,0), fontsize=8,
+              bbox_transform=figure.transFigure, ncol=2)
+
+def plot_dep_time(figure: Figure, data):
+    """
+    Plot Percentage of flight in each time block Graph based on the data recieved
+    : param figure : the figure to be drawn on
+    : param data : data to be used to plot graph
+    """
+    figure.clf()
+    ax = figure.subplots()
+    colors = ["lime","darkorange","cyan","red","magenta"]
+    pie = ax.pie(data, colors=colors, startangle=90)
+    percent = 100.*data/data.sum()
+    labels = ["{0} - {1:1.2f} %".format(i, j) for i, j in zip(data.index,percent)]
+    ax.set_title("Percentage of Flight in each Time Block")
+    ax.legend(pie[0], labels, title="Time Block", loc="lower right",
+              bbox_to_anchor=(1,0), fontsize=8,
+              bbox_transform=figure.transFigure, ncol=2)
+
+def plot_percentiles(figure: Figure, data):
+    """
+    Plot Delay Percentiles Line Graph based on the data recieved
+    : param figure : the figure to be drawn on
+    : param data : data to be used to plot graph
+    """
+    figure.clf()
+    ax = figure.subplots()
+    tick_label = [f"Week {i}" for i in data.index]
+    ax.set_xlabel("Week of the Month")
+    ax.set_ylabel("Delay Time (mins)")
+    ax.set_title("Delay Percentiles")
+    ax.set_xticks(data.index, tick_label)
+    styles = {"P50": "dotted", "P90": "dashed", "P99": "solid"}
+    for column in data.columns:
+        delay_type, percentile = column.split()
+        ax.plot(data.index, data[column], linestyle=styles.get(percentile, "solid"),
+                color="lime" if delay_type == "DEP_DELAY" else "red",
+                label=f"{'Departure' if delay_type == 'DEP_DELAY' else 'Arrival'} "
+                      f"{percentile}")
+    ax.legend(loc="best", ncols=2, fontsize=8)
+    ax.grid(axis="y")
+
+def plot_small_multiples(figure: Figure, data, metric: str):
+    """
+    Plot one small line graph of the weekly metric of every airline in a grid sharing
+    the same scales, with the other airlines drawn in grey behind it. The lines of each
+    panel are one LineCollection and only the panels on the left and bottom edges have
+    ticks, so the figure has a few artists per airline.
+    : param figure : the figure to be drawn on
+    : param data : a dataframe of the metric with airlines as rows and weeks as columns
+    : param metric : the name of the metric, an average delay or a share of flights
+    """
+    figure.clf()
+    values = data.to_numpy(dtype=np.float64)
+    if np.isnan(values).all():
+        figure.text(0.5, 0.5, "No flights in the selected filter", ha="center")
+        return
+    if not metric.startswith("Average"):
+        values = values * 100
+    weeks = data.columns.to_numpy(dtype=np.float64)
+    # Shape (airlines, weeks, 2), NaN weeks without flights leave gaps in the lines
+    segments = np.stack([np.broadcast_to(weeks, values.shape), values], axis=-1)
+    num_columns = min(MAX_COLUMNS, math.ceil(math.sqrt(len(data))))
+    num_rows = math.ceil(len(data) / num_columns)
+    low, high = np.nanmin(values), np.nanmax(values)
+    margin = (high - low) * 0.1 or 1
+    grid = figure.add_gridspec(num_rows, num_columns, hspace=0.08, wspace=0.06)
+    y_ticks = MaxNLocator(4).tick_values(low, high)
+    y_ticks = y_ticks[(y_ticks >= low - margin) & (y_ticks <= high + margin)]
+    for position, airline in enumerate(data.index):
+        row, column = divmod(position, num_columns)
+        ax = figure.add_subplot(grid[row, column])
+        ax.set_xlim(weeks[0] - 0.3, weeks[-1] + 0.3)
+        ax.set_ylim(low - margin, high + margin)
+        ax.add_collection(LineCollection(segments, colors="lightgrey", linewidths=0.8),
+                          autolim=False)
+        ax.add_collection(LineCollection(segments[position:position + 1], colors="tab:blue",
+                                         linewidths=1.8), autolim=False)
+        ax.text(0.04, 0.94, str(airline), transform=ax.transAxes, fontsize=8, va="top")
+        # The last panel of every column, or the first panel of every row
+        if position + num_columns >= len(data):
+            ax.set_xticks(weeks, [f"W{week:.0f}" for week in weeks], fontsize=7)
+        else:
+            ax.set_xticks([])
+        if column == 0:
+            ax.set_yticks(y_ticks, [f"{tick:g}" for tick in y_ticks], fontsize=7)
+        else:
+            ax.set_yticks([])
+    figure.suptitle(f"{metric} of every Airline by Week")
+    figure.supxlabel("Week of the Month", fontsize=9)
+    figure.supylabel("Minutes" if metric.startswith("Average") else "% of Flights",
+                     fontsize=9)
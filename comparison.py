@@ -0,0 +1,153 @@
+"""Comparison of several airports or airlines computed in a process pool"""
+import atexit
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+from indexing import factorize_groups, day_numbers, time_block_codes
+
+# Views of the shared columns, attached once in every worker process
+_shared_columns = {}
+
+def _attach_columns(layout: dict):
+    """
+    Initializer of the worker processes, attach to the shared memory blocks
+    : param layout : a dict of column name to (shared memory name, dtype, length)
+    """
+    for column, (name, dtype, length) in layout.items():
+        block = shared_memory.SharedMemory(name=name)
+        _shared_columns[column] = (block, np.ndarray((length,), dtype=dtype, buffer=block.buf))
+
+def _warm_up():
+    """
+    Do nothing, used to start the worker processes before the first comparison
+    """
+    return True
+
+def _compare_entity(kind: str, code: int, day_selected: np.ndarray, day_weeks: np.ndarray,
+                    num_weeks: int, blk_selected: np.ndarray, num_statuses: int):
+    """
+    Compute the weekly delay sums and status counts of one airport or airline
+    from the shared columns
+    : param kind : "ORIGIN" or "AIRLINE", the column of entity codes
+    : param day_selected : whether each day code is selected
+    : param day_weeks : the position of the week of each day code
+    : param num_weeks : the number of weeks selected
+    : param blk_selected : whether each time block code is selected, with an extra
+                           last item for flights without departure time
+    : return : a tuple of an array of shape (weeks, 4) with departure and arrival delay
+               sums and counts, and an array of status counts
+    """
+    columns = {column: view for column, (_, view) in _shared_columns.items()}
+    rows = np.flatnonzero(columns[kind] == code)
+    rows = rows[day_selected[columns["DAY"][rows]] & blk_selected[columns["BLK"][rows]]]
+    weeks = day_weeks[columns["DAY"][rows]]
+    weekly = []
+    for column in ("DEP_DELAY", "ARR_DELAY"):
+        values = columns[column][rows]
+        recorded = ~np.isnan(values)
+        weekly.append(np.bincount(weeks[recorded], weights=values[recorded],
+                                  minlength=num_weeks))
+        weekly.append(np.bincount(weeks[recorded], minlength=num_weeks).astype(np.float64))
+    statuses = np.bincount(columns["STATUS"][rows], minlength=num_statuses)
+    return np.column_stack(weekly), statuses
+
+class ComparisonEngine:
+    """
+    Keep the numeric columns needed to compare airports and airlines in shared memory
+    and fan out the work of every selected entity to a process pool, so the dataframe
+    is never pickled to the workers.
+    """
+    MAX_ENTITIES = 20
+
+    def __init__(self, dataframe: pd.DataFrame, time_blocks: list[str],
+                 processes: int = None) -> None:
+        origin_codes, self.__origins = factorize_groups(dataframe, ["ORIGIN"])
+        airline_codes, self.__airlines = factorize_groups(dataframe, ["OP_CARRIER_AIRLINE_ID"])
+        days = day_numbers(dataframe["FL_DATE"])
+        self.__first_day = int(days.min())
+        self.__num_days = int(days.max()) - self.__first_day + 1
+        self.__time_blocks = list(time_blocks)
+        blk_codes = time_block_codes(dataframe, time_blocks)
+        blk_codes[blk_codes < 0] = len(time_blocks)
+        status_codes, self.__statuses = pd.factorize(dataframe["STATUS"])
+        columns = {"ORIGIN": origin_codes.astype(np.int32),
+                   "AIRLINE": airline_codes.astype(np.int32),
+                   "DAY": (days - self.__first_day).astype(np.int32),
+                   "BLK": blk_codes.astype(np.int8),
+                   "STATUS": np.maximum(status_codes, 0).astype(np.int8),
+                   "DEP_DELAY": dataframe["DEP_DELAY"].to_numpy(dtype=np.float64),
+                   "ARR_DELAY": dataframe["ARR_DELAY"].to_numpy(dtype=np.float64)}
+        self.__blocks = []
+        layout = {}
+        for column, values in columns.items():
+            block = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+            np.ndarray(values.shape, dtype=values.dtype, buffer=block.buf)[:] = values
+            self.__blocks.append(block)
+            layout[column] = (block.name, values.dtype.str, len(values))
+        processes = processes or min(mp.cpu_count(), 4)
+        # Spawned workers do not inherit the Tk state of the main process
+        self.__pool = ProcessPoolExecutor(max_workers=processes,
+                                          mp_context=mp.get_context("spawn"),
+                                          initializer=_attach_columns, initargs=(layout,))
+        for _ in range(processes):
+            self.__pool.submit(_warm_up)
+        atexit.register(self.close)
+
+    def __entity_code(self, kind: str, key):
+        """
+        Return the code of an airport or airline key, None if it is not in the data
+        """
+        if kind == "ORIGIN":
+            return self.__origins.get(key)
+        try:
+            return self.__airlines.get(float(key))
+        except ValueError:
+            return None
+
+    def compare(self, kind: str, keys: list, days: pd.Series, time_blocks: list[str]):
+        """
+        Compute the weekly average delays and status counts of several airports or airlines
+        : param kind : "ORIGIN" for airports or "AIRLINE" for airlines
+        : param keys : the airport codes or airline IDs, at most MAX_ENTITIES are used
+        : param days : a Series of the week of each selected date, indexed by date
+        : param time_blocks : departure time block labels selected
+        : return : a tuple of a dataframe of weekly average delays with (key, delay)
+                   columns, and a dataframe of status counts indexed by key
+        """
+        day_codes = day_numbers(days.index) - self.__first_day
+        inside = (day_codes >= 0) & (day_codes < self.__num_days)
+        day_selected = np.zeros(self.__num_days, dtype=bool)
+        day_selected[day_codes[inside]] = True
+        weeks = np.unique(days.to_numpy())
+        day_weeks = np.zeros(self.__num_days, dtype=np.int64)
+        day_weeks[day_codes[inside]] = np.searchsorted(weeks, days.to_numpy()[inside])
+        blk_selected = np.array([blk in time_blocks for blk in self.__time_blocks] + [False])
+        futures = {}
+        for key in keys[:self.MAX_ENTITIES]:
+            code = self.__entity_code(kind, key)
+            if code is not None:
+                futures[key] = self.__pool.submit(_compare_entity, kind, code, day_selected,
+                                                  day_weeks, len(weeks), blk_selected,
+                                                  len(self.__statuses))
+        weekly, statuses = {}, {}
+        for key, future in futures.items():
+            sums, counts = future.result()
+            with np.errstate(invalid="ignore", divide="ignore"):
+                weekly[(key, "DEP_DELAY")] = sums[:, 0] / sums[:, 1]
+                weekly[(key, "ARR_DELAY")] = sums[:, 2] / sums[:, 3]
+            statuses[key] = counts
+        weekly = pd.DataFrame(weekly, index=pd.Index(weeks, name="WEEK"))
+        statuses = pd.DataFrame.from_dict(statuses, orient="index", columns=self.__statuses)
+        return weekly.dropna(how="all"), statuses
+
+    def close(self):
+        """
+        Stop the worker processes and free the shared memory
+        """
+        self.__pool.shutdown(wait=False, cancel_futures=True)
+        for block in self.__blocks:
+            block.close()
+            block.unlink()
+        self.__blocks = []
@@ -0,0 +1,134 @@
+"""Frame to show the comparison tab of Flight within USA displayer"""
+import tkinter as tk
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+import matplotlib
+from comparison import ComparisonEngine
+from search_tabs import CheckBoxFrame
+matplotlib.use("TkAgg")
+
+class ComparisonTab(tk.Frame):
+    """
+    A frame for user to select several airports or airlines and compare their
+    weekly average delays and flight status.
+    """
+    KIND = {"Airports": "ORIGIN", "Airlines": "AIRLINE"}
+
+    def __init__(self, parent, controller, airports: list, airlines: list, **kwargs) -> None:
+        super().__init__(parent, **kwargs)
+        self.controller = controller
+        self.choices = {"Airports": airports, "Airlines": airlines}
+        self.kind = tk.StringVar(value="Airports")
+        self.graph: ComparisonGraphFrame
+        self.init_components()
+
+    def init_components(self):
+        """
+        Create a ComparisonGraphFrame and a frame consisted of radio buttons, a listbox,
+        checkboxes and a button to compare the selected entities.
+        """
+        option_frame = tk.Frame(self)
+        for kind in self.KIND:
+            radio = tk.Radiobutton(option_frame, text=kind, variable=self.kind, value=kind,
+                                   command=self.update_listbox)
+            radio.pack(side="top", anchor="w")
+        tk.Label(option_frame,
+                 text=f"Select up to {ComparisonEngine.MAX_ENTITIES}:").pack(side="top")
+        list_frame = tk.Frame(option_frame)
+        self.listbox = tk.Listbox(list_frame, selectmode="multiple", height=12,
+                                  exportselection=False)
+        scroll_bar = tk.Scrollbar(list_frame, command=self.listbox.yview)
+        self.listbox.config(yscrollcommand=scroll_bar.set)
+        self.listbox.pack(side="left")
+        scroll_bar.pack(side="left", fill="y")
+        list_frame.pack(side="top")
+        self.checkboxes = CheckBoxFrame(option_frame)
+        self.checkboxes.pack(side="top")
+        compare_button = tk.Button(option_frame, text="Compare",
+                                   command=lambda x=1: self.after(x, self.show_comparison))
+        compare_button.pack(side="top", pady=10)
+        option_frame.pack(side="right", padx=10)
+        self.graph = ComparisonGraphFrame(self)
+        self.graph.pack(side="left", fill="both", expand=True)
+        self.update_listbox()
+
+    def update_listbox(self):
+        """
+        Fill the listbox with the airports or airlines depending on the selected kind
+        """
+        self.listbox.delete(0, "end")
+        self.listbox.insert("end", *self.choices[self.kind.get()])
+
+    def get_selected(self):
+        """
+        Get the airports or airlines selected in the listbox
+        : return : a list of at most MAX_ENTITIES keys
+        """
+        selected = [self.listbox.get(index) for index in self.listbox.curselection()]
+        return selected[:ComparisonEngine.MAX_ENTITIES]
+
+    def show_comparison(self):
+        """
+        Get the comparison data of the selected entities from the controller and plot it
+        """
+        selected = self.get_selected()
+        if not selected:
+            return
+        weekly, statuses = self.controller.comparison_data(self.KIND[self.kind.get()], selected,
+                                                           self.checkboxes.week_var,
+                                                           self.checkboxes.time_blk_var)
+        self.graph.plot_comparison(weekly, statuses)
+
+class ComparisonGraphFrame(tk.Frame):
+    """
+    A Frame that show weekly average delay lines and flight status bars of several
+    airports or airlines in one figure
+    """
+    def __init__(self, parent, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.canvas : FigureCanvasTkAgg
+        self.init_components()
+
+    def init_components(self):
+        """
+        Create a figure, a canvas, and a toolbar
+        """
+        fig = Figure(dpi=85)
+        self.canvas = FigureCanvasTkAgg(fig, self)
+        toolbar = NavigationToolbar2Tk(self.canvas, self)
+        toolbar.update()
+        self.canvas.get_tk_widget().pack(side="top", fill="both", expand=True)
+
+    def plot_comparison(self, weekly, statuses):
+        """
+        Plot the average departure delay of every entity in each week as overlaid lines
+        and the percentage of flights in each status as a stacked bar per entity
+        : param weekly : a DataFrame of weekly average delays with (key, delay) columns
+        : param statuses : a DataFrame of status counts indexed by key
+        """
+        self.canvas.figure.clf()
+        line_ax, bar_ax = self.canvas.figure.subplots(2, 1)
+        for key in statuses.index:
+            line_ax.plot(weekly.index, weekly[(key, "DEP_DELAY")], marker="o", label=str(key))
+        line_ax.set_xticks(weekly.index, [f"Week {i}" for i in weekly.index])
+        line_ax.set_ylabel("AVG DEP Delay (mins)")
+        line_ax.set_title("Average Departure Delays")
+        line_ax.grid(axis="y")
+        line_ax.legend(loc="upper left", bbox_to_anchor=(1, 1), fontsize=7,
+                       ncols=1 + len(statuses) // 10)
+        colors = ["lime","darkorange","cyan","red","magenta","blue"]
+        totals = statuses.sum(axis=1).replace(0, np.nan)
+        bottom = np.zeros(len(statuses))
+        positions = np.arange(len(statuses))
+        for color, status in zip(colors, statuses.columns):
+            share = (statuses[status] / totals * 100).fillna(0).to_numpy()
+            bar_ax.bar(positions, share, bottom=bottom, color=color, label=status)
+            bottom += share
+        bar_ax.set_xticks(positions, [str(key) for key in statuses.index], rotation=45,
+                          fontsize=8)
+        bar_ax.set_ylabel("% of Flights")
+        bar_ax.set_ylim(0, 100)
+        bar_ax.legend(loc="upper left", bbox_to_anchor=(1, 1), fontsize=7)
+        self.canvas.figure.tight_layout()
+        self.canvas.draw()
@@ -0,0 +1,72 @@
+"""Frame to show the one-stop connections tab of Flight within USA displayer"""
+import tkinter as tk
+from tkinter import ttk
+from search_tabs import ComboboxFrame
+
+class ConnectionsTab(tk.Frame):
+    """
+    A frame for user to search the direct route and one-stop itineraries between
+    2 airports, ranked by combined arrival delay and cancellation risk.
+    """
+    MIN_FLIGHTS = ["10", "1", "50", "100"]
+    COLUMNS = (("via", "Via", 80), ("first", "1st Leg Flights", 110),
+               ("second", "2nd Leg Flights", 110), ("delay", "AVG ARR Delay", 130),
+               ("risk", "Cancel Risk", 100), ("score", "Score", 90))
+
+    def __init__(self, parent, controller, data, **kwargs) -> None:
+        super().__init__(parent, **kwargs)
+        self.controller = controller
+        self.data = data
+        self.init_components()
+
+    def init_components(self):
+        """
+        Create a table of itineraries and a frame consisted of comboboxes for the
+        origin and destination airports and a button to search.
+        """
+        airports = sorted(set(self.data.keys()).union(*self.data.values()))
+        option_frame = tk.Frame(self)
+        self.origin = ComboboxFrame(option_frame, "Origin Airport:", airports)
+        self.dest = ComboboxFrame(option_frame, "Destination Airport:", airports,
+                                  default=min(1, len(airports) - 1))
+        self.min_flights = ComboboxFrame(option_frame, "Minimum flights per leg:",
+                                         self.MIN_FLIGHTS)
+        search_button = tk.Button(option_frame, text="Search Connections",
+                                  command=lambda x=1: self.after(x, self.show_connections))
+        label = tk.Label(option_frame, text="*Score = AVG ARR Delay of both legs*\n"
+                                            "*+ Cancel Risk x 180 mins*")
+        for widget in (self.origin, self.dest, self.min_flights):
+            widget.pack(side="top")
+        search_button.pack(side="top", pady=10)
+        label.pack(side="top")
+        option_frame.pack(side="right", padx=10)
+        self.table = ttk.Treeview(self, columns=[column[0] for column in self.COLUMNS],
+                                  show="headings")
+        for column, heading, width in self.COLUMNS:
+            self.table.heading(column, text=heading)
+            self.table.column(column, width=width, anchor="center")
+        scroll_bar = tk.Scrollbar(self, command=self.table.yview)
+        self.table.config(yscrollcommand=scroll_bar.set)
+        self.table.pack(side="left", fill="both", expand=True)
+        scroll_bar.pack(side="left", fill="y")
+
+    def show_connections(self):
+        """
+        Get the itineraries of the selected airports from the controller and show them
+        in the table
+        """
+        try:
+            min_flights = int(self.min_flights.cb_val)
+        except ValueError:
+            min_flights = 1
+        itineraries = self.controller.connections_data(self.origin.cb_val, self.dest.cb_val,
+                                                       min_flights)
+        self.table.delete(*self.table.get_children())
+        for row in itineraries.itertuples(index=False):
+            second = "-" if row.VIA == "Direct" else f"{row.SECOND_LEG_FLIGHTS:.0f}"
+            self.table.insert("", "end", values=(row.VIA, f"{row.FIRST_LEG_FLIGHTS:.0f}", second,
+                                                 f"{row.ARR_DELAY:.2f} min(s)",
+                                                 f"{row.CANCEL_RISK * 100:.2f} %",
+                                                 f"{row.SCORE:.2f}"))
+        if itineraries.empty:
+            self.table.insert("", "end", values=("No flights found", "", "", "", "", ""))
@@ -1,14 +1,18 @@
 """Controller for Flight within USA displayer"""
-from model import FlightDataModel
+from export import ExportJob
+from instrumentation import instrumentation
+from warmup import WarmupScheduler
 from view import UI
 
 class Controller:
     """
     Controller that interact with model and view
     """
-    def __init__(self, model) -> None:
-        self.__model = FlightDataModel()
+    def __init__(self, model, warmup_limit: int = 50) -> None:
+        self.__model = model
         self.__view : UI
+        self.__warmup_limit = warmup_limit
+        self.__warmup = None
 
     @property
     def model(self):
@@ -32,6 +36,13 @@ class Controller:
         self.__view = view
         self.model.attach(self.view)
 
+    @property
+    def warmup(self):
+        """
+        Getter for warmup attribute, the scheduler of the idle time precomputation
+        """
+        return self.__warmup
+
     def set_search_type(self, index: int):
         """
         Set the search state of the model
@@ -43,22 +54,58 @@ class Controller:
         """
         Call the model's get_avg_data method using selected filter as parameters
         """
-        filt, week, time_blk = self.view.get_cur_tab().get_selected_filter()
-        self.model.get_avg_data(filt, week, time_blk)
+        with instrumentation.stage("controller"):
+            tab = self.view.get_cur_tab()
+            filt, week, time_blk, date_range, weekdays, hours = tab.get_selected_filter()
+            self.model.get_avg_data(filt, week, time_blk, date_range, tab.get_granularity(),
+                                    weekdays, hours)
+        instrumentation.end()
 
     def percent_on_time(self):
         """
         Call the model's get_on_time_data method using selected filter as parameters
         """
-        filt, week, time_blk = self.view.get_cur_tab().get_selected_filter()
-        self.model.get_on_time_data(filt, week, time_blk)
+        with instrumentation.stage("controller"):
+            tab = self.view.get_cur_tab()
+            filt, week, time_blk, date_range, weekdays, hours = tab.get_selected_filter()
+            self.model.get_on_time_data(filt, week, time_blk, date_range, weekdays, hours)
+        instrumentation.end()
 
     def percent_time_blk(self):
         """
         Call the model's get_time_blk_data method using selected filter as parameters
         """
-        filt, week, time_blk = self.view.get_cur_tab().get_selected_filter()
-        self.model.get_time_blk_data(filt, week, time_blk)
+        with instrumentation.stage("controller"):
+            tab = self.view.get_cur_tab()
+            filt, week, time_blk, date_range, weekdays, hours = tab.get_selected_filter()
+            self.model.get_time_blk_data(filt, week, time_blk, date_range, weekdays, hours)
+        instrumentation.end()
+
+    def delay_percentile(self):
+        """
+        Call the model's get_percentile_data method using selected filter as parameters
+        """
+        with instrumentation.stage("controller"):
+            tab = self.view.get_cur_tab()
+            filt, week, time_blk, date_range, weekdays, hours = tab.get_selected_filter()
+            self.model.get_percentile_data(filt, week, time_blk, date_range, weekdays, hours)
+        instrumentation.end()
+
+    def export_data(self, scope: str, path: str, file_format: str):
+        """
+        Start writing the flights under the filter of the current tab into a file
+        in a background thread
+        : param scope : "selection" for the flights shown, "all" for the flights of
+                        every group under the filter
+        : param file_format : a key of export.FORMATS
+        : return : the started ExportJob
+        """
+        tab = self.view.get_cur_tab()
+        _, week, time_blk, date_range, weekdays, hours = tab.get_selected_filter()
+        job = ExportJob(self.model.export_chunks(scope, week, time_blk, date_range, weekdays,
+                                                 hours), path, file_format)
+        job.start()
+        return job
 
     def update_graph_stats(self, tab=None):
         """
@@ -68,19 +115,107 @@ class Controller:
         if not tab:
             tab = self.view.get_cur_tab()
         tab.cur_graph(self.model.series)
-        tab.update_text(self.model.info)
+        with instrumentation.stage("text update"):
+            tab.update_text(self.model.info)
+        with instrumentation.stage("breakdown update"):
+            tab.update_breakdown(self.model.breakdown)
 
     def get_airport(self):
         """
         Return available airport ID
         """
-        return self.model.df.groupby("ORIGIN")["DEST"].apply(set)
+        return self.model.get_destinations()
 
     def get_airline(self):
         """
         Return available airline ID
         """
-        return sorted(self.model.df["OP_CARRIER_AIRLINE_ID"].apply(str).unique())
+        return self.model.get_airlines()
+
+    def get_dates(self):
+        """
+        Return available dates as YYYY-MM-DD strings
+        """
+        return self.model.get_dates()
+
+    def in_memory(self):
+        """
+        Return whether the whole dataframe is loaded, which the pages computed over every
+        flight need
+        """
+        return self.model.backend == "memory"
+
+    def od_matrix_data(self, week: list[bool], time_blk: list[bool]):
+        """
+        Return airports and origin-destination matrices needed for heatmap page
+        """
+        return self.model.get_od_matrix(week, time_blk)
+
+    def leaderboard_data(self, index: int, metric: str, k: int, min_flights: int,
+                         week: list[bool], time_blk: list[bool]):
+        """
+        Return the worst and best routes, airports or airlines needed for leaderboard page
+        : param index : 0 for routes, 1 for airports and 2 for airlines
+        """
+        return self.model.get_leaderboard(index, metric, k, min_flights, week, time_blk)
+
+    def airline_weekly_data(self, week: list[bool], time_blk: list[bool]):
+        """
+        Return the weekly average delays and on-time share of every airline needed for
+        airline overview page
+        """
+        with instrumentation.stage("controller"):
+            return self.model.get_airline_weekly(week, time_blk)
+
+    def comparison_data(self, kind: str, keys: list, week: list[bool], time_blk: list[bool]):
+        """
+        Return weekly average delays and status counts needed for comparison page
+        : param kind : "ORIGIN" for airports or "AIRLINE" for airlines
+        """
+        return self.model.get_comparison(kind, keys, week, time_blk)
+
+    def estimate_data(self, origin: str, dest: str, airline: float, weekday: int,
+                      dep_time: float):
+        """
+        Return the expected delays and cancellation probability needed for estimator page
+        """
+        return self.model.estimate_delay(origin, dest, airline, weekday, dep_time)
+
+    def connections_data(self, origin: str, dest: str, min_flights: int):
+        """
+        Return itineraries needed for connections page
+        """
+        return self.model.get_connections(origin, dest, min_flights)
+
+    def identifier_matches(self, kind: str, prefix: str, limit: int):
+        """
+        Return the flight or tail numbers matching the typed prefix for identifier page
+        """
+        return self.model.search_identifiers(kind, prefix, limit)
+
+    def identifier_data(self, kind: str, key: str):
+        """
+        Return the summary and flights of a flight or tail number for identifier page
+        """
+        return self.model.get_identifier_flights(kind, key)
+
+    def disruptions_data(self, min_flights: int, threshold: float):
+        """
+        Return the days an airport had unusually many cancellations or long delays
+        needed for disruptions page
+        """
+        return self.model.get_disruptions(min_flights, threshold)
+
+    def show_search(self, tab_text: str, a_code: list[str], date_range=None,
+                    granularity: str = None, note: str = ""):
+        """
+        Open a search tab with the filter selected and plot its average delay graph
+        : param tab_text : the name of the search tab, e.g. "Search by Airport"
+        : param note : a note about the filter shown in the tab
+        """
+        self.view.show_search_tab(tab_text, a_code, date_range, granularity, note)
+        instrumentation.begin(f"Show {tab_text}")
+        self.view.after(1, self.avg_delay_flight)
 
     def data_story_telling_data(self):
         """
@@ -90,6 +225,10 @@ class Controller:
 
     def run(self):
         """
-        Run the app
+        Run the app, warming up the searches of the warmup_limit most popular routes,
+        airports and airlines while it is idle
         """
+        if self.__warmup_limit:
+            self.__warmup = WarmupScheduler(self.__view, self.__model, self.__warmup_limit)
+            self.__warmup.start()
         self.__view.run()
@@ -4,6 +4,8 @@ import numpy as np
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
 import matplotlib
+from downsample import DownsampledLine
+from charts import MAX_TICK_LABELS
 matplotlib.use("TkAgg")
 
 class DataStoryTellingTab(tk.Frame):
@@ -76,12 +78,13 @@ class DataStoryTellingGraphFrame(tk.Frame):
 
     def plot_delay_histogram(self):
         """
-        Plot Delays Time Histogram
+        Plot Delays Time Histogram from the number of flights of every delay
         """
         self.canvas.figure.clf()
         ax = self.canvas.figure.subplots()
-        ax.hist(self.data[1], bins=125, alpha=0.5, label="Departure delay")
-        ax.hist(self.data[2], alpha=0.5, label="Arrival delay")
+        ax.hist(self.data[1].index, bins=125, weights=self.data[1], alpha=0.5,
+                label="Departure delay")
+        ax.hist(self.data[2].index, weights=self.data[2], alpha=0.5, label="Arrival delay")
         ax.legend(loc="upper right")
         ax.set_title("Delays Time Histogram")
         ax.set_xlim(-75, 75)
@@ -98,11 +101,12 @@ class DataStoryTellingGraphFrame(tk.Frame):
         ax.set_xlabel("Day of the Month")
         ax.set_ylabel("Average Delay Time (mins)")
         ax.set_title("Average Flight Delays Time in January 2020")
-        ax.set_xticks(self.data[3].index[::2])
-        ax.plot(self.data[3].index, self.data[3]["DEP_DELAY"],
-                label="Departure Delay", color="lime")
-        ax.plot(self.data[3].index, self.data[3]["ARR_DELAY"],
-                label="Arrival Delay", color="red")
+        if len(self.data[3].index) <= MAX_TICK_LABELS:
+            ax.set_xticks(self.data[3].index[::2])
+        DownsampledLine(ax, self.data[3].index, self.data[3]["DEP_DELAY"],
+                        label="Departure Delay", color="lime")
+        DownsampledLine(ax, self.data[3].index, self.data[3]["ARR_DELAY"],
+                        label="Arrival Delay", color="red")
         ax.legend(loc="lower left", bbox_to_anchor=(-0.15,1))
         ax.grid()
         self.canvas.draw()
@@ -0,0 +1,173 @@
+"""Frame to show the hidden diagnostics tab of Flight within USA displayer"""
+import tkinter as tk
+from tkinter import ttk, filedialog
+from instrumentation import instrumentation, BUCKETS
+
+class DiagnosticsTab(tk.Frame):
+    """
+    A frame showing the latency of every stage of the recorded interactions, the most
+    recent interactions and the last profile captured, with options to start and stop
+    recording, track memory peaks, profile the next interactions and save it all as JSON.
+    """
+    REFRESH_INTERVAL = 1000
+    BARS = " ▁▂▃▄▅▆▇█"
+    COLUMNS = (("stage", "Stage", 220), ("count", "Count", 60), ("mean", "Mean ms", 80),
+               ("p50", "P50 ms", 80), ("p95", "P95 ms", 80), ("max", "Max ms", 80),
+               ("histogram", f"Histogram ({BUCKETS[0]} ms to {BUCKETS[-2]} ms+)", 160))
+
+    def __init__(self, parent, **kwargs) -> None:
+        super().__init__(parent, **kwargs)
+        self.__recording = tk.BooleanVar(value=instrumentation.enabled)
+        self.__memory = tk.BooleanVar(value=instrumentation.track_memory)
+        self.__profile_count = tk.StringVar(value="5")
+        self.__status = tk.StringVar()
+        self.__polling = False
+        self.init_components()
+        self.bind("<Map>", self.handle_map)
+
+    def init_components(self):
+        """
+        Create a table of the stages, a text of the recent interactions and profile
+        and a frame consisted of the recording options and buttons.
+        """
+        option_frame = tk.Frame(self)
+        tk.Checkbutton(option_frame, text="Record interactions", variable=self.__recording,
+                       command=self.handle_recording).pack(side="top", anchor="w")
+        tk.Checkbutton(option_frame, text="Track memory peaks (slower)",
+                       variable=self.__memory,
+                       command=self.handle_memory).pack(side="top", anchor="w")
+        tk.Label(option_frame, text="Profile the next interactions:").pack(side="top")
+        tk.Spinbox(option_frame, from_=1, to=50, width=5,
+                   textvariable=self.__profile_count).pack(side="top")
+        tk.Button(option_frame, text="Profile",
+                  command=self.handle_profile_button).pack(side="top", pady=5)
+        tk.Button(option_frame, text="Save JSON",
+                  command=self.handle_save_button).pack(side="top", pady=5)
+        tk.Button(option_frame, text="Reset",
+                  command=self.handle_reset_button).pack(side="top", pady=5)
+        tk.Label(option_frame, textvariable=self.__status,
+                 wraplength=180).pack(side="top")
+        option_frame.pack(side="right", padx=10, fill="y")
+        self.table = ttk.Treeview(self, columns=[column[0] for column in self.COLUMNS],
+                                  show="headings", height=12)
+        for column, heading, width in self.COLUMNS:
+            self.table.heading(column, text=heading)
+            self.table.column(column, width=width, anchor="center")
+        self.table.column("stage", anchor="w")
+        self.table.pack(side="top", fill="x")
+        self.text = tk.Text(self, state="disabled", wrap="none")
+        scroll_bar = tk.Scrollbar(self, command=self.text.yview)
+        self.text.config(yscrollcommand=scroll_bar.set)
+        self.text.pack(side="left", fill="both", expand=True)
+        scroll_bar.pack(side="left", fill="y")
+
+    def handle_recording(self):
+        """
+        Event handler for the record checkbox
+        """
+        if self.__recording.get():
+            instrumentation.enable(self.__memory.get())
+        else:
+            instrumentation.disable()
+        self.__memory.set(instrumentation.track_memory)
+
+    def handle_memory(self):
+        """
+        Event handler for the memory checkbox, only used while recording
+        """
+        instrumentation.set_track_memory(self.__memory.get())
+        self.__memory.set(instrumentation.track_memory)
+
+    def handle_profile_button(self):
+        """
+        Event handler for Profile Button, start recording and profile the next interactions
+        """
+        try:
+            count = max(1, int(self.__profile_count.get()))
+        except ValueError:
+            count = 1
+        if not instrumentation.enabled:
+            instrumentation.enable(self.__memory.get())
+            self.__recording.set(True)
+        instrumentation.profile_next(count, "diagnostics.prof")
+        self.__status.set(f"Profiling the next {count} interaction(s) "
+                          f"into diagnostics.prof")
+
+    def handle_save_button(self):
+        """
+        Event handler for Save JSON Button
+        """
+        path = filedialog.asksaveasfilename(defaultextension=".json",
+                                            filetypes=[("JSON", "*.json")])
+        if path:
+            instrumentation.dump(path)
+            self.__status.set(f"Saved into {path}")
+
+    def handle_reset_button(self):
+        """
+        Event handler for Reset Button
+        """
+        instrumentation.reset()
+        self.refresh()
+
+    def handle_map(self, event=None):
+        """
+        Event handler for the tab being shown, refresh it until another tab is selected
+        """
+        self.refresh()
+        if not self.__polling:
+            self.__polling = True
+            self.after(self.REFRESH_INTERVAL, self.poll)
+
+    def poll(self):
+        """
+        Refresh the tab every REFRESH_INTERVAL while it is shown
+        """
+        if self.winfo_ismapped():
+            self.refresh()
+            self.after(self.REFRESH_INTERVAL, self.poll)
+        else:
+            self.__polling = False
+
+    def refresh(self):
+        """
+        Show the statistics, recent interactions and last profile recorded
+        """
+        self.table.delete(*self.table.get_children())
+        for stage, stats in instrumentation.summary().items():
+            self.table.insert("", "end", values=(stage, stats["count"],
+                                                 self.format_value(stats["mean_ms"]),
+                                                 self.format_value(stats["p50_ms"]),
+                                                 self.format_value(stats["p95_ms"]),
+                                                 self.format_value(stats["max_ms"]),
+                                                 self.bars(stats["histogram"].values())))
+        lines = []
+        for interaction in instrumentation.interactions[:20]:
+            memory = interaction["peak_memory_kb"]
+            lines.append(f"{interaction['time']} {interaction['name']}: "
+                         f"{interaction['total_ms']:.1f} ms"
+                         f"{'' if memory is None else f', peak {memory:.0f} KB'}")
+            lines.extend(f"    {name}: {duration:.1f} ms"
+                         for name, duration in interaction["stages"])
+        if instrumentation.profile_text:
+            lines.extend(["", "*Last profile*", instrumentation.profile_text])
+        self.text["state"] = "normal"
+        self.text.delete("1.0", "end")
+        self.text.insert("end", "\n".join(lines) or "No interactions recorded")
+        self.text["state"] = "disabled"
+
+    def bars(self, counts) -> str:
+        """
+        Return a histogram as one bar character per bucket, scaled by the largest
+        """
+        counts = list(counts)
+        largest = max(counts) or 1
+        return "".join(self.BARS[round(count / largest * (len(self.BARS) - 1))]
+                       for count in counts)
+
+    @staticmethod
+    def format_value(value) -> str:
+        """
+        Format a latency of the table, "-" if there is none
+        """
+        return "-" if value is None else f"{value:.1f}"
@@ -0,0 +1,147 @@
+"""Detection of the days an airport had unusually many cancellations or long delays"""
+import warnings
+import numpy as np
+import pandas as pd
+from indexing import day_numbers
+
+# Scales the median absolute deviation to the standard deviation of a normal distribution
+MAD_SCALE = 1.4826
+# Airports need this many days with enough flights for their usual day to be known
+MIN_DAYS = 7
+# Combines an airport code and a day number into one integer cell key
+DAY_SPAN = 1 << 20
+
+def robust_z_scores(matrix: np.ndarray, min_scale: float):
+    """
+    Return the robust z-score of every cell of a matrix, its distance to the median of
+    its row in median absolute deviations scaled like standard deviations, and the
+    median of every row. Every row is computed at once, NaN cells are left out of the
+    medians and get a NaN score.
+    : param min_scale : lower bound of the spread, so a row that hardly varies (e.g. no
+                        cancellation on most days) does not flag every small change
+    """
+    with warnings.catch_warnings():
+        # Rows without any value are left NaN
+        warnings.simplefilter("ignore", RuntimeWarning)
+        median = np.nanmedian(matrix, axis=1, keepdims=True)
+        mad = np.nanmedian(np.abs(matrix - median), axis=1, keepdims=True)
+    return (matrix - median) / np.maximum(MAD_SCALE * mad, min_scale), median.ravel()
+
+class DisruptionDetector:
+    """
+    Flight counts, cancellations and departure delay sums of every origin airport on
+    every day accumulated over chunks of flights into airport by day matrices. A day
+    is a disruption of an airport when its cancellation rate or average departure
+    delay is an outlier among the days of that airport, by robust z-score.
+    """
+    COLUMNS = ["ORIGIN", "FL_DATE", "STATUS", "DEP_DELAY"]
+    # metric: (label, lower bound of the spread of the metric)
+    METRICS = {"CANCEL_RATE": ("Cancellations", 0.05),
+               "DEP_DELAY": ("Delays", 5.0)}
+
+    def __init__(self) -> None:
+        self.__airports = {}
+        self.__parts = []
+        self.__matrices = None
+
+    def update(self, chunk: pd.DataFrame):
+        """
+        Add a chunk of flights with the COLUMNS columns, reduced to one row per airport
+        and day
+        """
+        local, uniques = pd.factorize(chunk["ORIGIN"])
+        lookup = np.array([self.__airports.setdefault(airport, len(self.__airports))
+                           for airport in uniques], dtype=np.int64)
+        valid = local >= 0
+        cells = (lookup[local[valid]] * DAY_SPAN
+                 + day_numbers(chunk["FL_DATE"].to_numpy()[valid]))
+        keys, position = np.unique(cells, return_inverse=True)
+        delays = chunk["DEP_DELAY"].to_numpy(dtype=np.float64)[valid]
+        recorded = ~np.isnan(delays)
+        stats = [np.ones(len(position)),
+                 (chunk["STATUS"].to_numpy()[valid] == "Canceled").astype(np.float64),
+                 np.where(recorded, delays, 0), recorded.astype(np.float64)]
+        self.__parts.append((keys, np.column_stack([np.bincount(position, weights=stat,
+                                                                minlength=len(keys))
+                                                    for stat in stats])))
+        self.__matrices = None
+
+    def matrices(self):
+        """
+        Return the airports, the dates and a dict of airport by date matrices of the
+        FLIGHTS, CANCELED, DELAY_SUM and DELAY_COUNT totals, zero on days without flights
+        """
+        if self.__matrices is None:
+            keys = np.concatenate([keys for keys, _ in self.__parts] + [np.empty(0, np.int64)])
+            stats = np.vstack([stats for _, stats in self.__parts] + [np.empty((0, 4))])
+            keys, position = np.unique(keys, return_inverse=True)
+            airports, days = np.divmod(keys, DAY_SPAN)
+            first = days.min() if len(days) else 0
+            num_days = days.max() - first + 1 if len(days) else 0
+            matrices = {}
+            for column, values in zip(("FLIGHTS", "CANCELED", "DELAY_SUM", "DELAY_COUNT"),
+                                      stats.T):
+                matrix = np.zeros((len(self.__airports), num_days))
+                matrix[airports, days - first] = np.bincount(position, weights=values,
+                                                             minlength=len(keys))
+                matrices[column] = matrix
+            dates = pd.DatetimeIndex((np.arange(num_days) + first).astype("datetime64[D]"),
+                                     name="FL_DATE")
+            self.__parts = [(keys, stats)]
+            self.__matrices = (pd.Index(list(self.__airports), name="ORIGIN"), dates,
+                               matrices)
+        return self.__matrices
+
+    def detect(self, min_flights: int = 20, threshold: float = 3.5) -> pd.DataFrame:
+        """
+        Return the disruptions, the days of every airport whose cancellation rate or
+        average departure delay has a robust z-score of at least threshold
+        : param min_flights : days of an airport with fewer flights are left out
+        : return : a dataframe of the airport, date, number of flights, cause, each
+                   metric with its usual value and score, and the highest score, the
+                   most unusual days first
+        """
+        airports, dates, totals = self.matrices()
+        flights = totals["FLIGHTS"]
+        enough = flights >= max(min_flights, 1)
+        enough &= (enough.sum(axis=1) >= MIN_DAYS)[:, None]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            values = {"CANCEL_RATE": np.where(enough, totals["CANCELED"] / flights, np.nan),
+                      "DEP_DELAY": np.where(enough, totals["DELAY_SUM"]
+                                            / totals["DELAY_COUNT"], np.nan)}
+        scores, usual = {}, {}
+        for metric, (_, min_scale) in self.METRICS.items():
+            scores[metric], usual[metric] = robust_z_scores(values[metric], min_scale)
+        highest = np.fmax(*scores.values())
+        rows, columns = np.nonzero(highest >= threshold)
+        disruptions = pd.DataFrame({"ORIGIN": airports[rows], "FL_DATE": dates[columns],
+                                    "FLIGHTS": flights[rows, columns].astype(np.int64)})
+        causes = []
+        for metric, (label, _) in self.METRICS.items():
+            disruptions[metric] = values[metric][rows, columns]
+            disruptions[f"USUAL_{metric}"] = usual[metric][rows]
+            disruptions[f"{metric}_SCORE"] = scores[metric][rows, columns]
+            causes.append(np.where(scores[metric][rows, columns] >= threshold, label, ""))
+        disruptions.insert(3, "CAUSE", [" and ".join(filter(None, labels))
+                                        for labels in zip(*causes)])
+        disruptions["SCORE"] = highest[rows, columns]
+        return disruptions.sort_values("SCORE", ascending=False,
+                                       kind="stable").reset_index(drop=True)
+
+def disruption_str(disruptions: pd.DataFrame, limit: int = 3) -> str:
+    """
+    Return sentences describing the most unusual disruptions
+    """
+    if disruptions.empty:
+        return "No airport had an unusual day of cancellations or delays. "
+    sentences = []
+    for row in disruptions.head(limit).itertuples(index=False):
+        if row.CANCEL_RATE_SCORE >= row.DEP_DELAY_SCORE:
+            detail = (f"{row.CANCEL_RATE * 100:.1f}% of its {row.FLIGHTS} flights were "
+                      f"canceled against {row.USUAL_CANCEL_RATE * 100:.1f}% on a usual day")
+        else:
+            detail = (f"its {row.FLIGHTS} flights left {row.DEP_DELAY:.1f} min(s) late on "
+                      f"average against {row.USUAL_DEP_DELAY:.1f} min(s) on a usual day")
+        sentences.append(f"{row.ORIGIN} on {row.FL_DATE:%Y-%m-%d}, when {detail}")
+    return (f"{len(disruptions)} airport days stood out from the usual days of their "
+            f"airport, the most unusual being {'; '.join(sentences)}. ")
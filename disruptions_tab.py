@@ -0,0 +1,102 @@
+"""Frame to show the disruptions tab of Flight within USA displayer"""
+import tkinter as tk
+from tkinter import ttk
+from search_tabs import ComboboxFrame
+
+class DisruptionsTab(tk.Frame):
+    """
+    A frame that lists the days an airport had unusually many cancellations or long
+    delays compared with its usual day, the most unusual first. Double clicking a day
+    shows the airport on that day hour by hour in the Search by Airport tab.
+    """
+    NO_HOUR_NOTE = ("*Canceled flights without a departure time are not shown "
+                    "in the graphs*")
+    MIN_FLIGHTS = ["20", "10", "50", "100", "500"]
+    THRESHOLD = ["3.5", "3", "5", "8"]
+    COLUMNS = (("airport", "Airport", 70), ("date", "Date", 100), ("cause", "Cause", 170),
+               ("flights", "Flights", 70), ("canceled", "Canceled", 80),
+               ("usual_canceled", "Usually", 80), ("delay", "AVG DEP Delay", 110),
+               ("usual_delay", "Usually", 80), ("score", "Score", 70))
+
+    def __init__(self, parent, controller, **kwargs) -> None:
+        super().__init__(parent, **kwargs)
+        self.controller = controller
+        self.__summary = tk.StringVar()
+        self.__shown = False
+        self.init_components()
+        self.bind("<Map>", self.handle_map)
+
+    def init_components(self):
+        """
+        Create a table of the disruptions and a frame consisted of comboboxes and
+        buttons to find them and show one in the Search by Airport tab.
+        """
+        option_frame = tk.Frame(self)
+        self.min_flights = ComboboxFrame(option_frame, "Minimum flights a day:",
+                                         self.MIN_FLIGHTS)
+        self.threshold = ComboboxFrame(option_frame, "Minimum score:", self.THRESHOLD)
+        find_button = tk.Button(option_frame, text="Find Disruptions",
+                                command=lambda x=1: self.after(x, self.show_disruptions))
+        show_button = tk.Button(option_frame, text="Show in Search by Airport",
+                                command=self.handle_select)
+        self.min_flights.pack(side="top")
+        self.threshold.pack(side="top")
+        find_button.pack(side="top", pady=10)
+        show_button.pack(side="top")
+        option_frame.pack(side="right", padx=10)
+        table_frame = tk.Frame(self)
+        tk.Label(table_frame, textvariable=self.__summary).pack(side="top")
+        self.table = ttk.Treeview(table_frame, columns=[column for column, _, _ in self.COLUMNS],
+                                  show="headings")
+        for column, heading, width in self.COLUMNS:
+            self.table.heading(column, text=heading)
+            self.table.column(column, width=width, anchor="center")
+        scrollbar = ttk.Scrollbar(table_frame, orient="vertical", command=self.table.yview)
+        self.table.configure(yscrollcommand=scrollbar.set)
+        self.table.bind("<Double-1>", self.handle_select)
+        scrollbar.pack(side="right", fill="y")
+        self.table.pack(side="left", fill="both", expand=True)
+        table_frame.pack(side="left", fill="both", expand=True)
+
+    def handle_map(self, event=None):
+        """
+        Event handler for the tab being shown, find the disruptions the first time so
+        the flights are only read when the tab is used
+        """
+        if not self.__shown:
+            self.__shown = True
+            self.after(1, self.show_disruptions)
+
+    def show_disruptions(self):
+        """
+        Get the disruptions from the controller and show them in the table
+        """
+        try:
+            min_flights = int(self.min_flights.cb_val)
+            threshold = float(self.threshold.cb_val)
+        except ValueError:
+            min_flights, threshold = 20, 3.5
+        disruptions = self.controller.disruptions_data(min_flights, threshold)
+        self.table.delete(*self.table.get_children())
+        for row in disruptions.itertuples(index=False):
+            self.table.insert("", "end", values=(
+                row.ORIGIN, f"{row.FL_DATE:%Y-%m-%d}", row.CAUSE, row.FLIGHTS,
+                f"{row.CANCEL_RATE * 100:.1f} %", f"{row.USUAL_CANCEL_RATE * 100:.1f} %",
+                f"{row.DEP_DELAY:.2f} min(s)", f"{row.USUAL_DEP_DELAY:.2f} min(s)",
+                f"{row.SCORE:.1f}"))
+        self.__summary.set(f"{len(disruptions)} disruption(s) at "
+                           f"{disruptions['ORIGIN'].nunique()} airport(s)")
+
+    def handle_select(self, event=None):
+        """
+        Event handler for double clicking a disruption or the show button, show the
+        airport on that day hour by hour in the Search by Airport tab, with a note when
+        some of the cancellations have no departure hour
+        """
+        selected = self.table.focus()
+        if not selected:
+            return
+        airport, date, cause = self.table.item(selected, "values")[:3]
+        note = self.NO_HOUR_NOTE if "Cancellations" in cause else ""
+        self.controller.show_search("Search by Airport", [airport], (date, date), "Hourly",
+                                    note)
@@ -0,0 +1,136 @@
+"""Level of detail downsampling of long line series to the resolution of their axes"""
+import numpy as np
+import matplotlib.dates as mdates
+from matplotlib.axes import Axes
+
+# Points kept per pixel column: the first, last, lowest and highest
+POINTS_PER_PIXEL = 4
+
+def first_per_bucket(positions: np.ndarray, bucket: np.ndarray) -> np.ndarray:
+    """
+    Return the first of the sorted positions of every bucket they fall in
+    """
+    if not len(positions):
+        return positions
+    groups = bucket[positions]
+    return positions[np.r_[True, groups[1:] != groups[:-1]]]
+
+def pixel_buckets(x: np.ndarray, left: float, right: float, buckets: int):
+    """
+    Split x, sorted, into buckets equal ranges from left to right, the points outside
+    falling into the first or last one
+    : return : the bucket of every point and the first position of every non-empty one
+    """
+    edges = np.linspace(left, right, buckets + 1)
+    bucket = np.clip(np.searchsorted(edges, x, side="right") - 1, 0, buckets - 1)
+    return bucket, np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+
+def envelope_indices(y: np.ndarray, bucket: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """
+    Return the indices of the points to draw, the first, last, lowest and highest
+    point of every bucket. Drawn one bucket per pixel column the line looks the same
+    as with every point. The first missing value of every bucket is kept too so the
+    gaps of the line stay visible.
+    """
+    ends = np.r_[starts[1:], len(y)] - 1
+    counts = ends - starts + 1
+    lowest = np.repeat(np.fmin.reduceat(y, starts), counts)
+    highest = np.repeat(np.fmax.reduceat(y, starts), counts)
+    chosen = [starts, ends, first_per_bucket(np.flatnonzero(y == lowest), bucket),
+              first_per_bucket(np.flatnonzero(y == highest), bucket),
+              first_per_bucket(np.flatnonzero(np.isnan(y)), bucket)]
+    return np.unique(np.concatenate(chosen))
+
+def band_envelope(x: np.ndarray, low: np.ndarray, high: np.ndarray, starts: np.ndarray):
+    """
+    Return the outline of a band reduced to the lowest low and highest high of every
+    bucket, held from its first to its last point, so the polygon stays simple
+    """
+    ends = np.r_[starts[1:], len(x)] - 1
+    return (np.column_stack([x[starts], x[ends]]).ravel(),
+            np.repeat(np.fmin.reduceat(low, starts), 2),
+            np.repeat(np.fmax.reduceat(high, starts), 2))
+
+class DownsampledLine:
+    """
+    A line, with an optional band around it, drawing only the envelope of its points
+    in view at one bucket per pixel column. The points are chosen again whenever the
+    x limits change, so zooming in with the toolbar shows more detail down to every
+    point, and redraws stay fast whatever the length of the series.
+    """
+    def __init__(self, ax: Axes, x, y, low=None, high=None, **kwargs) -> None:
+        self.__ax = ax
+        values = np.asarray(x)
+        order = np.argsort(values, kind="stable")
+        values = values[order]
+        dates = np.issubdtype(values.dtype, np.datetime64)
+        self.__x = mdates.date2num(values) if dates else values.astype(np.float64)
+        self.__y = np.asarray(y, dtype=np.float64)[order]
+        self.__low = None if low is None else np.asarray(low, dtype=np.float64)[order]
+        self.__high = None if high is None else np.asarray(high, dtype=np.float64)[order]
+        # An empty series, e.g. a filter without flights, is drawn as an empty line
+        left, right = self.__x[[0, -1]] if len(self.__x) else (0.0, 0.0)
+        index, band = self.__reduce(0, len(self.__x), left, right)
+        self.__shown = len(index)
+        # The first plot gets the original x so a date axis gets its date units
+        self.__line = ax.plot(values[index], self.__y[index], **kwargs)[0]
+        self.__band = None
+        if band is not None:
+            self.__band = ax.fill_between(*band, color=kwargs.get("color"), alpha=0.2)
+        ax.callbacks.connect("xlim_changed", lambda _: self.update())
+
+    @property
+    def line(self):
+        """
+        Getter for line attribute
+        """
+        return self.__line
+
+    @property
+    def shown(self):
+        """
+        Getter for shown attribute, the number of points drawn
+        """
+        return self.__shown
+
+    def buckets(self) -> int:
+        """
+        Return the number of pixel columns of the axes
+        """
+        return max(int(self.__ax.bbox.width), 1)
+
+    def __reduce(self, start: int, stop: int, left: float, right: float):
+        """
+        Return the indices of the points of the line to draw and the outline of the
+        band, None without a band, from the points from start to stop for a view of
+        x from left to right
+        """
+        x, y = self.__x[start:stop], self.__y[start:stop]
+        band = None
+        if len(x) <= POINTS_PER_PIXEL * self.buckets():
+            if self.__low is not None:
+                band = (x, self.__low[start:stop], self.__high[start:stop])
+            return np.arange(start, stop), band
+        bucket, starts = pixel_buckets(x, left, right, self.buckets())
+        if self.__low is not None:
+            band = band_envelope(x, self.__low[start:stop], self.__high[start:stop], starts)
+        return start + envelope_indices(y, bucket, starts), band
+
+    def update(self):
+        """
+        Choose the points drawn for the x limits of the axes, with one more point on
+        each side so the line runs to the edges
+        """
+        left, right = sorted(self.__ax.get_xlim())
+        start = max(int(np.searchsorted(self.__x, left)) - 1, 0)
+        stop = min(int(np.searchsorted(self.__x, right, side="right")) + 1, len(self.__x))
+        index, band = self.__reduce(start, stop, left, right)
+        self.__shown = len(index)
+        self.__line.set_data(self.__x[index], self.__y[index])
+        if band is not None:
+            # Setting the polygon keeps fill_between from autoscaling the zoomed view
+            x, low, high = band
+            kept = ~(np.isnan(low) | np.isnan(high))
+            x, low, high = x[kept], low[kept], high[kept]
+            self.__band.set_verts([np.column_stack([np.r_[x, x[::-1]],
+                                                    np.r_[low, high[::-1]]])])
@@ -0,0 +1,173 @@
+"""Expected delay and cancellation probability of planned flights from smoothed lookup tables"""
+from __future__ import annotations
+from bisect import bisect_right
+import numpy as np
+import pandas as pd
+from indexing import factorize_groups
+
+# Delays are estimated per route, airline and time block, backing off to the route
+# and then the origin airport. Canceled flights have no departure time, so the
+# cancellation probability is estimated per route and airline instead.
+TABLES = {"DELAY": (["ORIGIN", "DEST", "OP_CARRIER_AIRLINE_ID", "DEP_TIME_BLK"], (4, 2, 1),
+                    ["DEP_DELAY", "ARR_DELAY"]),
+          "CANCELLED": (["ORIGIN", "DEST", "OP_CARRIER_AIRLINE_ID"], (3, 2, 1),
+                        ["CANCELLED"])}
+LEVEL_NAMES = {4: "Route, airline and time block", 3: "Route and airline", 2: "Route",
+               1: "Origin airport", 0: "All flights"}
+
+def smoothed_levels(dataframe: pd.DataFrame, keys: list[str], lengths: tuple,
+                    metrics: list[str], prior_weight: float):
+    """
+    Compute the mean of the metrics for the groups of each level, shrunk toward the
+    mean of their parent group: (sum + prior_weight * parent mean) / (count + prior_weight)
+    : param keys : key columns, the groups of a level are formed by the first columns
+    : param lengths : the number of key columns of each level, finest first
+    : return : a tuple of the overall means and a list of (lookup dict, estimates,
+               flight counts) of each level, finest first
+    """
+    values = dataframe[metrics].to_numpy(dtype=np.float64)
+    recorded = ~np.isnan(values)
+    values = np.where(recorded, values, 0)
+    overall = values.sum(axis=0) / np.maximum(recorded.sum(axis=0), 1)
+    levels = []
+    parent_codes, parent_estimates = None, overall[None, :]
+    for length in sorted(lengths):
+        codes, lookup = factorize_groups(dataframe, keys[:length])
+        valid = codes >= 0
+        num_groups = len(lookup)
+        sums = np.column_stack([np.bincount(codes[valid], weights=values[valid, i],
+                                            minlength=num_groups)
+                                for i in range(len(metrics))])
+        counts = np.column_stack([np.bincount(codes[valid], weights=recorded[valid, i],
+                                              minlength=num_groups)
+                                  for i in range(len(metrics))])
+        parents = np.zeros(num_groups, dtype=np.int64)
+        if parent_codes is not None:
+            parents[codes[valid]] = parent_codes[valid]
+        estimates = (sums + prior_weight * parent_estimates[parents]) / (counts + prior_weight)
+        levels.append((lookup, estimates, np.bincount(codes[valid], minlength=num_groups)))
+        parent_codes, parent_estimates = codes, estimates
+    return overall, levels[::-1]
+
+class DelayEstimator:
+    """
+    Lookup tables of the expected departure and arrival delays and the cancellation
+    probability of a planned flight, with hierarchical backoff from the most specific
+    group that has data to the origin airport, adjusted by the day of the week.
+    Every query is answered by dict and array lookups only.
+    """
+    PRIOR_WEIGHT = 20
+    # Departure times (hhmm) where each time block starts, the last block wraps midnight
+    BLOCK_STARTS = (400, 800, 1200, 1600, 1900)
+    WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+    def __init__(self, tables: dict, weekday_offsets: np.ndarray, weekday_ratios: np.ndarray,
+                 time_blocks: list[str]) -> None:
+        self.__tables = tables
+        self.__weekday_offsets = weekday_offsets
+        self.__weekday_ratios = weekday_ratios
+        self.__time_blocks = list(time_blocks)
+
+    @classmethod
+    def build(cls, dataframe: pd.DataFrame, time_blocks: list[str],
+              prior_weight: float = PRIOR_WEIGHT) -> DelayEstimator:
+        """
+        Build the lookup tables from the flights data
+        : param time_blocks : departure time block labels in order of BLOCK_STARTS
+        """
+        departed = dataframe[dataframe["DEP_TIME_BLK"].notna()]
+        tables = {}
+        for table, (keys, lengths, metrics) in TABLES.items():
+            data = departed if table == "DELAY" else dataframe
+            tables[table] = (keys, lengths) + smoothed_levels(data, keys, lengths, metrics,
+                                                              prior_weight)
+        weekdays = dataframe["DAY_OF_WEEK"].to_numpy(dtype=np.int64) - 1
+        delays = dataframe[["DEP_DELAY", "ARR_DELAY"]]
+        weekday_means = delays.groupby(weekdays).mean().reindex(range(7))
+        weekday_offsets = (weekday_means - delays.mean()).fillna(0).to_numpy()
+        cancelled = dataframe["CANCELLED"].to_numpy(dtype=np.float64)
+        weekday_rates = pd.Series(cancelled).groupby(weekdays).mean().reindex(range(7))
+        weekday_ratios = (weekday_rates / max(cancelled.mean(), 1e-9)).fillna(1).to_numpy()
+        return cls(tables, weekday_offsets, weekday_ratios, time_blocks)
+
+    def save(self, path: str):
+        """
+        Save the lookup tables into a .npz file
+        """
+        arrays = {"time_blocks": np.array(self.__time_blocks),
+                  "weekday_offsets": self.__weekday_offsets,
+                  "weekday_ratios": self.__weekday_ratios}
+        for table, (keys, lengths, overall, levels) in self.__tables.items():
+            arrays[f"{table}/overall"] = overall
+            for length, (lookup, estimates, flights) in zip(lengths, levels):
+                prefix = f"{table}/{length}"
+                groups = list(lookup) if length > 1 else [(key,) for key in lookup]
+                for position, column in enumerate(keys[:length]):
+                    arrays[f"{prefix}/{column}"] = np.array([group[position]
+                                                             for group in groups])
+                arrays[f"{prefix}/estimates"] = estimates
+                arrays[f"{prefix}/flights"] = flights
+        np.savez(path, **arrays)
+
+    @classmethod
+    def load(cls, path: str) -> DelayEstimator:
+        """
+        Load the lookup tables saved by save
+        """
+        with np.load(path) as arrays:
+            tables = {}
+            for table, (keys, lengths, _) in TABLES.items():
+                levels = []
+                for length in lengths:
+                    prefix = f"{table}/{length}"
+                    columns = [arrays[f"{prefix}/{column}"].tolist()
+                               for column in keys[:length]]
+                    groups = zip(*columns) if length > 1 else columns[0]
+                    lookup = {group: code for code, group in enumerate(groups)}
+                    levels.append((lookup, arrays[f"{prefix}/estimates"],
+                                   arrays[f"{prefix}/flights"]))
+                tables[table] = (keys, lengths, arrays[f"{table}/overall"], levels)
+            return cls(tables, arrays["weekday_offsets"], arrays["weekday_ratios"],
+                       arrays["time_blocks"].tolist())
+
+    def time_block(self, dep_time: float) -> str:
+        """
+        Return the departure time block of a departure time in hhmm
+        """
+        return self.__time_blocks[bisect_right(self.BLOCK_STARTS, dep_time) - 1]
+
+    def __lookup(self, table: str, key: tuple):
+        """
+        Return the estimates, the number of key columns and the flight count of the most
+        specific level of a table that has the key, or the overall means
+        """
+        _, lengths, overall, levels = self.__tables[table]
+        for length, (lookup, estimates, flights) in zip(lengths, levels):
+            code = lookup.get(key[:length] if length > 1 else key[0])
+            if code is not None:
+                return estimates[code], length, int(flights[code])
+        return overall, 0, 0
+
+    def estimate(self, origin: str, dest: str, airline, weekday: int, dep_time: float) -> dict:
+        """
+        Estimate the delays and cancellation probability of a planned flight
+        : param airline : the airline ID
+        : param weekday : day of the week, 1 for Monday to 7 for Sunday
+        : param dep_time : scheduled departure time in hhmm, e.g. 1435
+        : return : a dict of the expected DEP_DELAY and ARR_DELAY in minutes, the
+                   CANCELLED probability, the TIME_BLOCK, and the LEVEL and FLIGHTS
+                   of the data the delays are estimated from
+        """
+        if not 1 <= weekday <= len(self.WEEKDAYS):
+            raise ValueError(f"weekday must be from 1 (Monday) to 7 (Sunday), not {weekday}")
+        block = self.time_block(dep_time)
+        key = (origin, dest, float(airline), block)
+        delays, length, flights = self.__lookup("DELAY", key)
+        cancelled = self.__lookup("CANCELLED", key[:3])[0][0]
+        offsets = self.__weekday_offsets[weekday - 1]
+        return {"DEP_DELAY": delays[0] + offsets[0],
+                "ARR_DELAY": delays[1] + offsets[1],
+                "CANCELLED": min(cancelled * self.__weekday_ratios[weekday - 1], 1.0),
+                "TIME_BLOCK": block,
+                "LEVEL": LEVEL_NAMES[length],
+                "FLIGHTS": flights}
@@ -0,0 +1,66 @@
+"""Frame to show the delay estimator tab of Flight within USA displayer"""
+import tkinter as tk
+from estimator import DelayEstimator
+from search_tabs import ComboboxFrame
+
+class EstimatorTab(tk.Frame):
+    """
+    A frame for user to enter a planned flight and get its expected delays
+    and cancellation probability.
+    """
+    def __init__(self, parent, controller, airports: list, airlines: list, **kwargs) -> None:
+        super().__init__(parent, **kwargs)
+        self.controller = controller
+        self.airports = airports
+        self.airlines = airlines
+        self.dep_time = tk.StringVar(value="0900")
+        self.result = tk.StringVar(value="Enter a planned flight and press Estimate")
+        self.init_components()
+
+    def init_components(self):
+        """
+        Create a label to show the estimate and a frame consisted of comboboxes for the
+        route, airline and day of the week, an entry for the departure time and a button.
+        """
+        option_frame = tk.Frame(self)
+        self.origin = ComboboxFrame(option_frame, "Origin Airport:", self.airports)
+        self.dest = ComboboxFrame(option_frame, "Destination Airport:", self.airports,
+                                  default=min(1, len(self.airports) - 1))
+        self.airline = ComboboxFrame(option_frame, "Airline ID:", self.airlines)
+        self.weekday = ComboboxFrame(option_frame, "Day of the Week:", DelayEstimator.WEEKDAYS)
+        for widget in (self.origin, self.dest, self.airline, self.weekday):
+            widget.pack(side="top")
+        tk.Label(option_frame, text="Departure Time (hhmm):").pack(side="top")
+        tk.Entry(option_frame, textvariable=self.dep_time, width=10).pack(side="top")
+        estimate_button = tk.Button(option_frame, text="Estimate",
+                                    command=lambda x=1: self.after(x, self.show_estimate))
+        estimate_button.pack(side="top", pady=10)
+        option_frame.pack(side="right", padx=10)
+        result_label = tk.Label(self, textvariable=self.result, justify="left",
+                                font=("Courier", 14))
+        result_label.pack(side="left", fill="both", expand=True)
+
+    def show_estimate(self):
+        """
+        Get the estimate of the entered flight from the controller and show it
+        """
+        try:
+            dep_time = float(self.dep_time.get())
+            airline = float(self.airline.cb_val)
+        except ValueError:
+            self.result.set("Invalid departure time or airline ID")
+            return
+        if self.weekday.cb_val not in DelayEstimator.WEEKDAYS or not 0 <= dep_time <= 2400:
+            self.result.set("Invalid day of the week or departure time")
+            return
+        weekday = DelayEstimator.WEEKDAYS.index(self.weekday.cb_val) + 1
+        estimate = self.controller.estimate_data(self.origin.cb_val, self.dest.cb_val,
+                                                 airline, weekday, dep_time)
+        self.result.set(f"Flight from {self.origin.cb_val} to {self.dest.cb_val}\n"
+                        f"Airline ID: {self.airline.cb_val}\n"
+                        f"{self.weekday.cb_val}, {estimate['TIME_BLOCK']}\n\n"
+                        f"Expected DEP Delay: {estimate['DEP_DELAY']:.2f} min(s)\n"
+                        f"Expected ARR Delay: {estimate['ARR_DELAY']:.2f} min(s)\n"
+                        f"Cancellation Risk:  {estimate['CANCELLED'] * 100:.2f} %\n\n"
+                        f"Estimated from: {estimate['LEVEL']}\n"
+                        f"Flights: {estimate['FLIGHTS']}")
@@ -0,0 +1,171 @@
+"""Write filtered flights into CSV, Parquet or JSON lines files in a background thread"""
+import os
+import threading
+from abc import ABC, abstractmethod
+import pandas as pd
+
+FORMATS = {"CSV": ".csv", "Parquet": ".parquet", "JSON lines": ".jsonl"}
+# Small chunks so the thread holds the interpreter for a short time and the UI stays
+# responsive while a chunk is written
+EXPORT_CHUNK_SIZE = 20_000
+
+class ExportError(Exception):
+    """
+    Error of an export that cannot be written
+    """
+
+class ChunkWriter(ABC):
+    """
+    Abstract writer appending chunks of a dataframe to a file
+    """
+    def __init__(self, path: str) -> None:
+        self._path = path
+
+    @abstractmethod
+    def write(self, chunk: pd.DataFrame):
+        """
+        Append a chunk to the file
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """
+        Finish the file
+        """
+
+class CSVWriter(ChunkWriter):
+    """
+    Writer of a CSV file with the header written before the first chunk
+    """
+    def __init__(self, path: str) -> None:
+        super().__init__(path)
+        self.__file = open(path, "w", newline="", encoding="utf-8")
+        self.__header = True
+
+    def write(self, chunk: pd.DataFrame):
+        chunk.to_csv(self.__file, header=self.__header, index=False)
+        self.__header = False
+
+    def close(self):
+        self.__file.close()
+
+class JSONLinesWriter(ChunkWriter):
+    """
+    Writer of a JSON lines file, one flight per line with dates in ISO format
+    """
+    def __init__(self, path: str) -> None:
+        super().__init__(path)
+        self.__file = open(path, "w", encoding="utf-8")
+
+    def write(self, chunk: pd.DataFrame):
+        if chunk.empty:
+            return
+        lines = chunk.to_json(orient="records", lines=True, date_format="iso")
+        self.__file.write(lines if lines.endswith("\n") else lines + "\n")
+
+    def close(self):
+        self.__file.close()
+
+class ParquetWriter(ChunkWriter):
+    """
+    Writer of a Parquet file, one row group per chunk, using the schema of the first
+    chunk. Needs the optional pyarrow package.
+    """
+    def __init__(self, path: str) -> None:
+        super().__init__(path)
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as error:
+            raise ExportError("Parquet export needs the pyarrow package") from error
+        self.__pyarrow = pyarrow
+        self.__writer = None
+
+    def write(self, chunk: pd.DataFrame):
+        if self.__writer is None:
+            table = self.__pyarrow.Table.from_pandas(chunk, preserve_index=False)
+            self.__writer = self.__pyarrow.parquet.ParquetWriter(self._path, table.schema)
+        else:
+            table = self.__pyarrow.Table.from_pandas(chunk, schema=self.__writer.schema,
+                                                     preserve_index=False)
+        self.__writer.write_table(table)
+
+    def close(self):
+        if self.__writer is not None:
+            self.__writer.close()
+
+WRITERS = {"CSV": CSVWriter, "Parquet": ParquetWriter, "JSON lines": JSONLinesWriter}
+
+class ExportJob(threading.Thread):
+    """
+    Thread writing chunks of flights into a file. The progress, number of rows written
+    and error are read by the UI while the thread runs, the file is removed if the
+    export fails or is canceled.
+    """
+    def __init__(self, chunks, path: str, file_format: str) -> None:
+        """
+        : param chunks : an iterable of (dataframe chunk, fraction of the data read)
+        : param file_format : a key of FORMATS
+        """
+        super().__init__(daemon=True)
+        self.__chunks = chunks
+        self.__path = path
+        self.__file_format = file_format
+        self.__cancel = threading.Event()
+        self.__progress = 0.0
+        self.__rows = 0
+        self.__error = None
+
+    @property
+    def progress(self):
+        """
+        Getter for progress attribute, the fraction of the data read between 0 and 1
+        """
+        return self.__progress
+
+    @property
+    def rows(self):
+        """
+        Getter for rows attribute, the number of rows written
+        """
+        return self.__rows
+
+    @property
+    def error(self):
+        """
+        Getter for error attribute, the message of the error that stopped the export
+        """
+        return self.__error
+
+    @property
+    def canceled(self):
+        """
+        Getter for canceled attribute
+        """
+        return self.__cancel.is_set()
+
+    def cancel(self):
+        """
+        Stop the export after the chunk being written
+        """
+        self.__cancel.set()
+
+    def run(self):
+        writer = None
+        try:
+            writer = WRITERS[self.__file_format](self.__path)
+            for chunk, progress in self.__chunks:
+                if self.__cancel.is_set():
+                    break
+                writer.write(chunk)
+                self.__rows += len(chunk)
+                self.__progress = progress
+        except ExportError as error:
+            self.__error = str(error)
+        except Exception as error:
+            self.__error = f"{type(error).__name__}: {error}"
+        finally:
+            if writer is not None:
+                writer.close()
+        if (self.__error or self.__cancel.is_set()) and os.path.exists(self.__path):
+            os.remove(self.__path)
@@ -0,0 +1,117 @@
+"""Frame to show the origin-destination heatmap tab of Flight within USA displayer"""
+import tkinter as tk
+import numpy as np
+from matplotlib.colors import LogNorm
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+import matplotlib
+from od_matrix import ODMatrix
+from search_tabs import CheckBoxFrame, ComboboxFrame
+matplotlib.use("TkAgg")
+
+class HeatmapTab(tk.Frame):
+    """
+    A frame that show a heatmap of a statistic between every origin and
+    destination airport, with options to filter, order and limit the airports.
+    """
+    ORDER = ["Busiest first", "Alphabetical"]
+    NUM_AIRPORTS = ["25", "50", "100", "All"]
+
+    def __init__(self, parent, controller, **kwargs) -> None:
+        super().__init__(parent, **kwargs)
+        self.controller = controller
+        self.graph: HeatmapGraphFrame
+        self.init_components()
+
+    def init_components(self):
+        """
+        Create a HeatmapGraphFrame and a frame consisted of comboboxes, checkboxes
+        and a button to plot the heatmap.
+        """
+        option_frame = tk.Frame(self)
+        self.metric = ComboboxFrame(option_frame, "Statistic:", list(ODMatrix.METRICS))
+        self.order = ComboboxFrame(option_frame, "Order airports:", self.ORDER)
+        self.num_airports = ComboboxFrame(option_frame, "Airports shown:", self.NUM_AIRPORTS)
+        self.checkboxes = CheckBoxFrame(option_frame)
+        show_button = tk.Button(option_frame, text="Show Heatmap",
+                                command=lambda x=1: self.after(x, self.show_heatmap))
+        self.metric.pack(side="top")
+        self.order.pack(side="top")
+        self.num_airports.pack(side="top")
+        self.checkboxes.pack(side="top")
+        show_button.pack(side="top", pady=10)
+        option_frame.pack(side="right", padx=10)
+        self.graph = HeatmapGraphFrame(self)
+        self.graph.pack(side="left", fill="both", expand=True)
+        self.show_heatmap()
+
+    def show_heatmap(self):
+        """
+        Get the matrices of the selected filter from the controller and plot the
+        selected statistic
+        """
+        airports, matrices = self.controller.od_matrix_data(self.checkboxes.week_var,
+                                                            self.checkboxes.time_blk_var)
+        if self.order.cb_val == "Alphabetical":
+            order = np.arange(len(airports))
+        else:
+            order = ODMatrix.order_by_volume(matrices)
+        if self.num_airports.cb_val != "All":
+            busiest = ODMatrix.order_by_volume(matrices)[:int(self.num_airports.cb_val)]
+            order = order[np.isin(order, busiest)]
+        metric = self.metric.cb_val
+        if metric not in ODMatrix.METRICS:
+            metric = list(ODMatrix.METRICS)[0]
+        matrix = matrices[ODMatrix.METRICS[metric]][np.ix_(order, order)]
+        self.graph.plot_heatmap(matrix, airports[order], metric)
+
+class HeatmapGraphFrame(tk.Frame):
+    """
+    A Frame that show a heatmap of an origin-destination matrix
+    """
+    def __init__(self, parent, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.canvas : FigureCanvasTkAgg
+        self.init_components()
+
+    def init_components(self):
+        """
+        Create a figure, a canvas, and a toolbar
+        """
+        fig = Figure(dpi=85)
+        self.canvas = FigureCanvasTkAgg(fig, self)
+        toolbar = NavigationToolbar2Tk(self.canvas, self)
+        toolbar.update()
+        self.canvas.get_tk_widget().pack(side="top", fill="both", expand=True)
+
+    def plot_heatmap(self, matrix, airports, metric: str):
+        """
+        Plot a heatmap of the matrix, with origin airports as rows and destination
+        airports as columns
+        : param matrix : a square matrix, NaN for pairs without flights
+        : param airports : the airport codes of the rows and columns
+        : param metric : the name of the statistic in the matrix
+        """
+        self.canvas.figure.clf()
+        ax = self.canvas.figure.subplots()
+        masked = np.ma.masked_invalid(matrix)
+        if metric == "Number of Flights":
+            image = ax.imshow(masked, cmap="viridis", interpolation="nearest",
+                              norm=LogNorm() if masked.count() else None)
+            label = "Flights"
+        elif metric == "Cancellation Rate":
+            image = ax.imshow(masked * 100, cmap="Reds", interpolation="nearest")
+            label = "%"
+        else:
+            limit = np.nanpercentile(np.abs(matrix), 95) if masked.count() else 1
+            image = ax.imshow(masked, cmap="RdYlGn_r", vmin=-limit, vmax=limit,
+                              interpolation="nearest")
+            label = "Minutes"
+        self.canvas.figure.colorbar(image, ax=ax, label=label)
+        if len(airports) <= 50:
+            ax.set_xticks(np.arange(len(airports)), airports, rotation=90, fontsize=7)
+            ax.set_yticks(np.arange(len(airports)), airports, fontsize=7)
+        ax.set_xlabel("Destination Airport")
+        ax.set_ylabel("Origin Airport")
+        ax.set_title(metric)
+        self.canvas.draw()
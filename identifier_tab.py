@@ -0,0 +1,93 @@
+"""Frame to show the search by flight number or aircraft tab of Flight within USA displayer"""
+import tkinter as tk
+from tkinter import ttk
+
+class IdentifierTab(tk.Frame):
+    """
+    A frame for user to type a flight number or tail number, pick one of the matches
+    ranked by number of flights and see every flight of it.
+    """
+    KINDS = ("Flight number", "Aircraft")
+    MAX_MATCHES = 20
+    COLUMNS = (("date", "Date", 90), ("origin", "Origin", 70), ("dest", "Destination", 90),
+               ("dep_time", "DEP Time", 80), ("dep_delay", "DEP Delay", 90),
+               ("arr_delay", "ARR Delay", 90), ("status", "Status", 200))
+
+    def __init__(self, parent, controller, **kwargs) -> None:
+        super().__init__(parent, **kwargs)
+        self.controller = controller
+        self.__kind = tk.StringVar(value=self.KINDS[0])
+        self.__matches = []
+        self.init_components()
+
+    def init_components(self):
+        """
+        Create a frame consisted of radio buttons for the kind of number, an entry and
+        a list of matches, a summary label and a table of flights.
+        """
+        option_frame = tk.Frame(self)
+        for kind in self.KINDS:
+            tk.Radiobutton(option_frame, text=kind, value=kind, variable=self.__kind,
+                           command=self.show_matches).pack(side="top", anchor="w")
+        tk.Label(option_frame, text="Type a flight or tail number:").pack(side="top")
+        self.entry = tk.Entry(option_frame)
+        self.entry.bind("<KeyRelease>", self.show_matches)
+        self.entry.bind("<Return>", self.handle_select)
+        self.entry.pack(side="top")
+        self.listbox = tk.Listbox(option_frame, height=self.MAX_MATCHES, exportselection=False)
+        self.listbox.bind("<<ListboxSelect>>", self.handle_select)
+        self.listbox.pack(side="top", fill="x", pady=5)
+        self.summary = tk.Label(option_frame, justify="left", anchor="w")
+        self.summary.pack(side="top", fill="x")
+        option_frame.pack(side="right", padx=10, fill="y")
+        self.table = ttk.Treeview(self, columns=[column[0] for column in self.COLUMNS],
+                                  show="headings")
+        for column, heading, width in self.COLUMNS:
+            self.table.heading(column, text=heading)
+            self.table.column(column, width=width, anchor="center")
+        scroll_bar = tk.Scrollbar(self, command=self.table.yview)
+        self.table.config(yscrollcommand=scroll_bar.set)
+        self.table.pack(side="left", fill="both", expand=True)
+        scroll_bar.pack(side="left", fill="y")
+
+    def show_matches(self, event=None):
+        """
+        Show the numbers starting with the typed text, most flights first
+        """
+        self.__matches = self.controller.identifier_matches(self.__kind.get(),
+                                                            self.entry.get(),
+                                                            self.MAX_MATCHES)
+        self.listbox.delete(0, "end")
+        for key, count in self.__matches:
+            self.listbox.insert("end", f"{key} ({count} flights)")
+
+    def handle_select(self, event=None):
+        """
+        Show the flights of the selected match, or of the first match when enter is
+        pressed in the entry
+        """
+        selection = self.listbox.curselection()
+        if selection:
+            index = selection[0]
+        elif self.__matches:
+            index = 0
+        else:
+            return
+        key = self.__matches[index][0]
+        summary, flights = self.controller.identifier_data(self.__kind.get(), key)
+        self.summary.config(text=summary)
+        self.table.delete(*self.table.get_children())
+        for row in flights.itertuples(index=False):
+            self.table.insert("", "end", values=(row.FL_DATE.strftime("%Y-%m-%d"),
+                                                 row.ORIGIN, row.DEST,
+                                                 self.format_value(row.DEP_TIME, "{:04.0f}"),
+                                                 self.format_value(row.DEP_DELAY, "{:.0f}"),
+                                                 self.format_value(row.ARR_DELAY, "{:.0f}"),
+                                                 row.STATUS))
+
+    @staticmethod
+    def format_value(value, pattern: str) -> str:
+        """
+        Format a number of the table, "-" if it is missing
+        """
+        return "-" if value != value else pattern.format(value)
@@ -0,0 +1,123 @@
+"""Integer encodings of the dataframe shared by the precomputed indexes"""
+import numpy as np
+import pandas as pd
+
+# Number of weeks of the month that can be selected
+WEEKS_OF_MONTH = 5
+
+def factorize_groups(dataframe: pd.DataFrame, keys: list[str]):
+    """
+    Encode the groups formed by the key columns as integers
+    : param keys : columns that identify a group, e.g. ["ORIGIN", "DEST"] for a route
+    : return : an array of group codes (-1 for missing keys) and a dict mapping
+               each group key, a tuple when several columns are used, to its code
+    """
+    if len(keys) == 1:
+        codes, uniques = pd.factorize(dataframe[keys[0]])
+        return codes.astype(np.int64), {key: code for code, key in enumerate(uniques)}
+    # Combine the codes of every column into one integer instead of building tuples
+    combined = np.zeros(len(dataframe), dtype=np.int64)
+    missing = np.zeros(len(dataframe), dtype=bool)
+    column_uniques = []
+    for key in keys:
+        column_codes, uniques = pd.factorize(dataframe[key])
+        if len(uniques) and len(column_uniques) and \
+                np.prod([len(u) for u in column_uniques], dtype=float) * len(uniques) >= 2**62:
+            codes, uniques = pd.MultiIndex.from_frame(dataframe[keys]).factorize()
+            return codes.astype(np.int64), {key: code for code, key in enumerate(uniques)}
+        missing |= column_codes < 0
+        combined = combined * max(len(uniques), 1) + np.maximum(column_codes, 0)
+        column_uniques.append(uniques)
+    codes = np.full(len(dataframe), -1, dtype=np.int64)
+    codes[~missing], group_keys = pd.factorize(combined[~missing])
+    columns = []
+    for uniques in reversed(column_uniques):
+        group_keys, positions = np.divmod(group_keys, max(len(uniques), 1))
+        columns.append(np.asarray(uniques)[positions].tolist())
+    lookup = {key: code for code, key in enumerate(zip(*reversed(columns)))}
+    return codes, lookup
+
+def group_order(codes: np.ndarray) -> np.ndarray:
+    """
+    Return the stable order that sorts the group codes, -1 (missing keys) first. The
+    codes are sorted 16 bits at a time, least significant first, which numpy does with
+    a radix sort instead of a comparison sort of the whole integers.
+    """
+    remaining = np.asarray(codes, dtype=np.int64) + 1
+    order = np.argsort((remaining & 0xFFFF).astype(np.uint16), kind="stable")
+    remaining >>= 16
+    while remaining.any():
+        digits = (remaining[order] & 0xFFFF).astype(np.uint16)
+        order = order[np.argsort(digits, kind="stable")]
+        remaining >>= 16
+    return order
+
+def day_numbers(dates) -> np.ndarray:
+    """
+    Convert dates into the number of days since the epoch
+    """
+    return np.asarray(dates, dtype="datetime64[D]").astype(np.int64)
+
+def time_block_codes(dataframe: pd.DataFrame, time_blocks: list,
+                     column: str = "DEP_TIME_BLK") -> np.ndarray:
+    """
+    Encode the departure time block of each flight by its position in time_blocks,
+    -1 when the flight has no departure time
+    : param column : the column of the time blocks, e.g. DEP_HOUR with the hours as
+                     time blocks
+    """
+    # get_indexer gives -1 for the missing values and the -1 hour of flights without a
+    # departure time, which a Categorical would only coerce with a deprecation warning
+    return pd.Index(time_blocks).get_indexer(dataframe[column]).astype(np.int64)
+
+def departure_hours(dep_time: pd.Series) -> np.ndarray:
+    """
+    Return the hour, 0 to 23, of departure times written as hhmm, -1 when missing
+    """
+    times = dep_time.to_numpy(dtype=np.float64)
+    hours = np.where(np.isnan(times), -1, times // 100 % 24)
+    return hours.astype(np.int8)
+
+def hours_in_range(first: int, last: int) -> list[int]:
+    """
+    Return the hours from first to last inclusive, wrapping past midnight when first
+    is after last, e.g. 22 to 2 is 22, 23, 0, 1 and 2
+    """
+    if first <= last:
+        return list(range(first, last + 1))
+    return list(range(first, 24)) + list(range(0, last + 1))
+
+def build_calendar(dataframe: pd.DataFrame) -> pd.DataFrame:
+    """
+    Return the ISO week and the week of the month of every date in the data. Weeks of
+    the month start on Monday, the first one holding the 1st, and the days after the
+    last checkbox of the weeks of the month (the sixth week of long months) belong to
+    the last one.
+    : return : a dataframe indexed by FL_DATE with WEEK and MONTH_WEEK columns
+    """
+    weeks = dataframe.groupby("FL_DATE")["WEEK"].first().astype(int)
+    dates = weeks.index
+    first_weekday = (dates - pd.to_timedelta(dates.day - 1, unit="D")).dayofweek
+    month_weeks = np.minimum((dates.day + first_weekday - 1) // 7 + 1, WEEKS_OF_MONTH)
+    return pd.DataFrame({"WEEK": weeks, "MONTH_WEEK": np.asarray(month_weeks)},
+                        index=dates)
+
+def select_days(calendar: pd.DataFrame, week: list[bool], date_range=None,
+                weekdays: list[bool] = None) -> pd.Series:
+    """
+    Return the week of each date in the calendar that is in the selected weeks of
+    the month, on the selected days of the week and between the start and end dates
+    (inclusive) of date_range
+    : param week : whether each week of the month is selected
+    : param date_range : a tuple of start and end dates, None for every date
+    : param weekdays : whether each day of the week, Monday first, is selected, None
+                       for every day
+    : return : a Series of week numbers indexed by date
+    """
+    selected_wk = [i+1 for i in range(len(week)) if week[i]]
+    days = calendar.loc[calendar["MONTH_WEEK"].isin(selected_wk), "WEEK"]
+    if date_range:
+        days = days.loc[pd.Timestamp(min(date_range)):pd.Timestamp(max(date_range))]
+    if weekdays is not None:
+        days = days[np.asarray(weekdays, dtype=bool)[days.index.dayofweek]]
+    return days
@@ -0,0 +1,279 @@
+"""Latency, memory and profile recording of the stages of user interactions"""
+import contextlib
+import cProfile
+import io
+import json
+import pstats
+import threading
+import time
+import tracemalloc
+from collections import deque
+from functools import wraps
+import numpy as np
+
+# Upper bounds in milliseconds of the buckets of the latency histograms
+BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, float("inf"))
+RECENT = 200
+
+class StageStats:
+    """
+    Number of calls, latency histogram and recent latencies of a stage
+    """
+    def __init__(self) -> None:
+        self.__counts = np.zeros(len(BUCKETS), dtype=np.int64)
+        self.__recent = deque(maxlen=RECENT)
+        self.__total = 0.0
+        self.__max = 0.0
+
+    def add(self, milliseconds: float):
+        """
+        Record one call of the stage
+        """
+        self.__counts[np.searchsorted(BUCKETS, milliseconds)] += 1
+        self.__recent.append(milliseconds)
+        self.__total += milliseconds
+        self.__max = max(self.__max, milliseconds)
+
+    def summary(self) -> dict:
+        """
+        Return the count, mean, median, 95th percentile and maximum in milliseconds of
+        the stage, the median and percentile from the most recent calls, and the
+        histogram as the number of calls up to every bound of BUCKETS
+        """
+        count = int(self.__counts.sum())
+        recent = np.fromiter(self.__recent, dtype=np.float64)
+        return {"count": count,
+                "mean_ms": self.__total / count if count else None,
+                "p50_ms": float(np.percentile(recent, 50)) if len(recent) else None,
+                "p95_ms": float(np.percentile(recent, 95)) if len(recent) else None,
+                "max_ms": self.__max,
+                "histogram": {("inf" if bound == float("inf") else str(bound)): int(number)
+                              for bound, number in zip(BUCKETS, self.__counts)}}
+
+class Instrumentation:
+    """
+    Recorder of user interactions, from the click that starts one with begin to end,
+    and of the stages timed inside them with stage. Nothing is recorded until it is
+    enabled, and a disabled stage is a shared no-op context so the cost of leaving the
+    calls in the code is one attribute check.
+    """
+    def __init__(self) -> None:
+        self.__enabled = False
+        self.__track_memory = False
+        self.__lock = threading.Lock()
+        self.__stages = {}
+        self.__interactions = deque(maxlen=RECENT)
+        self.__current = None
+        self.__profiler = None
+        self.__profile_left = 0
+        self.__profile_path = None
+        self.__profile_text = ""
+
+    @property
+    def enabled(self):
+        """
+        Getter for enabled attribute
+        """
+        return self.__enabled
+
+    @property
+    def track_memory(self):
+        """
+        Getter for track_memory attribute, whether the tracemalloc peak of every
+        interaction is recorded
+        """
+        return self.__track_memory
+
+    @property
+    def profile_text(self):
+        """
+        Getter for profile_text attribute, the summary of the last cProfile capture
+        """
+        return self.__profile_text
+
+    @property
+    def interactions(self):
+        """
+        Getter for interactions attribute, the most recent interactions first
+        """
+        return list(reversed(self.__interactions))
+
+    def enable(self, track_memory: bool = False):
+        """
+        Start recording, with the tracemalloc peak of every interaction if track_memory
+        """
+        self.__enabled = True
+        self.set_track_memory(track_memory)
+
+    def disable(self):
+        """
+        Stop recording, the statistics recorded are kept
+        """
+        self.__enabled = False
+        self.__current = None
+        self.set_track_memory(False)
+
+    def set_track_memory(self, track_memory: bool):
+        """
+        Start or stop tracemalloc, which slows allocations down while it runs
+        """
+        self.__track_memory = track_memory and self.__enabled
+        if self.__track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        elif not self.__track_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def reset(self):
+        """
+        Forget the statistics and interactions recorded
+        """
+        with self.__lock:
+            self.__stages = {}
+            self.__interactions.clear()
+
+    def profile_next(self, count: int, path: str = None):
+        """
+        Capture a cProfile trace of the next count interactions
+        : param path : file the pstats data is saved into when the capture ends
+        """
+        self.__profile_left = count
+        self.__profile_path = path
+        self.__profiler = cProfile.Profile()
+
+    def begin(self, name: str):
+        """
+        Start an interaction, e.g. at a button click, ending the unfinished one
+        """
+        if not self.__enabled:
+            return
+        if self.__current is not None:
+            self.end()
+        if self.__track_memory:
+            tracemalloc.reset_peak()
+        self.__current = {"name": name, "start": time.perf_counter(), "stages": [],
+                          "thread": threading.get_ident()}
+        if self.__profile_left:
+            self.__profiler.enable()
+
+    def end(self):
+        """
+        Finish the interaction and record its latency, with the time between begin and
+        its first stage recorded as the dispatch stage
+        """
+        current = self.__current
+        if not self.__enabled or current is None:
+            return
+        self.__current = None
+        now = time.perf_counter()
+        if self.__profile_left:
+            self.__profiler.disable()
+            self.__profile_left -= 1
+            if not self.__profile_left:
+                self.__finish_profile()
+        # Stages are added as they finish, listed in the order they started
+        current["stages"].sort(key=lambda stage: stage[1])
+        if current["stages"]:
+            dispatch = (current["stages"][0][1] - current["start"]) * 1000
+            current["stages"].insert(0, ("dispatch", current["start"], dispatch))
+            self.__record("dispatch", dispatch)
+        total = (now - current["start"]) * 1000
+        self.__record("interaction", total)
+        self.__record(f"interaction: {current['name']}", total)
+        peak = tracemalloc.get_traced_memory()[1] if self.__track_memory else None
+        self.__interactions.append({"name": current["name"],
+                                    "time": time.strftime("%H:%M:%S"),
+                                    "total_ms": total,
+                                    "peak_memory_kb": None if peak is None else peak / 1024,
+                                    "stages": [(name, duration) for name, _, duration
+                                               in current["stages"]]})
+
+    @contextlib.contextmanager
+    def __timed_stage(self, name: str):
+        """
+        Time the code run in the context and add it to the current interaction when it
+        runs in the thread of the interaction
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = (time.perf_counter() - start) * 1000
+            self.__record(name, duration)
+            current = self.__current
+            if current is not None and current["thread"] == threading.get_ident():
+                current["stages"].append((name, start, duration))
+
+    def stage(self, name: str):
+        """
+        Return a context manager timing a stage, a no-op one when disabled
+        """
+        if not self.__enabled:
+            return _DISABLED
+        return self.__timed_stage(name)
+
+    @contextlib.contextmanager
+    def suspended(self):
+        """
+        Leave the stages of background work run in the context, e.g. the warm-up, out
+        of the statistics
+        """
+        enabled = self.__enabled
+        self.__enabled = False
+        try:
+            yield
+        finally:
+            self.__enabled = enabled
+
+    def timed(self, name: str):
+        """
+        Decorator timing every call of a function as a stage
+        """
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.__enabled:
+                    return func(*args, **kwargs)
+                with self.__timed_stage(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def __record(self, name: str, milliseconds: float):
+        """
+        Add a latency to the statistics of a stage
+        """
+        with self.__lock:
+            if name not in self.__stages:
+                self.__stages[name] = StageStats()
+            self.__stages[name].add(milliseconds)
+
+    def __finish_profile(self):
+        """
+        Keep the summary of the captured profile and save it into the profile path
+        """
+        stream = io.StringIO()
+        stats = pstats.Stats(self.__profiler, stream=stream)
+        stats.sort_stats("cumulative").print_stats(30)
+        self.__profile_text = stream.getvalue()
+        if self.__profile_path:
+            stats.dump_stats(self.__profile_path)
+        self.__profiler = None
+
+    def summary(self) -> dict:
+        """
+        Return the statistics of every stage by name
+        """
+        with self.__lock:
+            return {name: stats.summary() for name, stats in sorted(self.__stages.items())}
+
+    def dump(self, path: str):
+        """
+        Save the statistics of the stages and the recent interactions as JSON
+        """
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump({"stages": self.summary(), "interactions": self.interactions},
+                      file, indent=2)
+
+_DISABLED = contextlib.nullcontext()
+# Shared by the model, controller and view
+instrumentation = Instrumentation()
@@ -0,0 +1,69 @@
+"""Ranking of routes, airports and airlines by delay statistics"""
+import numpy as np
+import pandas as pd
+
+class Leaderboard:
+    """
+    Rank the groups of a dataframe of grouped totals by a metric, selecting the best
+    and worst groups with a partial sort instead of sorting every group.
+    """
+    # metric name: (function computing the metric from the totals, whether higher is worse)
+    METRICS = {"Average Departure Delay":
+                   (lambda totals: totals["DEP_DELAY_SUM"] / totals["DEP_DELAY_COUNT"], True),
+               "Average Arrival Delay":
+                   (lambda totals: totals["ARR_DELAY_SUM"] / totals["ARR_DELAY_COUNT"], True),
+               "On-time Share":
+                   (lambda totals: totals.get("On-time", 0) / totals["FLIGHTS"], False),
+               "Cancellation Rate":
+                   (lambda totals: totals.get("Canceled", 0) / totals["FLIGHTS"], True)}
+
+    def __init__(self, totals: pd.DataFrame) -> None:
+        self.__totals = totals
+
+    def compute_metric(self, metric: str, min_flights: int = 1) -> pd.Series:
+        """
+        Return the metric of every group with at least min_flights flights
+        """
+        totals = self.__totals[self.__totals["FLIGHTS"] >= max(min_flights, 1)]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            values = self.METRICS[metric][0](totals)
+        return values.dropna()
+
+    @staticmethod
+    def top_k(values: pd.Series, k: int, largest: bool = True) -> pd.Series:
+        """
+        Return the k largest (or smallest) values in order, ties ordered by group key so
+        the result does not depend on the order of the groups. Only the values at least
+        as good as the k-th one, found with a partition, are sorted.
+        """
+        array = values.to_numpy(dtype=np.float64)
+        if not largest:
+            array = -array
+        if k <= 0:
+            return values.iloc[:0]
+        if k < len(array):
+            threshold = -np.partition(-array, k - 1)[k - 1]
+            candidates = np.flatnonzero(array >= threshold)
+        else:
+            candidates = np.arange(len(array))
+        ranks = np.empty(len(candidates), dtype=np.int64)
+        ranks[values.index[candidates].argsort()] = np.arange(len(candidates))
+        selected = candidates[np.lexsort((ranks, -array[candidates]))[:k]]
+        return values.iloc[selected]
+
+    def rank(self, metric: str, k: int = 10, min_flights: int = 1):
+        """
+        Return the worst and best k groups by the metric
+        : param metric : a key of METRICS
+        : param k : number of groups in each list
+        : param min_flights : groups with fewer flights are left out
+        : return : a tuple of dataframes (worst, best) with the metric and number of flights
+        """
+        values = self.compute_metric(metric, min_flights)
+        higher_is_worse = self.METRICS[metric][1]
+        worst = self.top_k(values, k, largest=higher_is_worse)
+        best = self.top_k(values, k, largest=not higher_is_worse)
+        # Counts, summed as floats by some backends
+        flights = self.__totals["FLIGHTS"].astype(np.int64)
+        return tuple(pd.DataFrame({metric: ranked, "FLIGHTS": flights.loc[ranked.index]})
+                     for ranked in (worst, best))
@@ -0,0 +1,103 @@
+"""Frame to show the leaderboard tab of Flight within USA displayer"""
+import tkinter as tk
+from tkinter import ttk
+from leaderboard import Leaderboard
+from search_tabs import CheckBoxFrame, ComboboxFrame
+
+class LeaderboardTab(tk.Frame):
+    """
+    A frame that show the worst and best routes, origin airports or airlines
+    by a delay statistic under the selected filter.
+    """
+    ENTITY = ["Route", "Origin Airport", "Airline"]
+    NUM_SHOWN = ["10", "5", "20", "50"]
+    MIN_FLIGHTS = ["50", "1", "10", "100", "500", "1000"]
+
+    def __init__(self, parent, controller, **kwargs) -> None:
+        super().__init__(parent, **kwargs)
+        self.controller = controller
+        self.tables = {}
+        self.init_components()
+
+    def init_components(self):
+        """
+        Create 2 tables for the worst and best entries and a frame consisted of
+        comboboxes, checkboxes and a button to refresh the tables.
+        """
+        option_frame = tk.Frame(self)
+        self.entity = ComboboxFrame(option_frame, "Rank:", self.ENTITY)
+        self.metric = ComboboxFrame(option_frame, "By:", list(Leaderboard.METRICS))
+        self.num_shown = ComboboxFrame(option_frame, "Number shown:", self.NUM_SHOWN)
+        self.min_flights = ComboboxFrame(option_frame, "Minimum flights:", self.MIN_FLIGHTS)
+        self.checkboxes = CheckBoxFrame(option_frame)
+        show_button = tk.Button(option_frame, text="Show Leaderboard",
+                                command=lambda x=1: self.after(x, self.show_leaderboard))
+        for widget in (self.entity, self.metric, self.num_shown, self.min_flights,
+                       self.checkboxes):
+            widget.pack(side="top")
+        show_button.pack(side="top", pady=10)
+        option_frame.pack(side="right", padx=10)
+        table_frame = tk.Frame(self)
+        for title in ("Worst", "Best"):
+            self.tables[title] = self.create_table(table_frame, title)
+        table_frame.pack(side="left", fill="both", expand=True)
+        self.show_leaderboard()
+
+    def create_table(self, parent, title: str):
+        """
+        Create a labeled Treeview to show ranked entries
+        : param title : the text of the label above the table
+        : return : the Treeview widget
+        """
+        label = tk.Label(parent, text=title)
+        table = ttk.Treeview(parent, columns=("rank", "name", "value", "flights"),
+                             show="headings", height=10)
+        for column, heading, width in (("rank", "#", 40), ("name", "Name", 160),
+                                       ("value", "Value", 140), ("flights", "Flights", 90)):
+            table.heading(column, text=heading)
+            table.column(column, width=width, anchor="center")
+        label.pack(side="top")
+        table.pack(side="top", fill="both", expand=True, pady=(0, 10))
+        return table
+
+    def show_leaderboard(self):
+        """
+        Get the worst and best entries from the controller and show them in the tables
+        """
+        metric = self.metric.cb_val
+        if metric not in Leaderboard.METRICS:
+            metric = list(Leaderboard.METRICS)[0]
+        try:
+            num_shown = int(self.num_shown.cb_val)
+            min_flights = int(self.min_flights.cb_val)
+        except ValueError:
+            num_shown, min_flights = 10, 1
+        index = self.ENTITY.index(self.entity.cb_val) if self.entity.cb_val in self.ENTITY else 0
+        worst, best = self.controller.leaderboard_data(index, metric, num_shown, min_flights,
+                                                       self.checkboxes.week_var,
+                                                       self.checkboxes.time_blk_var)
+        for title, data in (("Worst", worst), ("Best", best)):
+            table = self.tables[title]
+            table.delete(*table.get_children())
+            for rank, (name, row) in enumerate(data.iterrows(), start=1):
+                table.insert("", "end", values=(rank, self.format_name(name),
+                                                self.format_value(metric, row[metric]),
+                                                f"{row['FLIGHTS']:.0f}"))
+
+    @staticmethod
+    def format_name(name):
+        """
+        Return the text of a route, airport or airline key
+        """
+        if isinstance(name, tuple):
+            return " -> ".join(str(part) for part in name)
+        return str(name)
+
+    @staticmethod
+    def format_value(metric: str, value: float):
+        """
+        Return the text of a metric value
+        """
+        if metric.startswith("Average"):
+            return f"{value:.2f} min(s)"
+        return f"{value * 100:.2f} %"
@@ -1,11 +1,35 @@
 """Main part to start Flight within USA displayer app"""
+import argparse
 from model import FlightDataModel
 from view import UI
 from controller import Controller
+from instrumentation import instrumentation
 
 if __name__ == "__main__":
-    flight_model = FlightDataModel()
-    flight_controller = Controller(flight_model)
+    parser = argparse.ArgumentParser(description="Flight within USA displayer")
+    parser.add_argument("--backend", choices=FlightDataModel.BACKENDS, default="memory",
+                        help="load the datasets in memory, or query an SQLite database "
+                             "built from them for datasets larger than memory")
+    parser.add_argument("--diagnostics", nargs="?", const="diagnostics.json", default=None,
+                        metavar="PATH",
+                        help="record the latency of every interaction from the start and "
+                             "save it into PATH (diagnostics.json) on exit")
+    parser.add_argument("--track-memory", action="store_true",
+                        help="with --diagnostics, record the tracemalloc peak of every "
+                             "interaction")
+    parser.add_argument("--warmup", type=int, default=50, metavar="N",
+                        help="precompute the searches of the N routes, airports and airlines "
+                             "with the most flights while the UI is idle, 0 to turn it off")
+    args = parser.parse_args()
+    flight_model = FlightDataModel(args.backend)
+    if args.diagnostics:
+        instrumentation.enable(args.track_memory)
+    flight_controller = Controller(flight_model, args.warmup)
     flight_ui = UI(flight_controller)
     flight_controller.view = flight_ui
-    flight_controller.run()
+    try:
+        flight_controller.run()
+    finally:
+        # Also saved when recording was started from the diagnostics tab
+        if args.diagnostics or instrumentation.interactions:
+            instrumentation.dump(args.diagnostics or "diagnostics.json")
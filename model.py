@@ -1,8 +1,30 @@
 """Model to handle data processing for Flight within USA displayer"""
 from __future__ import annotations
 from abc import ABC, abstractmethod
+from collections.abc import Generator, Iterator
 import os
+import numpy as np
 import pandas as pd
+from percentiles import DelayPercentileIndex
+from prefix_sums import DailyPrefixSums
+from indexing import (build_calendar, select_days, factorize_groups, group_order,
+                      departure_hours)
+from od_matrix import ODMatrix
+from leaderboard import Leaderboard
+from route_graph import RouteGraph
+from rotation import compute_rotation_delays
+from comparison import ComparisonEngine
+from estimator import DelayEstimator
+from bootstrap import (confidence_interval, iter_grouped_confidence_intervals, run_steps,
+                       CONFIDENCE)
+from storytelling import StorytellingStats
+from disruptions import DisruptionDetector, disruption_str
+from export import EXPORT_CHUNK_SIZE
+from prefix_index import IdentifierLookup
+from instrumentation import instrumentation
+from result_store import ResultStore
+
+CHUNK_SIZE = 100_000
 
 class Subject(ABC):
     """
@@ -44,15 +66,52 @@ class FlightDataModel(Subject):
     """
     Model for computing data from the datasets
     """
-    def __init__(self) -> None:
-        self.__df = self.gen_df()
-        self.__sorted : pd.DataFrame
+    BACKENDS = ("memory", "sqlite")
+    IDENTIFIERS = ("Flight number", "Aircraft")
+    # Method of the search states computing the data of every chart
+    CHARTS = {"avg_delay": "avg_flight_delay", "on_time": "percent_on_time",
+              "time_block": "percent_time_block", "percentiles": "percentile_by_week"}
+    # Metrics of the leaderboard drawn for every airline week by week
+    AIRLINE_METRICS = ["Average Departure Delay", "Average Arrival Delay", "On-time Share"]
+
+    def __init__(self, backend: str = "memory") -> None:
+        if backend not in self.BACKENDS:
+            raise ValueError(f"backend must be one of {', '.join(self.BACKENDS)}")
+        self.__backend = backend
+        self.__sorted : pd.DataFrame = None
         self.__series : pd.Series
         self.__info : str
-        self.__states = [SearchByFlight(self.__df),
-                         SearchByAirport(self.__df),
-                         SearchByAirline(self.__df)]
+        self.__breakdown : pd.DataFrame
+        if backend == "sqlite":
+            # Imported here since the backend builds on the search states of this module
+            from sqlite_backend import (FlightDatabase, SQLiteSearchByFlight,
+                                        SQLiteSearchByAirport, SQLiteSearchByAirline)
+            self.__database = FlightDatabase.open(os.path.join(os.getcwd(), "datasets"))
+            self.__df = None
+            self.__states = [SQLiteSearchByFlight(self.__database),
+                             SQLiteSearchByAirport(self.__database),
+                             SQLiteSearchByAirline(self.__database)]
+            self.__calendar = self.__database.calendar
+            self.__od_matrix = None
+            self.__route_graph = None
+        else:
+            self.__database = None
+            self.__df = self.gen_df()
+            self.__df = self.__df.join(compute_rotation_delays(self.__df))
+            self.__states = [SearchByFlight(self.__df),
+                             SearchByAirport(self.__df),
+                             SearchByAirline(self.__df)]
+            self.__calendar = build_calendar(self.__df)
+            self.__od_matrix = ODMatrix(self.__df, SearchState.time_blocks)
+            self.__route_graph = RouteGraph(*self.get_od_matrix([True] * 5, [True] * 5))
         self.__current_state: SearchState = self.__states[0]
+        self.__current_index = 0
+        self.__results = ResultStore()
+        self.__selection = None
+        self.__comparison = None
+        self.__estimator = None
+        self.__disruptions = None
+        self.__identifiers = {}
         self.observers = []
 
     @property
@@ -62,11 +121,87 @@ class FlightDataModel(Subject):
         """
         return self.__df
 
+    @property
+    def backend(self):
+        """
+        Getter for backend attribute, "memory" or "sqlite"
+        """
+        return self.__backend
+
+    @property
+    def states(self):
+        """
+        Getter for states attribute, the search states by flight, airport and airline
+        """
+        return self.__states
+
+    @property
+    def route_graph(self):
+        """
+        Getter for route_graph attribute
+        """
+        return self.__route_graph
+
+    @property
+    def comparison(self):
+        """
+        Getter for comparison attribute, the worker processes are started on first use
+        """
+        if self.__comparison is None:
+            self.__comparison = ComparisonEngine(self.__df, SearchState.time_blocks)
+        return self.__comparison
+
+    @property
+    def estimator(self):
+        """
+        Getter for estimator attribute, the lookup tables are loaded from the datasets
+        folder unless the datasets are newer, otherwise they are built and saved there
+        """
+        if self.__estimator is None:
+            folder = os.path.join(os.getcwd(), "datasets")
+            path = os.path.join(folder, "delay_estimator.npz")
+            datasets = [os.path.join(folder, name)
+                        for name in ("Jan_2020_ontime.csv", "Airline_dataset.csv")]
+            if (os.path.exists(path) and
+                    os.path.getmtime(path) >= max(map(os.path.getmtime, datasets))):
+                self.__estimator = DelayEstimator.load(path)
+            else:
+                self.__estimator = DelayEstimator.build(self.__df, SearchState.time_blocks)
+                try:
+                    self.__estimator.save(path)
+                except OSError:
+                    pass
+        return self.__estimator
+
+    @property
+    def disruptions(self):
+        """
+        Getter for disruptions attribute, the DisruptionDetector of every flight,
+        accumulated on first use
+        """
+        if self.__disruptions is None:
+            detector = DisruptionDetector()
+            for chunk in self.iter_chunks(DisruptionDetector.COLUMNS):
+                detector.update(chunk)
+            self.__disruptions = detector
+        return self.__disruptions
+
+    @property
+    def results(self):
+        """
+        Getter for results attribute, the store of the chart data and information
+        """
+        return self.__results
+
     @property
     def sorted(self):
         """
-        Getter for sorted attribute
+        Getter for sorted attribute, the flights of the last query found again when
+        its results came from the result store
         """
+        if self.__sorted is None and self.__selection is not None:
+            state, *query = self.__selection
+            self.__sorted = state.sort_data(*query)
         return self.__sorted
 
     @sorted.setter
@@ -104,6 +239,20 @@ class FlightDataModel(Subject):
         """
         self.__info = value
 
+    @property
+    def breakdown(self):
+        """
+        Getter for breakdown attribute
+        """
+        return self.__breakdown
+
+    @breakdown.setter
+    def breakdown(self, value):
+        """
+        Setter for breakdown attribute
+        """
+        self.__breakdown = value
+
     def gen_df(self):
         """
         Read csv files as dataframe, join them and clean the data.
@@ -111,22 +260,53 @@ class FlightDataModel(Subject):
         """
         df1 = pd.read_csv(os.path.join(os.getcwd(), "datasets", "Jan_2020_ontime.csv"))
         df2 = pd.read_csv(os.path.join(os.getcwd(), "datasets", "Airline_dataset.csv"))
-        df1["ORIGIN"] = df1["ORIGIN"].str.replace('"','')
-        df1["DEST"] = df1["DEST"].str.replace('"','')
-        df2["FL_DATE"] = pd.to_datetime(df2["FL_DATE"], format="%m/%d/%y")
-        df1["FL_DATE"] = "1/" + df1["DAY_OF_MONTH"].astype(str) + "/20"
-        df1["FL_DATE"] = pd.to_datetime(df1["FL_DATE"], format="%m/%d/%y")
+        df1 = self.clean_ontime(df1)
+        df2 = self.clean_delays(df2)
         df3 = pd.merge(df1, df2, how="left",
                              left_on=["ORIGIN","DEST","DEP_TIME","ARR_TIME","FL_DATE"],
                              right_on=["ORIGIN_AIRPORT","DEST_AIRPORT","DEP_TIME",
                                        "ARR_TIME","FL_DATE"])
+        df3 = self.derive_columns(df3)
+        df3.drop(df3.columns[df3.columns.str.contains('unnamed',case = False)],
+                       axis=1, inplace=True)
+        df3.drop(["AIRLINE_ID","ORIGIN_AIRPORT","DEST_AIRPORT"], axis=1, inplace=True)
+        return df3
+
+    @staticmethod
+    def clean_ontime(df1: pd.DataFrame) -> pd.DataFrame:
+        """
+        Clean the airport codes and add the flight date of rows of the on-time dataset
+        """
+        df1["ORIGIN"] = df1["ORIGIN"].str.replace('"','')
+        df1["DEST"] = df1["DEST"].str.replace('"','')
+        df1["FL_DATE"] = "1/" + df1["DAY_OF_MONTH"].astype(str) + "/20"
+        df1["FL_DATE"] = pd.to_datetime(df1["FL_DATE"], format="%m/%d/%y")
+        return df1
+
+    @staticmethod
+    def clean_delays(df2: pd.DataFrame) -> pd.DataFrame:
+        """
+        Parse the flight date of rows of the delay dataset
+        """
+        df2["FL_DATE"] = pd.to_datetime(df2["FL_DATE"], format="%m/%d/%y")
+        return df2
+
+    @staticmethod
+    def derive_columns(df3: pd.DataFrame) -> pd.DataFrame:
+        """
+        Add the departure time block, departure hour (-1 without a departure time), ISO
+        week, day of the week (1 for Monday) and status of every flight, which only
+        depend on columns of the on-time dataset
+        """
         df3["DEP_TIME_BLK"] = ["Early Morning" if 400 <= x < 800 else
                                ("Morning" if 800 <= x < 1200 else
                                 ("Afternoon" if 1200 <= x < 1600 else
                                  ("Evening" if 1600 <= x < 1900 else
                                   ("Night" if x >= 1900 or x < 400 else None))))
                                for x in df3["DEP_TIME"]]
+        df3["DEP_HOUR"] = departure_hours(df3["DEP_TIME"])
         df3["WEEK"] = df3["FL_DATE"].dt.isocalendar().week
+        df3["DAY_OF_WEEK"] = (df3["FL_DATE"].dt.dayofweek + 1).astype(np.int8)
         df3["STATUS"] = ["Diverted" if x1 else
                          ("Canceled" if x2 else
                           ("Delayed Departure and Arrival" if x3 and x4 else
@@ -136,9 +316,6 @@ class FlightDataModel(Subject):
                                                    df3["CANCELLED"],
                                                    df3["DEP_DEL15"],
                                                    df3["ARR_DEL15"])]
-        df3.drop(df3.columns[df3.columns.str.contains('unnamed',case = False)],
-                       axis=1, inplace=True)
-        df3.drop(["AIRLINE_ID","ORIGIN_AIRPORT","DEST_AIRPORT"], axis=1, inplace=True)
         return df3
 
     def attach(self, observer: Observer):
@@ -156,93 +333,403 @@ class FlightDataModel(Subject):
         Set the model's search state
         """
         self.__current_state = self.__states[index]
+        self.__current_index = index
 
-    def get_avg_data(self, a_code: list[str], week: list[bool], time_blk: list[bool]):
+    def get_avg_data(self, a_code: list[str], week: list[bool], time_blk: list[bool],
+                     date_range=None, granularity: str = "Weekly", weekdays: list[bool] = None,
+                     hours: list[int] = None):
         """
         Update the sorted attribute to a Series required to plot a line graph of average delays
         """
-        self.sorted, self.series = self.__current_state.avg_flight_delay(a_code, week, time_blk)
-        self.info = self.__current_state.get_info_str(self.sorted)
-        self.notify()
+        with instrumentation.stage("chart data"):
+            data, self.series = self.get_chart_data(self.__current_index, "avg_delay", a_code,
+                                                    week, time_blk, date_range, weekdays, hours,
+                                                    granularity=granularity)
+        self.update_info(a_code, week, time_blk, date_range, weekdays, hours, data)
+        with instrumentation.stage("notify"):
+            self.notify()
 
-    def get_on_time_data(self, a_code: list[str], week: list[bool], time_blk: list[bool]):
+    def get_on_time_data(self, a_code: list[str], week: list[bool], time_blk: list[bool],
+                         date_range=None, weekdays: list[bool] = None, hours: list[int] = None):
         """
         Update the sorted attribute to a Series required to plot a pie chart of percentage of
         flights departing on time, with delay, diverted, or canceled
         """
-        self.sorted, self.series = self.__current_state.percent_on_time(a_code, week, time_blk)
-        self.info = self.__current_state.get_info_str(self.sorted)
-        self.notify()
+        with instrumentation.stage("chart data"):
+            data, self.series = self.get_chart_data(self.__current_index, "on_time", a_code,
+                                                    week, time_blk, date_range, weekdays, hours)
+        self.update_info(a_code, week, time_blk, date_range, weekdays, hours, data)
+        with instrumentation.stage("notify"):
+            self.notify()
 
-    def get_time_blk_data(self, a_code: list[str], week: list[bool], time_blk: list[bool]):
+    def get_time_blk_data(self, a_code: list[str], week: list[bool], time_blk: list[bool],
+                          date_range=None, weekdays: list[bool] = None, hours: list[int] = None):
         """
         Update the sorted attribute to a Series required to plot a pie chart of percentage of
         flights in each departure time block
         """
-        self.sorted, self.series = self.__current_state.percent_time_block(a_code, week, time_blk)
-        self.info = self.__current_state.get_info_str(self.sorted)
-        self.notify()
+        with instrumentation.stage("chart data"):
+            data, self.series = self.get_chart_data(self.__current_index, "time_block", a_code,
+                                                    week, time_blk, date_range, weekdays, hours)
+        self.update_info(a_code, week, time_blk, date_range, weekdays, hours, data)
+        with instrumentation.stage("notify"):
+            self.notify()
+
+    def get_percentile_data(self, a_code: list[str], week: list[bool], time_blk: list[bool],
+                            date_range=None, weekdays: list[bool] = None,
+                            hours: list[int] = None):
+        """
+        Update the sorted attribute to a DataFrame required to plot a line graph of
+        delay percentiles in each week
+        """
+        with instrumentation.stage("chart data"):
+            data, self.series = self.get_chart_data(self.__current_index, "percentiles", a_code,
+                                                    week, time_blk, date_range, weekdays, hours)
+        self.update_info(a_code, week, time_blk, date_range, weekdays, hours, data)
+        with instrumentation.stage("notify"):
+            self.notify()
+
+    def update_info(self, a_code: list[str], week: list[bool], time_blk: list[bool],
+                    date_range=None, weekdays: list[bool] = None, hours: list[int] = None,
+                    data: pd.DataFrame = None):
+        """
+        Update the info attribute to the delay statistics of the selected filter, the
+        breakdown attribute to its flights by airline or airport and the sorted
+        attribute to its flights
+        : param data : the flights of the filter if they were just computed, otherwise
+                       they are only found again when needed
+        """
+        self.info, self.breakdown = self.get_info_data(self.__current_index, a_code, week,
+                                                       time_blk, date_range, weekdays, hours,
+                                                       data=data)
+        self.sorted = data
+        self.__selection = (self.__current_state, a_code, week, time_blk, date_range,
+                            weekdays, hours)
+
+    def filter_key(self, index: int, a_code: list[str], week: list[bool],
+                   time_blk: list[bool], date_range=None, weekdays: list[bool] = None,
+                   hours: list[int] = None) -> tuple:
+        """
+        Return the key of a filter of the search state index in the result store, the
+        same however the selected group is spelled and whether every day of the week
+        and hour is given or left as None
+        """
+        weekdays = (True,) * 7 if weekdays is None else tuple(map(bool, weekdays))
+        hours = tuple(SearchState.hours if hours is None else sorted(set(hours)))
+        return (index, self.__states[index].group_key(a_code), tuple(map(bool, week)),
+                tuple(map(bool, time_blk)), None if date_range is None else tuple(date_range),
+                weekdays, hours)
+
+    def get_chart_data(self, index: int, chart: str, a_code: list[str], week: list[bool],
+                       time_blk: list[bool], date_range=None, weekdays: list[bool] = None,
+                       hours: list[int] = None, **options):
+        """
+        Return the data of a chart of the search state index from the result store,
+        computing and storing it when it is not there
+        : param chart : a key of CHARTS
+        : param options : other arguments of the chart, e.g. granularity
+        : return : the flights under the filter, None when the data was stored, and the
+                   data of the chart
+        """
+        return run_steps(self.iter_chart_data(index, chart, a_code, week, time_blk,
+                                              date_range, weekdays, hours, **options))
+
+    def iter_chart_data(self, index: int, chart: str, a_code: list[str], week: list[bool],
+                        time_blk: list[bool], date_range=None, weekdays: list[bool] = None,
+                        hours: list[int] = None, **options) -> Generator:
+        """
+        Compute get_chart_data in steps when the search state has an iter_ version of the
+        chart method, e.g. iter_avg_flight_delay, and in a single step otherwise
+        : return : a generator returning the result of get_chart_data
+        """
+        key = (chart, self.filter_key(index, a_code, week, time_blk, date_range, weekdays,
+                                      hours), tuple(sorted(options.items())))
+        series = self.__results.get(key)
+        if series is not None:
+            return None, series
+        state = self.__states[index]
+        method = self.CHARTS[chart]
+        arguments = (a_code, week, time_blk, date_range)
+        options.update(weekdays=weekdays, hours=hours)
+        if hasattr(state, f"iter_{method}"):
+            data, series = yield from getattr(state, f"iter_{method}")(*arguments, **options)
+        else:
+            data, series = getattr(state, method)(*arguments, **options)
+        self.__results.put(key, series)
+        return data, series
+
+    def get_info_data(self, index: int, a_code: list[str], week: list[bool],
+                      time_blk: list[bool], date_range=None, weekdays: list[bool] = None,
+                      hours: list[int] = None, data: pd.DataFrame = None):
+        """
+        Return the information string and breakdown of a filter of the search state
+        index from the result store, computing and storing them when they are not there
+        : param data : the flights under the filter, found again when None
+        """
+        key = self.filter_key(index, a_code, week, time_blk, date_range, weekdays, hours)
+        result = self.__results.get(key)
+        if result is not None:
+            return result
+        state = self.__states[index]
+        if data is None:
+            data = state.sort_data(a_code, week, time_blk, date_range, weekdays, hours)
+        with instrumentation.stage("delay percentiles"):
+            percentiles = state.delay_percentiles(a_code, week, time_blk, date_range,
+                                                  weekdays, hours)
+        with instrumentation.stage("get_info_str"):
+            info = state.get_info_str(data, percentiles)
+        with instrumentation.stage("breakdown"):
+            breakdown = state.get_breakdown(data)
+        self.__results.put(key, (info, breakdown))
+        return info, breakdown
+
+    def popular_filters(self, limit: int) -> Iterator[tuple]:
+        """
+        Yield the filters of the routes, origin airports and airlines with the most
+        flights, the most popular of every search state first, then the second ones.
+        The groups of a search state are ranked when its first filter is needed.
+        : return : an iterator of (search state index, filter) tuples
+        """
+        everything = [True] * 5
+        ranked = {}
+        for rank in range(limit):
+            for index, state in enumerate(self.__states):
+                if index not in ranked:
+                    flights = state.group_totals(everything, everything)["FLIGHTS"]
+                    keys = flights.sort_values(ascending=False, kind="stable").index[:limit]
+                    ranked[index] = [[str(part) for part in key] if isinstance(key, tuple)
+                                     else [str(key)] for key in keys]
+                if rank < len(ranked[index]):
+                    yield index, ranked[index][rank]
+
+    def get_destinations(self) -> dict:
+        """
+        Return a dict of the set of destination airports of every origin airport
+        """
+        if self.__database is not None:
+            return self.__database.destinations()
+        return self.route_graph.destinations()
+
+    def get_airlines(self) -> list[str]:
+        """
+        Return the airline IDs as sorted strings
+        """
+        if self.__database is not None:
+            return self.__database.airlines()
+        return sorted(self.df["OP_CARRIER_AIRLINE_ID"].apply(str).unique())
+
+    def get_dates(self) -> list[str]:
+        """
+        Return the dates of the flights as YYYY-MM-DD strings
+        """
+        return list(self.__calendar.index.strftime("%Y-%m-%d"))
+
+    def get_od_matrix(self, week: list[bool], time_blk: list[bool], date_range=None):
+        """
+        Return the airports and a dict of origin-destination matrices of number of flights,
+        average delays and cancellation rate of the flights in the selected filter
+        """
+        days = select_days(self.__calendar, week, date_range).index
+        selected_time_blk = [blk for blk, selected in zip(SearchState.time_blocks, time_blk)
+                             if selected]
+        return self.__od_matrix.airports, self.__od_matrix.compute(days, selected_time_blk)
+
+    def get_comparison(self, kind: str, keys: list, week: list[bool], time_blk: list[bool],
+                       date_range=None):
+        """
+        Return a DataFrame of weekly average delays and a DataFrame of status counts of
+        several airports (kind "ORIGIN") or airlines (kind "AIRLINE") to be compared
+        """
+        days = select_days(self.__calendar, week, date_range)
+        selected_time_blk = [blk for blk, selected in zip(SearchState.time_blocks, time_blk)
+                             if selected]
+        return self.comparison.compare(kind, keys, days, selected_time_blk)
+
+    def get_connections(self, origin: str, dest: str, min_flights: int = 1):
+        """
+        Return a DataFrame of the direct route and one-stop itineraries from origin to dest,
+        ranked by combined arrival delay and cancellation risk
+        """
+        return self.route_graph.connections(origin, dest, min_flights)
+
+    def estimate_delay(self, origin: str, dest: str, airline, weekday: int, dep_time: float):
+        """
+        Return a dict of the expected delays and cancellation probability of a planned flight
+        : param weekday : day of the week, 1 for Monday to 7 for Sunday
+        : param dep_time : scheduled departure time in hhmm, e.g. 1435
+        """
+        return self.estimator.estimate(origin, dest, airline, weekday, dep_time)
+
+    def identifier_lookup(self, kind: str) -> IdentifierLookup:
+        """
+        Return the lookup of flight numbers, e.g. "XX146", or tail numbers of aircraft,
+        built on first use
+        : param kind : a value of IDENTIFIERS
+        """
+        if kind not in self.__identifiers:
+            if kind == "Flight number":
+                identifiers = (self.df["OP_UNIQUE_CARRIER"] +
+                               self.df["OP_CARRIER_FL_NUM"].astype(str))
+            elif kind == "Aircraft":
+                identifiers = self.df["TAIL_NUM"]
+            else:
+                raise ValueError(f"kind must be one of {', '.join(self.IDENTIFIERS)}")
+            self.__identifiers[kind] = IdentifierLookup(identifiers)
+        return self.__identifiers[kind]
+
+    def search_identifiers(self, kind: str, prefix: str, limit: int = None) -> list[tuple]:
+        """
+        Return the flight or tail numbers starting with prefix and their number of
+        flights, most flights first
+        """
+        return self.identifier_lookup(kind).matches(prefix.strip(), limit)
+
+    def get_identifier_flights(self, kind: str, key: str):
+        """
+        Return a summary string and a DataFrame, in date order, of the flights of a
+        flight or tail number
+        """
+        rows = self.identifier_lookup(kind).rows(key)
+        flights = self.df.iloc[rows].sort_values(["FL_DATE", "DEP_TIME"])
+        if flights.empty:
+            return "No flights found", flights
+        routes = (flights["ORIGIN"] + "-" + flights["DEST"]).value_counts()
+        on_time = (flights["STATUS"] == "On-time").mean() * 100
+        temp_str = (f"{kind}: {key}\n"
+                    f"Number of Flight(s): {len(flights)}\n"
+                    f"Route(s): {', '.join(routes.index[:5])}"
+                    f"{' ...' if len(routes) > 5 else ''}\n"
+                    f"AVG DEP Delay: {flights['DEP_DELAY'].mean():.2f} min(s)\n"
+                    f"AVG ARR Delay: {flights['ARR_DELAY'].mean():.2f} min(s)\n"
+                    f"On-time: {on_time:.2f}%\n"
+                    f"Canceled: {int((flights['STATUS'] == 'Canceled').sum())}")
+        return temp_str, flights
+
+    def get_leaderboard(self, index: int, metric: str, k: int, min_flights: int,
+                        week: list[bool], time_blk: list[bool], date_range=None):
+        """
+        Return dataframes of the worst and best k groups of a search state by the metric
+        : param index : the index of the search state whose groups are ranked
+        """
+        totals = self.__states[index].group_totals(week, time_blk, date_range)
+        return Leaderboard(totals).rank(metric, k, min_flights)
+
+    def get_airline_weekly(self, week: list[bool], time_blk: list[bool], date_range=None,
+                           weekdays: list[bool] = None, hours: list[int] = None) -> dict:
+        """
+        Return the weekly value of every metric of AIRLINE_METRICS for every airline,
+        from the totals of every airline in every week computed at once
+        : return : a dict of dataframes by metric, with airlines as rows, the busiest
+                   first, and weeks as columns, NaN in weeks without flights
+        """
+        totals = self.__states[2].weekly_group_totals(week, time_blk, date_range, weekdays,
+                                                      hours)
+        flights = totals["FLIGHTS"].unstack("WEEK", fill_value=0).sum(axis=1)
+        airlines = flights[flights > 0].sort_values(ascending=False, kind="stable").index
+        weeks = totals.index.unique("WEEK")
+        leaderboard = Leaderboard(totals)
+        return {metric: leaderboard.compute_metric(metric).unstack("WEEK").reindex(
+                    index=airlines, columns=weeks)
+                for metric in self.AIRLINE_METRICS}
+
+    def get_disruptions(self, min_flights: int = 20, threshold: float = 3.5) -> pd.DataFrame:
+        """
+        Return the days an airport had unusually many cancellations or long delays
+        : param min_flights : days of an airport with fewer flights are left out
+        : param threshold : the lowest robust z-score of a disruption
+        """
+        return self.disruptions.detect(min_flights, threshold)
+
+    def iter_chunks(self, columns: list[str], chunksize: int = CHUNK_SIZE):
+        """
+        Yield the columns of every flight in chunks of at most chunksize rows, read from
+        the database with the SQLite backend
+        """
+        if self.__database is not None:
+            yield from self.__database.chunks(columns, chunksize)
+            return
+        for start in range(0, len(self.df), chunksize):
+            yield self.df.iloc[start:start + chunksize][columns]
+
+    def export_chunks(self, scope: str, week: list[bool], time_blk: list[bool],
+                      date_range=None, weekdays: list[bool] = None, hours: list[int] = None,
+                      chunksize: int = EXPORT_CHUNK_SIZE):
+        """
+        Yield the flights to export in chunks with the fraction of the data read, slicing
+        the data instead of copying it whole
+        : param scope : "selection" for the flights in the sorted attribute, "all" for
+                        the flights of every group under the filter
+        """
+        if scope == "selection":
+            data = self.sorted
+            for start in range(0, len(data), chunksize):
+                yield (data.iloc[start:start + chunksize],
+                       min(start + chunksize, len(data)) / len(data))
+            return
+        days = select_days(self.__calendar, week, date_range, weekdays).index
+        selected_hours = SearchState.select_hours(time_blk, hours)
+        if self.__database is not None:
+            yield from self.__database.filtered_chunks(days, selected_hours, chunksize)
+            return
+        for start in range(0, len(self.df), chunksize):
+            chunk = self.df.iloc[start:start + chunksize]
+            chunk = chunk[chunk["FL_DATE"].isin(days) & chunk["DEP_HOUR"].isin(selected_hours)]
+            yield chunk, min(start + chunksize, len(self.df)) / len(self.df)
 
     def get_data_story_telling_data(self):
         """
-        Return a list consisted of descriptive statistics(string), dataframe and series needed
-        to show the data story telling page
+        Return a list consisted of descriptive statistics(string), the number of flights
+        of every departure and arrival delay, dataframes needed to show the data story
+        telling page, computed in one pass over chunks of the flights
         """
         data_list = []
-        dep_stats = list(self.df["DEP_DELAY"].describe().values)
-        dep_median = self.df["DEP_DELAY"].median()
-        dep_mode = self.df["DEP_DELAY"].mode().values
-        arr_stats = list(self.df["ARR_DELAY"].describe().values)
-        arr_median = self.df["ARR_DELAY"].median()
-        arr_mode = self.df["ARR_DELAY"].mode()
+        stats = StorytellingStats(SearchState.time_blocks)
+        detector = None
+        columns = StorytellingStats.COLUMNS
+        if self.__disruptions is None:
+            # Accumulated in the same pass over the flights
+            detector = DisruptionDetector()
+            columns = columns + [column for column in DisruptionDetector.COLUMNS
+                                 if column not in columns]
+        for chunk in self.iter_chunks(columns):
+            stats.update(chunk)
+            if detector is not None:
+                detector.update(chunk)
+        if detector is not None:
+            self.__disruptions = detector
+        dep_stats = stats.delays["DEP_DELAY"].describe()
+        arr_stats = stats.delays["ARR_DELAY"].describe()
         temp_str = ("*Departure Delay Statistics*\n"
-                    f"Mean:   {dep_stats[1]:.2f}\n"
-                    f"Median: {dep_median:.2f}\n"
-                    f"Mode:   {dep_mode[0]:.2f}\n"
-                    f"Min:    {dep_stats[3]:.2f}\n"
-                    f"Max:    {dep_stats[7]:.2f}\n"
-                    f"VAR:    {dep_stats[2]**2:.2f}\n"
-                    f"SD:     {dep_stats[2]:.2f}\n"
-                    f"CV:     {dep_stats[2]/dep_stats[1]:.2f}\n"
-                    f"IQR:    {dep_stats[6]-dep_stats[4]:.2f}\n\n"
+                    f"Mean:   {dep_stats['mean']:.2f}\n"
+                    f"Median: {dep_stats['median']:.2f}\n"
+                    f"Mode:   {dep_stats['mode']:.2f}\n"
+                    f"Min:    {dep_stats['min']:.2f}\n"
+                    f"Max:    {dep_stats['max']:.2f}\n"
+                    f"VAR:    {dep_stats['std']**2:.2f}\n"
+                    f"SD:     {dep_stats['std']:.2f}\n"
+                    f"CV:     {dep_stats['std']/dep_stats['mean']:.2f}\n"
+                    f"IQR:    {dep_stats['75%']-dep_stats['25%']:.2f}\n\n"
                     "*Arrival Delay Statistics*\n"
-                    f"Mean:   {arr_stats[1]:.2f}\n"
-                    f"Median: {arr_median:.2f}\n"
-                    f"Mode:   {arr_mode[0]:.2f}\n"
-                    f"Min:    {arr_stats[3]:.2f}\n"
-                    f"Max:    {arr_stats[7]:.2f}\n"
-                    f"VAR:    {arr_stats[2]**2:.2f}\n"
-                    f"SD:     {arr_stats[2]:.2f}\n"
-                    f"CV:     {arr_stats[2]/dep_stats[1]:.2f}\n"
-                    f"IQR:    {arr_stats[6]-dep_stats[4]:.2f}\n\n"
+                    f"Mean:   {arr_stats['mean']:.2f}\n"
+                    f"Median: {arr_stats['median']:.2f}\n"
+                    f"Mode:   {arr_stats['mode']:.2f}\n"
+                    f"Min:    {arr_stats['min']:.2f}\n"
+                    f"Max:    {arr_stats['max']:.2f}\n"
+                    f"VAR:    {arr_stats['std']**2:.2f}\n"
+                    f"SD:     {arr_stats['std']:.2f}\n"
+                    f"CV:     {arr_stats['std']/dep_stats['mean']:.2f}\n"
+                    f"IQR:    {arr_stats['75%']-dep_stats['25%']:.2f}\n\n"
                     "Most flights were departed early and arrived early as well. "
                     "Week 3 of the month had the hightest amount of flights with delay. "
                     "Flight departed at night had the highest chance of being delayed. "
-                    "Early morning flights at the end of the month are recommended. ")
-        dep_delay_df = self.df["DEP_DELAY"]
-        arr_delay_df = self.df["ARR_DELAY"]
-        average_delay_series = self.df[["DEP_DELAY",
-                                        "ARR_DELAY",
-                                        "DAY_OF_MONTH"]].groupby("DAY_OF_MONTH").mean()
-        flight_status_week = self.df[["STATUS",
-                                      "WEEK"]].groupby("WEEK").value_counts().reset_index()
-        flight_status_week_df = flight_status_week.pivot(index="WEEK",
-                                                         columns="STATUS",
-                                                         values="count")
-        flight_status_time = self.df[["STATUS",
-                                     "DEP_TIME_BLK"]].groupby("DEP_TIME_BLK")\
-                                         .value_counts().reset_index()
-        flight_status_time_df = flight_status_time.pivot(index="DEP_TIME_BLK",
-                                                         columns="STATUS",
-                                                         values="count").reindex(
-                                                             ["Early Morning", "Morning",
-                                                              "Afternoon", "Evening", "Night"])
+                    "Early morning flights at the end of the month are recommended. "
+                    + disruption_str(self.get_disruptions()))
         data_list.append(temp_str)
-        data_list.append(dep_delay_df)
-        data_list.append(arr_delay_df)
-        data_list.append(average_delay_series)
-        data_list.append(flight_status_week_df)
-        data_list.append(flight_status_time_df)
+        data_list.append(stats.delays["DEP_DELAY"].histogram)
+        data_list.append(stats.delays["ARR_DELAY"].histogram)
+        data_list.append(stats.avg_delay_by_day())
+        data_list.append(stats.status_by_week())
+        data_list.append(stats.status_by_time_block())
         return data_list
 
 class SearchState(ABC):
@@ -254,9 +741,28 @@ class SearchState(ABC):
                       2: "Afternoon",
                       3: "Evening",
                       4: "Night"}
+    time_blocks = list(_time_blk_dict.values())
+    # Time block of every departure hour from midnight, the bins of the indexes
+    _hour_blk = (["Night"] * 4 + ["Early Morning"] * 4 + ["Morning"] * 4 + ["Afternoon"] * 4
+                 + ["Evening"] * 3 + ["Night"] * 5)
+    hours = list(range(24))
+    weekday_names = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday",
+                     "Sunday"]
+    _group_columns: list[str]
+    # Column of the airlines or airports listed in the breakdown of the information
+    breakdown_column: str
 
     def __init__(self, dataframe: pd.DataFrame) -> None:
         self._df = dataframe
+        self._calendar = build_calendar(dataframe)
+        # Factorized once for the indexes and the rows of every group
+        self._groups = factorize_groups(dataframe, self._group_columns)
+        self._percentile_index = DelayPercentileIndex(dataframe, self._group_columns,
+                                                      self.hours, column="DEP_HOUR",
+                                                      groups=self._groups)
+        self._prefix_sums = DailyPrefixSums(dataframe, self._group_columns, self.hours,
+                                            "DEP_HOUR", groups=self._groups)
+        self._group_index = None
 
     @property
     def df(self):
@@ -273,58 +779,273 @@ class SearchState(ABC):
         t_bk = [self._time_blk_dict[i] for i in range(5) if time_blk[i]]
         return wk, t_bk
 
-    @abstractmethod
-    def sort_data(self, filt: list[str], week: list[bool], time_blk: list[bool]):
+    def select_days(self, week: list[bool], date_range=None,
+                    weekdays: list[bool] = None) -> pd.Series:
+        """
+        Return the week of each date in the data that is in the selected weeks of
+        the month, on the selected days of the week and between the start and end dates
+        (inclusive) of date_range
+        : param date_range : a tuple of start and end dates, None for every date
+        : param weekdays : whether each day of the week, Monday first, is selected, None
+                           for every day
+        : return : a Series of week numbers indexed by date
+        """
+        return select_days(self._calendar, week, date_range, weekdays)
+
+    @classmethod
+    def select_hours(cls, time_blk: list[bool], hours: list[int] = None) -> list[int]:
+        """
+        Return the departure hours in the selected time blocks and hours
+        : param hours : departure hours selected, None for every hour
+        """
+        selected_time_blk = {blk for blk, selected in zip(cls.time_blocks, time_blk)
+                             if selected}
+        return [hour for hour in cls.hours if cls._hour_blk[hour] in selected_time_blk
+                and (hours is None or hour in hours)]
+
+    def build_group_index(self):
+        """
+        Store the rows of every group next to each other unless they are stored, on the
+        first search of the state or ahead of it, e.g. by the warm-up
+        """
+        if self._group_index is None:
+            codes, lookup = self._groups
+            order = group_order(codes)
+            bounds = np.searchsorted(codes[order], np.arange(len(lookup) + 1))
+            # Assigned at once so concurrent readers never see a partial index
+            self._group_index = (lookup, order, bounds)
+
+    def group_positions(self, filt: list[str]) -> np.ndarray:
+        """
+        Return the row positions of the flights of the selected group, found from the
+        rows of every group stored next to each other so the whole dataframe is not
+        scanned
+        """
+        self.build_group_index()
+        lookup, order, bounds = self._group_index
+        code = lookup.get(self.group_key(filt))
+        if code is None:
+            return order[:0]
+        return order[bounds[code]:bounds[code + 1]]
+
+    def group_rows(self, filt: list[str]) -> pd.DataFrame:
+        """
+        Return the flights of the selected group
+        """
+        return self.df.iloc[self.group_positions(filt)]
+
+    @instrumentation.timed("sort_data")
+    def sort_data(self, filt: list[str], week: list[bool], time_blk: list[bool],
+                  date_range=None, weekdays: list[bool] = None, hours: list[int] = None):
         """
         Return a sorted dataframe using the parameters as the filter
         """
+        # Looked up by departure hour, the last item for flights without one (-1)
+        hour_mask = np.zeros(len(self.hours) + 1, dtype=bool)
+        hour_mask[self.select_hours(time_blk, hours)] = True
+        days = self.select_days(week, date_range, weekdays).index
+        # Filtered on the positions so only the selected rows are copied
+        positions = self.group_positions(filt)
+        selected = (hour_mask[self.df["DEP_HOUR"].to_numpy()[positions]] &
+                    np.isin(self.df["FL_DATE"].to_numpy()[positions], days.to_numpy()))
+        return self.df.iloc[positions[selected]]
+
+    @abstractmethod
+    def group_key(self, filt: list[str]):
+        """
+        Return the key of the selected group in the percentile index
+        """
         raise NotImplementedError
 
     @abstractmethod
-    def get_info_str(self, data: pd.DataFrame):
+    def get_info_str(self, data: pd.DataFrame, percentiles: dict):
         """
         Return a string consisted of delay statistics and relevant information
         """
         raise NotImplementedError
 
-    def avg_flight_delay(self, filt: list[str], week: list[bool], time_blk: list[bool]):
+    def get_breakdown(self, data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Return a DataFrame with one row of number of flights and average delays for
+        every value of breakdown_column in the data
+        """
+        columns = [self.breakdown_column, "FLIGHTS", "DEP_DELAY", "ARR_DELAY"]
+        if data.empty:
+            return pd.DataFrame(columns=columns)
+        breakdown = data.groupby(self.breakdown_column).agg(
+            FLIGHTS=(self.breakdown_column, "size"), DEP_DELAY=("DEP_DELAY", "mean"),
+            ARR_DELAY=("ARR_DELAY", "mean"))
+        return breakdown.reset_index()[columns]
+
+    def group_totals(self, week: list[bool], time_blk: list[bool], date_range=None,
+                     weekdays: list[bool] = None, hours: list[int] = None):
+        """
+        Return a DataFrame of flight count, delay sums and status counts of every group,
+        including flights without departure time when every hour is selected
+        """
+        selected_hours = self.select_hours(time_blk, hours)
+        if len(selected_hours) == len(self.hours):
+            selected_hours.append(None)
+        days = self.select_days(week, date_range, weekdays).index
+        return self._prefix_sums.group_totals(days, selected_hours)
+
+    def weekly_group_totals(self, week: list[bool], time_blk: list[bool], date_range=None,
+                            weekdays: list[bool] = None, hours: list[int] = None):
+        """
+        Return a DataFrame of flight count, delay sums and status counts of every group
+        in every selected week of the month, indexed by week and group
+        """
+        selected_hours = self.select_hours(time_blk, hours)
+        if len(selected_hours) == len(self.hours):
+            selected_hours.append(None)
+        days = self.select_days(week, date_range, weekdays)
+        return self._prefix_sums.weekly_group_totals(days, selected_hours)
+
+    def delay_percentiles(self, filt: list[str], week: list[bool], time_blk: list[bool],
+                          date_range=None, weekdays: list[bool] = None,
+                          hours: list[int] = None):
+        """
+        Return a dict of departure and arrival delay percentiles of the selected group
+        """
+        selected_hours = self.select_hours(time_blk, hours)
+        days = self.select_days(week, date_range, weekdays).index
+        key = self.group_key(filt)
+        return {column: self._percentile_index.percentiles(key, days, selected_hours, column)
+                for column in ("DEP_DELAY", "ARR_DELAY")}
+
+    def propagation_str(self, data: pd.DataFrame) -> str:
+        """
+        Return a section of the share of departure delay caused by late arriving aircraft
+        """
+        propagated = data["PROPAGATED_DELAY"].sum()
+        originated = data["ORIGINATED_DELAY"].sum()
+        total = propagated + originated
+        share = propagated / total * 100 if total else 0
+        return ("*Delay Propagation*\n"
+                f"Propagated Delay: {data['PROPAGATED_DELAY'].mean():.2f} min(s)\n"
+                f"Originated Delay: {data['ORIGINATED_DELAY'].mean():.2f} min(s)\n"
+                f"Late Aircraft:    {share:.2f} %\n\n")
+
+    def interval_str(self, data: pd.DataFrame) -> str:
+        """
+        Return a section of the bootstrap confidence intervals of the average delays
+        and the share of on-time flights
+        """
+        dep_low, dep_high = confidence_interval(data["DEP_DELAY"])
+        arr_low, arr_high = confidence_interval(data["ARR_DELAY"])
+        on_time_low, on_time_high = confidence_interval(data["STATUS"] == "On-time")
+        return (f"*{CONFIDENCE * 100:.0f}% Confidence Intervals*\n"
+                f"AVG DEP Delay: {dep_low:.2f} to {dep_high:.2f} min(s)\n"
+                f"AVG ARR Delay: {arr_low:.2f} to {arr_high:.2f} min(s)\n"
+                f"On-time Share: {on_time_low * 100:.2f} to {on_time_high * 100:.2f} %\n\n")
+
+    def percentile_str(self, percentiles) -> str:
+        """
+        Return lines of delay percentiles to be added to the delay statistics
+        """
+        return "".join(f"P{q} Delay:      {value:.2f} min(s)\n"
+                       for q, value in zip(DelayPercentileIndex.PERCENTILES, percentiles))
+
+    def avg_flight_delay(self, filt: list[str], week: list[bool], time_blk: list[bool],
+                         date_range=None, granularity: str = "Weekly",
+                         weekdays: list[bool] = None, hours: list[int] = None):
         """
         Return a Series object required to plot a line graph of average delays
+        in each week, or in each day if granularity is "Daily", day of the week if
+        "Weekday" or departure hour if "Hourly", with the bounds of their bootstrap
+        confidence intervals
+        """
+        return run_steps(self.iter_avg_flight_delay(filt, week, time_blk, date_range,
+                                                    granularity, weekdays, hours))
+
+    def iter_avg_flight_delay(self, filt: list[str], week: list[bool], time_blk: list[bool],
+                              date_range=None, granularity: str = "Weekly",
+                              weekdays: list[bool] = None,
+                              hours: list[int] = None) -> Generator:
         """
-        temp_df = self.sort_data(filt, week, time_blk)
-        temp_series = temp_df[["DEP_DELAY","ARR_DELAY","WEEK"]].groupby("WEEK").mean()
+        Compute avg_flight_delay in steps, yielding after the flights are found and after
+        the bootstrap of every period, so the warm-up never runs it in one go
+        : return : a generator returning the result of avg_flight_delay
+        """
+        temp_df = self.sort_data(filt, week, time_blk, date_range, weekdays, hours)
+        yield
+        days = self.select_days(week, date_range, weekdays)
+        selected_hours = self.select_hours(time_blk, hours)
+        if granularity == "Hourly":
+            daily = self._prefix_sums.time_block_totals(self.group_key(filt), days.index,
+                                                        selected_hours)
+        else:
+            daily = self._prefix_sums.daily(self.group_key(filt), days.index, selected_hours)
+        if granularity == "Daily":
+            periods = temp_df["FL_DATE"]
+        elif granularity == "Weekday":
+            daily = daily.groupby(pd.Index(daily.index.dayofweek + 1, dtype=np.int64,
+                                           name="DAY_OF_WEEK")).sum()
+            periods = temp_df["DAY_OF_WEEK"]
+        elif granularity == "Hourly":
+            periods = temp_df["DEP_HOUR"]
+        else:
+            daily = daily.groupby(days.loc[daily.index].rename("WEEK")).sum()
+            periods = temp_df["FL_DATE"].map(days).rename("WEEK")
+        temp_series = DailyPrefixSums.average_delay(daily)
+        intervals = yield from iter_grouped_confidence_intervals(
+            temp_df[["DEP_DELAY", "ARR_DELAY"]], periods)
+        temp_series = temp_series.join(intervals)
         return temp_df, temp_series
 
-    def percent_on_time(self, filt: list[str], week: list[bool], time_blk: list[bool]):
+    def percent_on_time(self, filt: list[str], week: list[bool], time_blk: list[bool],
+                        date_range=None, weekdays: list[bool] = None, hours: list[int] = None):
         """
         Return a Series object required to plot a pie chart of percentage of flights
         departing on time, with delay, diverted, or canceled
         """
-        temp_df = self.sort_data(filt, week, time_blk)
-        temp_series = temp_df["STATUS"].value_counts()
+        temp_df = self.sort_data(filt, week, time_blk, date_range, weekdays, hours)
+        days = self.select_days(week, date_range, weekdays)
+        selected_hours = self.select_hours(time_blk, hours)
+        totals = self._prefix_sums.totals(self.group_key(filt), days.index, selected_hours)
+        temp_series = self._prefix_sums.status_counts(totals)
         return temp_df, temp_series
 
-    def percent_time_block(self, filt: list[str], week: list[bool], time_blk: list[bool]):
+    def percent_time_block(self, filt: list[str], week: list[bool], time_blk: list[bool],
+                           date_range=None, weekdays: list[bool] = None,
+                           hours: list[int] = None):
         """
         Reture a Series object required to plot a pie chart of percentage of flights
         in each departure time block
         """
-        temp_df = self.sort_data(filt, week, time_blk)
-        temp_series = temp_df["DEP_TIME_BLK"].value_counts()
+        temp_df = self.sort_data(filt, week, time_blk, date_range, weekdays, hours)
+        days = self.select_days(week, date_range, weekdays)
+        selected_hours = self.select_hours(time_blk, hours)
+        counts = self._prefix_sums.time_block_counts(self.group_key(filt), days.index)
+        counts = counts[counts.index.isin(selected_hours)]
+        temp_series = counts.groupby(np.array(self._hour_blk, dtype=object)[counts.index]).sum()
+        return temp_df, temp_series.sort_values(ascending=False).rename("count")
+
+    def percentile_by_week(self, filt: list[str], week: list[bool], time_blk: list[bool],
+                           date_range=None, weekdays: list[bool] = None,
+                           hours: list[int] = None):
+        """
+        Return a DataFrame object required to plot a line graph of delay percentiles
+        in each week
+        """
+        temp_df = self.sort_data(filt, week, time_blk, date_range, weekdays, hours)
+        selected_hours = self.select_hours(time_blk, hours)
+        days = self.select_days(week, date_range, weekdays)
+        temp_series = self._percentile_index.weekly_percentiles(self.group_key(filt), days,
+                                                                selected_hours)
         return temp_df, temp_series
 
 class SearchByFlight(SearchState):
     """
     A state for sorting the dataframe using flight as the filter
     """
-    def sort_data(self, filt: list[str], week: list[bool], time_blk: list[bool]):
-        selected_wk, selected_time_blk = self.convert_bool_to_filter(week,time_blk)
-        return self.df.loc[(self.df["ORIGIN"] == filt[0]) &
-                            (self.df["DEST"] == filt[1]) &
-                            (self.df["WEEK"].isin(selected_wk)) &
-                            (self.df["DEP_TIME_BLK"].isin(selected_time_blk))]
-
-    def get_info_str(self, data: pd.DataFrame):
+    _group_columns = ["ORIGIN", "DEST"]
+    breakdown_column = "OP_CARRIER_AIRLINE_ID"
+
+    def group_key(self, filt: list[str]):
+        return (filt[0], filt[1])
+
+    def get_info_str(self, data: pd.DataFrame, percentiles: dict):
         try:
             orgin_airport = data["ORIGIN"].unique()[0]
         except:
@@ -332,92 +1053,70 @@ class SearchByFlight(SearchState):
         dest_airport = data["DEST"].unique()[0]
         num_flights = data["ORIGIN"].count()
         dist = data["DISTANCE"].unique()[0]
-        airlines_delay = data[["OP_CARRIER_AIRLINE_ID",
-                               "DEP_DELAY",
-                               "ARR_DELAY"]].groupby("OP_CARRIER_AIRLINE_ID").mean()
         dep_stat = list(data["DEP_DELAY"].describe().values)
         arr_stat = list(data["ARR_DELAY"].describe().values)
-        airlines_id = airlines_delay.index
-        airlines_dep = list(airlines_delay["DEP_DELAY"].values)
-        airlines_arr = list(airlines_delay["ARR_DELAY"].values)
-        airlines_info_list = []
-        for count in range(len(airlines_id)):
-            airlines_info_list.append((f"Airline ID: {airlines_id[count]}\n"
-                                       f"AVG DEP Delay:"
-                                       f" {airlines_dep[count]:.2f} min(s)\n"
-                                       f"AVG ARR Delay:"
-                                       f" {airlines_arr[count]:.2f} min(s)\n\n"))
         temp_str = (f"Flight from {orgin_airport} to {dest_airport}\n"
                     f"Distance: {dist} miles\n"
                     f"Number of Flight(s): {num_flights}\n\n"
                     f"*Departure Delay Statistics*\n"
                     f"Average Delay:  {dep_stat[1]:.2f} min(s)\n"
                     f"Shortest Delay: {dep_stat[3]:.2f} min(s)\n"
-                    f"Longest Delay:  {dep_stat[7]:.2f} min(s)\n\n"
+                    f"Longest Delay:  {dep_stat[7]:.2f} min(s)\n"
+                    f"{self.percentile_str(percentiles['DEP_DELAY'])}\n"
                     f"*Arrival Delay Statistics*\n"
                     f"Average Delay:  {arr_stat[1]:.2f} min(s)\n"
                     f"Shortest Delay: {arr_stat[3]:.2f} min(s)\n"
-                    f"Longest Delay:  {arr_stat[7]:.2f} min(s)\n\n"
-                    f"*Known Airline(s)*\n"
-                    f"{''.join(airlines_info_list)}")
+                    f"Longest Delay:  {arr_stat[7]:.2f} min(s)\n"
+                    f"{self.percentile_str(percentiles['ARR_DELAY'])}\n"
+                    f"{self.propagation_str(data)}"
+                    f"{self.interval_str(data)}")
         return temp_str
 
 class SearchByAirport(SearchState):
     """
     A state for sorting the dataframe using airport as the filter
     """
-    def sort_data(self, filt: list[str], week: list[bool], time_blk: list[bool]):
-        selected_wk, selected_time_blk = self.convert_bool_to_filter(week,time_blk)
-        return self.df.loc[(self.df["ORIGIN"] == filt[0]) &
-                           (self.df["WEEK"].isin(selected_wk)) &
-                           (self.df["DEP_TIME_BLK"].isin(selected_time_blk))]
+    _group_columns = ["ORIGIN"]
+    breakdown_column = "OP_CARRIER_AIRLINE_ID"
 
-    def get_info_str(self, data: pd.DataFrame):
+    def group_key(self, filt: list[str]):
+        return filt[0]
+
+    def get_info_str(self, data: pd.DataFrame, percentiles: dict):
         try:
             airport = data["ORIGIN"].unique()[0]
         except:
             return "No flights found"
         num_flights = data["ORIGIN"].count()
-        airlines_delay = data[["OP_CARRIER_AIRLINE_ID",
-                               "DEP_DELAY",
-                               "ARR_DELAY"]].groupby("OP_CARRIER_AIRLINE_ID").mean()
         dep_stat = list(data["DEP_DELAY"].describe().values)
         arr_stat = list(data["ARR_DELAY"].describe().values)
-        airlines_id = airlines_delay.index
-        airlines_dep = list(airlines_delay["DEP_DELAY"].values)
-        airlines_arr = list(airlines_delay["ARR_DELAY"].values)
-        airlines_info_list = []
-        for count in range(len(airlines_id)):
-            airlines_info_list.append((f"Airline ID: {airlines_id[count]}\n"
-                                       f"AVG DEP Delay:"
-                                       f" {airlines_dep[count]:.2f} min(s)\n"
-                                       f"AVG ARR Delay:"
-                                       f" {airlines_arr[count]:.2f} min(s)\n\n"))
         temp_str = (f"Airport: {airport}\n"
                     f"Number of Flight(s): {num_flights}\n\n"
                     f"*Departure Delay Statistics*\n"
                     f"Average Delay:  {dep_stat[1]:.2f} min(s)\n"
                     f"Shortest Delay: {dep_stat[3]:.2f} min(s)\n"
-                    f"Longest Delay:  {dep_stat[7]:.2f} min(s)\n\n"
+                    f"Longest Delay:  {dep_stat[7]:.2f} min(s)\n"
+                    f"{self.percentile_str(percentiles['DEP_DELAY'])}\n"
                     f"*Arrival Delay Statistics*\n"
                     f"Average Delay:  {arr_stat[1]:.2f} min(s)\n"
                     f"Shortest Delay: {arr_stat[3]:.2f} min(s)\n"
-                    f"Longest Delay:  {arr_stat[7]:.2f} min(s)\n\n"
-                    f"*Known Airline(s)*\n"
-                    f"{''.join(airlines_info_list)}")
+                    f"Longest Delay:  {arr_stat[7]:.2f} min(s)\n"
+                    f"{self.percentile_str(percentiles['ARR_DELAY'])}\n"
+                    f"{self.propagation_str(data)}"
+                    f"{self.interval_str(data)}")
         return temp_str
 
 class SearchByAirline(SearchState):
     """
     A state for sorting the dataframe using airline as the filter
     """
-    def sort_data(self, filt: list[str], week: list[bool], time_blk: list[bool]):
-        selected_wk, selected_time_blk = self.convert_bool_to_filter(week,time_blk)
-        return self.df.loc[(self.df["OP_CARRIER_AIRLINE_ID"] == list(map(float, filt))[0]) &
-                           (self.df["WEEK"].isin(selected_wk)) &
-                           self.df["DEP_TIME_BLK"].isin(selected_time_blk)]
+    _group_columns = ["OP_CARRIER_AIRLINE_ID"]
+    breakdown_column = "ORIGIN"
+
+    def group_key(self, filt: list[str]):
+        return float(filt[0])
 
-    def get_info_str(self, data: pd.DataFrame):
+    def get_info_str(self, data: pd.DataFrame, percentiles: dict):
         try:
             airline_id = data["OP_CARRIER_AIRLINE_ID"].unique()[0]
         except:
@@ -425,26 +1124,20 @@ class SearchByAirline(SearchState):
         num_flights = data["OP_CARRIER_AIRLINE_ID"].count()
         dep_stat = list(data["DEP_DELAY"].describe().values)
         arr_stat = list(data["ARR_DELAY"].describe().values)
-        airports = data[["ORIGIN","DEST"]].groupby("ORIGIN").count()
-        airports_id = airports.index
-        airports_num_flight = airports["DEST"].values
-        airports_info_list = []
-        for count in range(len(airports_id)):
-            airports_info_list.append((f"Airport ID: {airports_id[count]}\n"
-                                       f"% of flights:"
-                                       f" {airports_num_flight[count]:.0f} flight(s)\n\n"))
         temp_str = (f"Airline ID: {airline_id}\n"
                     f"Number of Flight(s): {num_flights}\n\n"
                     f"*Departure Delay Statistics*\n"
                     f"Average Delay:  {dep_stat[1]:.2f} min(s)\n"
                     f"Shortest Delay: {dep_stat[3]:.2f} min(s)\n"
-                    f"Longest Delay:  {dep_stat[7]:.2f} min(s)\n\n"
+                    f"Longest Delay:  {dep_stat[7]:.2f} min(s)\n"
+                    f"{self.percentile_str(percentiles['DEP_DELAY'])}\n"
                     f"*Arrival Delay Statistics*\n"
                     f"Average Delay:  {arr_stat[1]:.2f} min(s)\n"
                     f"Shortest Delay: {arr_stat[3]:.2f} min(s)\n"
-                    f"Longest Delay:  {arr_stat[7]:.2f} min(s)\n\n"
-                    f"*Known Airport(s)*\n"
-                    f"{''.join(airports_info_list)}")
+                    f"Longest Delay:  {arr_stat[7]:.2f} min(s)\n"
+                    f"{self.percentile_str(percentiles['ARR_DELAY'])}\n"
+                    f"{self.propagation_str(data)}"
+                    f"{self.interval_str(data)}")
         return temp_str
 
 
@@ -0,0 +1,86 @@
+"""Dense origin-destination matrices of flight statistics"""
+import numpy as np
+import pandas as pd
+from indexing import day_numbers, time_block_codes
+
+class ODMatrix:
+    """
+    Integer encoded origin and destination airports of every flight, from which
+    matrices of flight counts, average delays and cancellation rates between every
+    pair of airports are computed with a single bincount per statistic.
+    """
+    METRICS = {"Number of Flights": "FLIGHTS",
+               "Average Departure Delay": "DEP_DELAY",
+               "Average Arrival Delay": "ARR_DELAY",
+               "Cancellation Rate": "CANCELLED"}
+
+    def __init__(self, dataframe: pd.DataFrame, time_blocks: list[str]) -> None:
+        self.__airports = np.unique(np.concatenate([dataframe["ORIGIN"].to_numpy(dtype=str),
+                                                    dataframe["DEST"].to_numpy(dtype=str)]))
+        size = len(self.__airports)
+        self.__pairs = (np.searchsorted(self.__airports, dataframe["ORIGIN"].to_numpy(dtype=str))
+                        * size
+                        + np.searchsorted(self.__airports, dataframe["DEST"].to_numpy(dtype=str)))
+        self.__days = day_numbers(dataframe["FL_DATE"])
+        self.__time_blocks = list(time_blocks)
+        self.__blk_codes = time_block_codes(dataframe, time_blocks)
+        self.__delays = {column: dataframe[column].to_numpy(dtype=np.float64)
+                         for column in ("DEP_DELAY", "ARR_DELAY")}
+        self.__cancelled = dataframe["CANCELLED"].fillna(0).to_numpy(dtype=np.float64)
+
+    @property
+    def airports(self):
+        """
+        Getter for airports attribute
+        """
+        return self.__airports
+
+    def __selection(self, days, time_blocks: list[str]):
+        """
+        Return a filter of the flights on the selected days and time blocks.
+        Canceled flights have no departure time block, so they are only kept
+        when every time block is selected.
+        """
+        selected = np.isin(self.__days, day_numbers(days))
+        blk_selected = np.isin(np.arange(len(self.__time_blocks)),
+                               [self.__time_blocks.index(blk) for blk in time_blocks])
+        if blk_selected.all():
+            return selected
+        return selected & (self.__blk_codes >= 0) & blk_selected[self.__blk_codes]
+
+    def compute(self, days, time_blocks: list[str]) -> dict:
+        """
+        Compute every matrix for the flights on the selected days and time blocks
+        : param days : dates selected
+        : param time_blocks : departure time block labels selected
+        : return : a dict of square matrices indexed [origin, destination] in the
+                   order of the airports attribute, NaN where no flight is recorded
+        """
+        selected = self.__selection(days, time_blocks)
+        pairs = self.__pairs[selected]
+        size = len(self.__airports)
+        shape = (size, size)
+        flights = np.bincount(pairs, minlength=size * size).astype(np.float64)
+        matrices = {"FLIGHTS": flights.reshape(shape)}
+        with np.errstate(invalid="ignore", divide="ignore"):
+            for column, values in self.__delays.items():
+                values = values[selected]
+                recorded = ~np.isnan(values)
+                total = np.bincount(pairs[recorded], weights=values[recorded],
+                                    minlength=size * size)
+                count = np.bincount(pairs[recorded], minlength=size * size)
+                matrices[column] = (total / count).reshape(shape)
+            cancelled = np.bincount(pairs, weights=self.__cancelled[selected],
+                                    minlength=size * size)
+            matrices["CANCELLED"] = (cancelled / flights).reshape(shape)
+        matrices["FLIGHTS"][matrices["FLIGHTS"] == 0] = np.nan
+        return matrices
+
+    @staticmethod
+    def order_by_volume(matrices: dict) -> np.ndarray:
+        """
+        Return airport positions sorted by the number of departures and arrivals,
+        busiest first
+        """
+        flights = np.nan_to_num(matrices["FLIGHTS"])
+        return np.argsort(-(flights.sum(axis=0) + flights.sum(axis=1)), kind="stable")
@@ -0,0 +1,138 @@
+"""Presorted per-group delay arrays for fast percentile lookups"""
+import numpy as np
+import pandas as pd
+from indexing import factorize_groups, day_numbers, time_block_codes
+
+def percentiles_from_counts(values: np.ndarray, counts: np.ndarray, qs) -> np.ndarray:
+    """
+    Return percentiles of values given with their number of occurrences, interpolated
+    linearly like numpy.percentile
+    : param values : distinct values in ascending order
+    """
+    total = int(counts.sum())
+    if not total:
+        return np.full(len(qs), np.nan)
+    ends = np.cumsum(counts)
+    position = (total - 1) * np.asarray(qs, dtype=np.float64) / 100
+    lower = np.floor(position).astype(np.int64)
+    upper = np.minimum(lower + 1, total - 1)
+    low_val = values[np.searchsorted(ends, lower, side="right")]
+    up_val = values[np.searchsorted(ends, upper, side="right")]
+    return low_val + (up_val - low_val) * (position - lower)
+
+class DelayPercentileIndex:
+    """
+    Delay values sorted once per (group, day, departure time block) cell so that
+    percentiles of any combination of cells are answered with searchsorted calls
+    instead of sorting the selected rows on every query.
+    """
+    PERCENTILES = (50, 90, 99)
+
+    def __init__(self, dataframe: pd.DataFrame, keys: list[str], time_blocks: list,
+                 columns=("DEP_DELAY", "ARR_DELAY"), column: str = "DEP_TIME_BLK",
+                 groups: tuple = None) -> None:
+        """
+        : param groups : the group codes and lookup of factorize_groups when they are
+                         already computed
+        """
+        group_codes, self.__lookup = groups or factorize_groups(dataframe, keys)
+        days = day_numbers(dataframe["FL_DATE"])
+        self.__first_day = int(days.min())
+        self.__num_days = int(days.max()) - self.__first_day + 1
+        self.__time_blocks = {blk: code for code, blk in enumerate(time_blocks)}
+        blk_codes = time_block_codes(dataframe, time_blocks, column)
+        cells = ((group_codes * self.__num_days + days - self.__first_day)
+                 * len(time_blocks) + blk_codes)
+        valid = (group_codes >= 0) & (blk_codes >= 0)
+        self.__columns = {}
+        for column in columns:
+            values = dataframe[column].to_numpy(dtype=np.float64)
+            mask = valid & ~np.isnan(values)
+            self.__columns[column] = self.__build_column(cells[mask], values[mask])
+
+    @staticmethod
+    def __build_column(cells: np.ndarray, values: np.ndarray):
+        """
+        Encode each delay as cell * number_of_distinct_values + rank of its value and
+        sort them, so the values of every cell are contiguous and in order
+        """
+        distinct, ranks = np.unique(values, return_inverse=True)
+        composite = cells * len(distinct) + ranks
+        composite.sort()
+        return composite, distinct
+
+    def get_cells(self, key, days, time_blocks: list[str]):
+        """
+        Return the cell numbers of a group for the selected days and time blocks
+        : param key : the group key, a tuple when the index uses several columns
+        : param days : dates selected
+        : param time_blocks : departure time block labels selected
+        : return : an array of cell numbers, empty if nothing matches
+        """
+        group = self.__lookup.get(key)
+        day_codes = day_numbers(days) - self.__first_day
+        day_codes = day_codes[(day_codes >= 0) & (day_codes < self.__num_days)]
+        blk_codes = [self.__time_blocks[blk] for blk in time_blocks
+                     if blk in self.__time_blocks]
+        if group is None or not len(day_codes) or not blk_codes:
+            return np.empty(0, dtype=np.int64)
+        return ((group * self.__num_days + day_codes[:, None]) * len(self.__time_blocks)
+                + np.array(blk_codes)[None, :]).ravel()
+
+    def percentiles(self, key, days, time_blocks: list[str], column: str, qs=PERCENTILES):
+        """
+        Return the percentiles of a delay column for a group under the filter,
+        interpolated linearly like numpy.percentile
+        : param column : the delay column to look up
+        : param qs : percentiles to compute, between 0 and 100
+        : return : an array of values, NaN when there is no delay recorded
+        """
+        composite, distinct = self.__columns[column]
+        bases = self.get_cells(key, days, time_blocks) * len(distinct)
+        starts = np.searchsorted(composite, bases)
+        total = int((np.searchsorted(composite, bases + len(distinct)) - starts).sum())
+        if not total:
+            return np.full(len(qs), np.nan)
+        position = (total - 1) * np.asarray(qs, dtype=np.float64) / 100
+        lower = np.floor(position).astype(np.int64)
+        upper = np.minimum(lower + 1, total - 1)
+        ranks = self.__select(composite, bases, starts, np.concatenate([lower, upper]),
+                              len(distinct))
+        low_val, up_val = np.split(distinct[ranks], 2)
+        return low_val + (up_val - low_val) * (position - lower)
+
+    @staticmethod
+    def __select(composite, bases, starts, order, num_distinct):
+        """
+        Find the value ranks of the order statistics across several sorted cells
+        by binary searching the rank domain, counting with one searchsorted call
+        per step
+        """
+        low = np.zeros(len(order), dtype=np.int64)
+        high = np.full(len(order), num_distinct - 1, dtype=np.int64)
+        while (low < high).any():
+            mid = (low + high) // 2
+            counts = (np.searchsorted(composite, bases[None, :] + mid[:, None], side="right")
+                      - starts[None, :]).sum(axis=1)
+            enough = counts > order
+            high = np.where(enough, mid, high)
+            low = np.where(enough, low, mid + 1)
+        return low
+
+    def weekly_percentiles(self, key, days: pd.Series, time_blocks: list[str],
+                           qs=PERCENTILES):
+        """
+        Return a dataframe of percentiles of every delay column for each week
+        : param days : a Series of the week of each selected date, indexed by date
+        : return : a dataframe indexed by week with columns such as DEP_DELAY P50
+        """
+        rows = {}
+        for week, week_days in days.groupby(days, sort=True):
+            row = {}
+            for column in self.__columns:
+                values = self.percentiles(key, week_days.index, time_blocks, column, qs)
+                for q, value in zip(qs, values):
+                    row[f"{column} P{q}"] = value
+            rows[week] = row
+        weekly = pd.DataFrame.from_dict(rows, orient="index").rename_axis("WEEK")
+        return weekly.dropna(how="all")
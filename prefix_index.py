@@ -0,0 +1,88 @@
+"""Sorted prefix index for autocomplete of airports, airlines, flight and tail numbers"""
+from bisect import bisect_left
+import numpy as np
+import pandas as pd
+
+class PrefixIndex:
+    """
+    Keys sorted once, ignoring case, so the keys starting with a prefix are one
+    contiguous range found by two bisections. The matches are ranked by weight, or
+    kept in the order of the keys given when there is no weight.
+    """
+    # Sorts after every character a key can contain
+    LAST_CHAR = "\U0010ffff"
+
+    def __init__(self, keys, weights=None) -> None:
+        keys = list(keys)
+        folded = [str(key).upper() for key in keys]
+        order = sorted(range(len(keys)), key=folded.__getitem__)
+        self.__folded = [folded[i] for i in order]
+        self.__keys = [keys[i] for i in order]
+        if weights is None:
+            weights = -np.arange(len(keys), dtype=np.float64)
+        self.__weights = np.asarray(weights, dtype=np.float64)[order]
+
+    def __len__(self) -> int:
+        return len(self.__keys)
+
+    def prefix_range(self, prefix: str):
+        """
+        Return the first and last positions (exclusive) of the keys starting with prefix
+        """
+        prefix = prefix.upper()
+        return (bisect_left(self.__folded, prefix),
+                bisect_left(self.__folded, prefix + self.LAST_CHAR))
+
+    def matches(self, prefix: str, limit: int = None) -> list:
+        """
+        Return the keys starting with prefix, highest weight first
+        : param limit : the number of keys returned, every match by default
+        """
+        first, last = self.prefix_range(prefix)
+        weights = self.__weights[first:last]
+        if limit is not None and limit <= 0:
+            top = []
+        elif limit is not None and limit < len(weights):
+            # Matches above the weight of the last one kept, then those of that weight
+            # in key order, as argpartition keeps any of the tied matches
+            cutoff = -np.partition(-weights, limit - 1)[limit - 1]
+            above = np.flatnonzero(weights > cutoff)
+            top = np.concatenate([above,
+                                  np.flatnonzero(weights == cutoff)[:limit - len(above)]])
+        else:
+            top = np.arange(len(weights))
+        top = np.asarray(top, dtype=np.int64)
+        # Equal weights are kept in key order
+        top = top[np.lexsort((top, -weights[top]))]
+        return [self.__keys[first + i] for i in top]
+
+class IdentifierLookup:
+    """
+    Prefix index of the identifiers of a column, e.g. tail numbers, ranked by number
+    of flights, with the rows of every identifier stored next to each other
+    """
+    def __init__(self, identifiers: pd.Series) -> None:
+        codes, uniques = pd.factorize(identifiers)
+        valid = codes >= 0
+        self.__counts = np.bincount(codes[valid], minlength=len(uniques))
+        self.__codes = {key: code for code, key in enumerate(uniques)}
+        self.__order = np.flatnonzero(valid)[np.argsort(codes[valid], kind="stable")]
+        self.__bounds = np.concatenate([[0], np.cumsum(self.__counts)])
+        self.__index = PrefixIndex(uniques, self.__counts)
+
+    def matches(self, prefix: str, limit: int = None) -> list[tuple]:
+        """
+        Return the identifiers starting with prefix and their number of flights,
+        most flights first
+        """
+        return [(key, int(self.__counts[self.__codes[key]]))
+                for key in self.__index.matches(prefix, limit)]
+
+    def rows(self, key) -> np.ndarray:
+        """
+        Return the positions of the rows of an identifier, empty if it is unknown
+        """
+        code = self.__codes.get(key)
+        if code is None:
+            return np.empty(0, dtype=np.int64)
+        return self.__order[self.__bounds[code]:self.__bounds[code + 1]]
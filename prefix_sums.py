@@ -0,0 +1,250 @@
+"""Cumulative per-day statistics for fast date range queries"""
+import numpy as np
+import pandas as pd
+from indexing import factorize_groups, day_numbers, time_block_codes
+
+class DailyPrefixSums:
+    """
+    Per (group, departure time block, day) flight counts, delay sums and status counts
+    stored as running totals, so the totals of any range of days are the difference
+    of two rows instead of a scan over the flights. Only the days on which a group
+    flies are stored, and the two rows are found with searchsorted. Flights without a
+    departure time (mostly canceled ones) are kept under the time block None. The time
+    blocks are the values of column, e.g. the departure hours of DEP_HOUR.
+    The running totals per (group, day) are kept as well, so selecting every time block
+    costs one search per group instead of one per time block, and the totals of every
+    group over every day and time block are stored for the unfiltered queries.
+    """
+    def __init__(self, dataframe: pd.DataFrame, keys: list[str],
+                 time_blocks: list, column: str = "DEP_TIME_BLK", groups: tuple = None) -> None:
+        """
+        : param groups : the group codes and lookup of factorize_groups when they are
+                         already computed
+        """
+        group_codes, self.__lookup = groups or factorize_groups(dataframe, keys)
+        if len(keys) == 1:
+            self.__groups = pd.Index(list(self.__lookup), name=keys[0])
+        else:
+            self.__groups = pd.MultiIndex.from_tuples(list(self.__lookup), names=keys)
+        days = day_numbers(dataframe["FL_DATE"])
+        self.__first_day = int(days.min())
+        self.__num_days = int(days.max()) - self.__first_day + 1
+        self.__time_blocks = list(time_blocks) + [None]
+        self.__column = column
+        # Kept for the index of the totals by time block, even when it is empty
+        self.__block_dtype = pd.Index(time_blocks).dtype
+        blk_codes = time_block_codes(dataframe, time_blocks, column)
+        blk_codes[blk_codes < 0] = len(time_blocks)
+        valid = group_codes >= 0
+        day_codes = days - self.__first_day
+        cells = ((group_codes * len(self.__time_blocks) + blk_codes) * self.__num_days
+                 + day_codes)[valid]
+        day_cells = (group_codes * self.__num_days + day_codes)[valid]
+        status_codes, self.__statuses = pd.factorize(dataframe["STATUS"].to_numpy()[valid])
+        stats = [np.ones(len(cells))]
+        for column in ("DEP_DELAY", "ARR_DELAY"):
+            values = dataframe[column].to_numpy(dtype=np.float64)[valid]
+            recorded = ~np.isnan(values)
+            stats.append(np.where(recorded, values, 0))
+            stats.append(recorded.astype(np.float64))
+        stats.extend((status_codes == code).astype(np.float64)
+                     for code in range(len(self.__statuses)))
+        self.__keys, self.__cumulative = self.__running_totals(cells, stats)
+        self.__day_keys, self.__day_cumulative = self.__running_totals(day_cells, stats)
+        self.__columns = (["FLIGHTS", "DEP_DELAY_SUM", "DEP_DELAY_COUNT",
+                           "ARR_DELAY_SUM", "ARR_DELAY_COUNT"] + list(self.__statuses))
+        self.__all_totals = np.column_stack([np.bincount(group_codes[valid], weights=stat,
+                                                         minlength=len(self.__groups))
+                                             for stat in stats])
+
+    @staticmethod
+    def __running_totals(cells: np.ndarray, stats: list):
+        """
+        Sum the stats of the flights in each cell and accumulate them in cell order
+        : return : the sorted cell numbers and the running totals, with a row of zeros
+                   first
+        """
+        keys, position = np.unique(cells, return_inverse=True)
+        totals = np.column_stack([np.bincount(position, weights=stat, minlength=len(keys))
+                                  for stat in stats])
+        return keys, np.vstack([np.zeros((1, totals.shape[1])), totals.cumsum(axis=0)])
+
+    def __cell_bases(self, groups, time_blocks: list[str]):
+        """
+        Return the first cell number of each selected time block of the group codes
+        : return : an array of shape (number of groups, number of time blocks)
+        """
+        blk_codes = np.array([self.__time_blocks.index(blk) for blk in time_blocks
+                              if blk in self.__time_blocks], dtype=np.int64)
+        groups = np.asarray(groups, dtype=np.int64)
+        return ((groups[:, None] * len(self.__time_blocks) + blk_codes[None, :])
+                * self.__num_days)
+
+    def __key_codes(self, key) -> np.ndarray:
+        """
+        Return the code of a group in an array, empty when the group has no flights
+        """
+        group = self.__lookup.get(key)
+        return np.array([] if group is None else [group], dtype=np.int64)
+
+    def __key_bases(self, key, time_blocks: list[str]):
+        """
+        Return the first cell number of each selected time block of a group
+        """
+        return self.__cell_bases(self.__key_codes(key), time_blocks).ravel()
+
+    def __range_totals(self, bases: np.ndarray, starts: np.ndarray, ends: np.ndarray,
+                       by_day: bool = False):
+        """
+        Return the totals of every day range (inclusive day codes) in every cell base
+        : param by_day : whether the bases are cells of the (group, day) running totals
+        : return : an array of shape (number of ranges, number of bases, number of columns)
+        """
+        keys, cumulative = ((self.__day_keys, self.__day_cumulative) if by_day
+                            else (self.__keys, self.__cumulative))
+        lows = np.searchsorted(keys, bases[None, :] + starts[:, None])
+        highs = np.searchsorted(keys, bases[None, :] + ends[:, None], side="right")
+        return cumulative[highs] - cumulative[lows]
+
+    def __groups_totals(self, groups: np.ndarray, starts: np.ndarray, ends: np.ndarray,
+                        time_blocks: list) -> np.ndarray:
+        """
+        Return the totals of the group codes in every day range over the selected time
+        blocks, from the (group, day) running totals when every time block is selected
+        and as their difference with the other time blocks when those are fewer
+        : return : an array of shape (number of ranges, number of groups, number of columns)
+        """
+        selected = [blk for blk in self.__time_blocks if blk in time_blocks]
+        others = [blk for blk in self.__time_blocks if blk not in time_blocks]
+        totals, sign = 0, 1
+        if len(others) < len(selected):
+            totals = self.__range_totals(groups * self.__num_days, starts, ends, by_day=True)
+            if not others:
+                return totals
+            selected, sign = others, -1
+        bases = self.__cell_bases(groups, selected)
+        blocks = self.__range_totals(bases.ravel(), starts, ends)
+        blocks = blocks.reshape((len(starts),) + bases.shape + (len(self.__columns),))
+        return totals + sign * blocks.sum(axis=2)
+
+    def __day_runs(self, days):
+        """
+        Convert dates to day codes of the index and merge consecutive days into runs
+        : return : arrays of the first and last day code of each run
+        """
+        codes = day_numbers(days) - self.__first_day
+        codes = np.unique(codes[(codes >= 0) & (codes < self.__num_days)])
+        breaks = np.flatnonzero(np.diff(codes) != 1)
+        return (np.concatenate([codes[:1], codes[breaks + 1]]),
+                np.concatenate([codes[breaks], codes[-1:]]))
+
+    def totals(self, key, days, time_blocks: list[str]) -> pd.Series:
+        """
+        Return the totals of a group over the selected days and time blocks
+        : param key : the group key, a tuple when the index uses several columns
+        : param days : dates selected
+        : param time_blocks : departure time block labels selected
+        : return : a Series of flight count, delay sums and counts and status counts
+        """
+        first, last = self.__day_runs(days)
+        totals = self.__groups_totals(self.__key_codes(key), first, last, time_blocks)
+        return pd.Series(totals.sum(axis=(0, 1)), index=self.__columns)
+
+    def group_totals(self, days, time_blocks: list) -> pd.DataFrame:
+        """
+        Return the totals of every group over the selected days and time blocks
+        : param time_blocks : departure time block labels selected, None for flights
+                              without a departure time
+        : return : a dataframe indexed by group key
+        """
+        first, last = self.__day_runs(days)
+        every_day = len(first) == 1 and first[0] == 0 and last[0] == self.__num_days - 1
+        if every_day and set(self.__time_blocks) <= set(time_blocks):
+            totals = self.__all_totals.copy()
+        else:
+            totals = self.__groups_totals(np.arange(len(self.__groups)), first, last,
+                                          time_blocks).sum(axis=0)
+        return pd.DataFrame(totals, index=self.__groups, columns=self.__columns)
+
+    def weekly_group_totals(self, days: pd.Series, time_blocks: list) -> pd.DataFrame:
+        """
+        Return the totals of every group in every selected week, all computed at once
+        : param days : a Series of the week of each selected date, indexed by date
+        : return : a dataframe indexed by week and group key, without weeks that have no
+                   selected day
+        """
+        codes = day_numbers(days.index) - self.__first_day
+        inside = (codes >= 0) & (codes < self.__num_days)
+        codes, first = np.unique(codes[inside], return_index=True)
+        weeks = days.to_numpy()[inside][first]
+        # A run of days ends where the days stop being consecutive or the week changes
+        breaks = np.flatnonzero((np.diff(codes) != 1) | (np.diff(weeks) != 0))
+        positions = np.arange(len(codes))
+        starts = np.concatenate([positions[:1], breaks + 1])
+        ends = np.concatenate([breaks, positions[-1:]])
+        totals = self.__groups_totals(np.arange(len(self.__groups)), codes[starts],
+                                      codes[ends], time_blocks)
+        week_values, run_weeks = np.unique(weeks[starts], return_inverse=True)
+        weekly = np.zeros((len(week_values), len(self.__groups), len(self.__columns)))
+        np.add.at(weekly, run_weeks, totals)
+        groups = self.__groups[np.tile(np.arange(len(self.__groups)), len(week_values))]
+        index = pd.MultiIndex.from_arrays(
+            [np.repeat(week_values, len(self.__groups))]
+            + [groups.get_level_values(level) for level in range(groups.nlevels)],
+            names=["WEEK"] + list(groups.names))
+        return pd.DataFrame(weekly.reshape(-1, len(self.__columns)), index=index,
+                            columns=self.__columns)
+
+    def daily(self, key, days, time_blocks: list[str]) -> pd.DataFrame:
+        """
+        Return the totals of a group for each selected day
+        : return : a dataframe indexed by date, without days that have no flight
+        """
+        codes = day_numbers(days) - self.__first_day
+        codes = np.unique(codes[(codes >= 0) & (codes < self.__num_days)])
+        totals = self.__groups_totals(self.__key_codes(key), codes, codes, time_blocks)
+        dates = pd.DatetimeIndex((codes + self.__first_day).astype("datetime64[D]"),
+                                 name="FL_DATE")
+        daily = pd.DataFrame(totals.sum(axis=1), columns=self.__columns, index=dates)
+        return daily[daily["FLIGHTS"] > 0]
+
+    def time_block_totals(self, key, days, time_blocks: list) -> pd.DataFrame:
+        """
+        Return the totals of a group in each selected time block over the selected days
+        : return : a dataframe indexed by time block, without time blocks that have no
+                   flight
+        """
+        first, last = self.__day_runs(days)
+        time_blocks = [blk for blk in time_blocks if blk in self.__time_blocks[:-1]]
+        totals = self.__range_totals(self.__key_bases(key, time_blocks), first, last)
+        totals = pd.DataFrame(totals.sum(axis=0), columns=self.__columns,
+                              index=pd.Index(time_blocks[:totals.shape[1]], name=self.__column,
+                                             dtype=self.__block_dtype))
+        return totals[totals["FLIGHTS"] > 0].sort_index()
+
+    def time_block_counts(self, key, days) -> pd.Series:
+        """
+        Return the number of flights of a group in each time block over the selected
+        days, like value_counts
+        """
+        first, last = self.__day_runs(days)
+        time_blocks = self.__time_blocks[:-1]
+        totals = self.__range_totals(self.__key_bases(key, time_blocks), first, last)
+        counts = pd.Series(totals[:, :, 0].sum(axis=0).astype(np.int64),
+                           index=time_blocks[:totals.shape[1]], name="count")
+        return counts[counts > 0].sort_values(ascending=False)
+
+    @staticmethod
+    def average_delay(totals: pd.DataFrame) -> pd.DataFrame:
+        """
+        Return the average departure and arrival delay from the totals
+        """
+        return pd.DataFrame({"DEP_DELAY": totals["DEP_DELAY_SUM"] / totals["DEP_DELAY_COUNT"],
+                             "ARR_DELAY": totals["ARR_DELAY_SUM"] / totals["ARR_DELAY_COUNT"]})
+
+    def status_counts(self, totals: pd.Series) -> pd.Series:
+        """
+        Return the number of flights of each status in the totals, like value_counts
+        """
+        counts = totals[list(self.__statuses)].astype(np.int64)
+        return counts[counts > 0].sort_values(ascending=False).rename("count")
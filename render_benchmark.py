@@ -0,0 +1,203 @@
+"""Time every plot method of the search, storytelling and airline overview tabs with Agg"""
+import argparse
+import json
+import os
+import time
+import tracemalloc
+import matplotlib
+matplotlib.use("Agg")
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+import numpy as np
+import pandas as pd
+from benchmark import measure, git_commit, compare
+from search_tabs import SearchTabGraphFrame
+from data_storytelling_tab import DataStoryTellingGraphFrame
+from airline_overview_tab import AirlineOverviewGraphFrame
+
+# Size in inches of the figures, close to the canvas of the UI
+FIGSIZE = (9, 6)
+STATUSES = ["On-time", "Delayed Departure", "Delayed Arrival", "Delayed Departure and Arrival",
+            "Canceled", "Diverted"]
+TIME_BLOCKS = ["Early Morning", "Morning", "Afternoon", "Evening", "Night"]
+# Plot method of the search tab graph frame of every chart of the search tabs
+SEARCH_CHARTS = {"avg_delay": "plot_avg_delay_graph", "on_time": "plot_on_time_graph",
+                 "time_block": "plot_dep_time_graph", "percentiles": "plot_percentile_graph"}
+STORYTELLING_CHARTS = {"delay_histogram": "plot_delay_histogram",
+                       "storytelling_avg_delay": "plot_avg_delay",
+                       "flights_per_week": "plot_flight_week",
+                       "flights_per_time_block": "plot_flight_time_blk"}
+# Airlines drawn by the airline overview at most, about the number in the datasets
+MAX_AIRLINES = 20
+
+def headless(frame_class, **attributes):
+    """
+    Return a graph frame drawing on an Agg canvas, without creating its Tk widgets, so
+    its plot methods run with no display
+    """
+    frame = frame_class.__new__(frame_class)
+    frame.canvas = FigureCanvasAgg(Figure(figsize=FIGSIZE, dpi=85))
+    for name, value in attributes.items():
+        setattr(frame, name, value)
+    return frame
+
+def synthetic_search_data(rng: np.random.Generator, size: int) -> dict:
+    """
+    Return random data of every search tab chart, the line charts with size points
+    """
+    days = pd.date_range("2020-01-01", periods=size, freq="D", name="FL_DATE")
+    avg_delay = pd.DataFrame({"DEP_DELAY": rng.normal(5, 3, size),
+                              "ARR_DELAY": rng.normal(0, 3, size)}, index=days)
+    for column in ("DEP_DELAY", "ARR_DELAY"):
+        avg_delay[f"{column}_LOW"] = avg_delay[column] - 1
+        avg_delay[f"{column}_HIGH"] = avg_delay[column] + 1
+    weeks = pd.Index(np.arange(1, size + 1), name="WEEK")
+    percentiles = pd.DataFrame({f"{delay} {percentile}": rng.normal(center, 5, size)
+                                for delay in ("DEP_DELAY", "ARR_DELAY")
+                                for percentile, center in (("P50", 0), ("P90", 40),
+                                                           ("P99", 150))}, index=weeks)
+    return {"avg_delay": avg_delay,
+            "on_time": pd.Series(rng.integers(1, 10_000, len(STATUSES)), index=STATUSES),
+            "time_block": pd.Series(rng.integers(1, 10_000, len(TIME_BLOCKS)),
+                                    index=TIME_BLOCKS),
+            "percentiles": percentiles}
+
+def synthetic_storytelling_data(rng: np.random.Generator, size: int) -> list:
+    """
+    Return random data of the storytelling page, with size distinct delays in the
+    histograms, size days and size rows in the stacked bar charts
+    """
+    delays = pd.Index(np.arange(size) - size // 4, dtype=np.float64)
+    statuses = pd.DataFrame(rng.integers(1, 30_000, (size, len(STATUSES))), columns=STATUSES)
+    by_week = statuses.set_axis(pd.Index(np.arange(1, size + 1), name="WEEK"))
+    by_time = statuses.set_axis(pd.Index([f"Block {i}" for i in range(size)],
+                                         name="DEP_TIME_BLK"))
+    return ["", pd.Series(rng.integers(1, 1_000, size), index=delays),
+            pd.Series(rng.integers(1, 1_000, size), index=delays),
+            pd.DataFrame({"DEP_DELAY": rng.normal(5, 3, size),
+                          "ARR_DELAY": rng.normal(0, 3, size)},
+                         index=pd.Index(np.arange(1, size + 1), name="DAY_OF_MONTH")),
+            by_week, by_time]
+
+def synthetic_airline_data(rng: np.random.Generator, size: int) -> dict:
+    """
+    Return random weekly statistics of size airlines, at most MAX_AIRLINES, for the
+    airline overview
+    """
+    airlines = pd.Index([str(19000 + i) for i in range(min(size, MAX_AIRLINES))])
+    weeks = pd.Index(np.arange(1, 6), name="WEEK")
+    return {metric: pd.DataFrame(rng.normal(center, 3, (len(airlines), len(weeks))),
+                                 index=airlines, columns=weeks)
+            for metric, center in (("Average Departure Delay", 5),
+                                   ("Average Arrival Delay", 0), ("On-time Share", 0.8))}
+
+def real_data():
+    """
+    Return the data of every search tab chart of the busiest airport, of the
+    storytelling page and of the airline overview, computed by the model from the
+    datasets folder
+    """
+    from model import FlightDataModel
+    model = FlightDataModel()
+    state = model.states[1]
+    airport = [model.df["ORIGIN"].value_counts().index[0]]
+    selected = [True] * 5
+    search = {"avg_delay": state.avg_flight_delay(airport, selected, selected)[1],
+              "avg_delay_daily": state.avg_flight_delay(airport, selected, selected,
+                                                        granularity="Daily")[1],
+              "on_time": state.percent_on_time(airport, selected, selected)[1],
+              "time_block": state.percent_time_block(airport, selected, selected)[1],
+              "percentiles": state.percentile_by_week(airport, selected, selected)[1]}
+    return (search, model.get_data_story_telling_data(),
+            model.get_airline_weekly(selected, selected))
+
+def measure_render(render, repeat: int) -> dict:
+    """
+    Time a render and add the tracemalloc peak of one more render in KB
+    """
+    result = measure(render, repeat)
+    tracemalloc.start()
+    render()
+    result["peak_memory_kb"] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+    tracemalloc.stop()
+    return result
+
+def render_charts(search_data: dict, storytelling_data: list, airline_data: dict,
+                  repeat: int) -> dict:
+    """
+    Time every plot method, including the draw of the canvas, on the given data
+    : return : a dict of the timings, memory peak and number of artists of each chart
+    """
+    timings = {}
+    graph = headless(SearchTabGraphFrame)
+    for name, data in search_data.items():
+        method = getattr(graph, SEARCH_CHARTS[name.replace("_daily", "")])
+        timings[name] = measure_render(lambda: method(data), repeat)
+        timings[name]["artists"] = len(graph.canvas.figure.findobj())
+    storytelling = headless(DataStoryTellingGraphFrame, data=storytelling_data)
+    for name, method_name in STORYTELLING_CHARTS.items():
+        method = getattr(storytelling, method_name)
+        timings[name] = measure_render(method, repeat)
+        timings[name]["artists"] = len(storytelling.canvas.figure.findobj())
+    airline_overview = headless(AirlineOverviewGraphFrame)
+    metric = "Average Departure Delay"
+    timings["airline_overview"] = measure_render(
+        lambda: airline_overview.plot_small_multiples(airline_data[metric], metric), repeat)
+    timings["airline_overview"]["artists"] = len(airline_overview.canvas.figure.findobj())
+    return timings
+
+def run_render_benchmarks(sizes: list[int], real: bool = False, repeat: int = 5,
+                          seed: int = 0) -> dict:
+    """
+    Time the charts on synthetic data of every size, and on the real datasets if real
+    : return : a dict of the environment and the timings of every input
+    """
+    rng = np.random.default_rng(seed)
+    results = {"commit": git_commit(),
+               "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+               "matplotlib": matplotlib.__version__,
+               "figsize": FIGSIZE,
+               "inputs": {}}
+    for size in sizes:
+        print(f"Rendering synthetic data of size {size}", flush=True)
+        results["inputs"][f"synthetic-{size}"] = {
+            "timings": render_charts(synthetic_search_data(rng, size),
+                                     synthetic_storytelling_data(rng, size),
+                                     synthetic_airline_data(rng, size), repeat)}
+    if real:
+        print("Rendering the datasets", flush=True)
+        results["inputs"]["real"] = {"timings": render_charts(*real_data(), repeat)}
+    return results
+
+def main():
+    """
+    Parse the command line arguments, run the render benchmarks and save them
+    """
+    parser = argparse.ArgumentParser(description="Time every chart of the search, "
+                                                 "storytelling and airline overview tabs "
+                                                 "without a display.")
+    parser.add_argument("-s", "--sizes", nargs="+", type=int, default=[5, 31, 365],
+                        help="number of points, bars, distinct delays or airlines "
+                             "of the synthetic data")
+    parser.add_argument("--real", action="store_true",
+                        help="also render the data of the datasets folder")
+    parser.add_argument("-r", "--repeat", type=int, default=5,
+                        help="number of renders of every chart")
+    parser.add_argument("-o", "--output", default=None,
+                        help="results file, benchmarks/render-<commit>.json by default")
+    parser.add_argument("-c", "--compare", default=None,
+                        help="results file of an earlier run to compare with")
+    args = parser.parse_args()
+    results = run_render_benchmarks(args.sizes, args.real, args.repeat)
+    output = args.output or os.path.join("benchmarks",
+                                         f"render-{results['commit'] or 'local'}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as file:
+        json.dump(results, file, indent=2)
+    print(f"Results saved into {output}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            compare(json.load(file), results, "inputs")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""Generate the charts and information of every route, airport and airline without the UI"""
+import argparse
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import matplotlib
+matplotlib.use("Agg")
+from matplotlib.figure import Figure
+import charts
+from model import FlightDataModel
+
+KINDS = {"flight": 0, "airport": 1, "airline": 2}
+CHARTS = {"avg_delay": charts.plot_avg_delay,
+          "on_time": charts.plot_on_time,
+          "time_block": charts.plot_dep_time}
+ALL_SELECTED = [True] * 5
+
+# Loaded once in every worker process by load_worker
+_model: FlightDataModel = None
+_figure: Figure = None
+
+def load_worker():
+    """
+    Initializer of the worker processes, load the datasets and create the figure
+    every chart of the worker is drawn on
+    """
+    global _model, _figure
+    _model = FlightDataModel()
+    _figure = Figure(dpi=85)
+
+def list_groups(kind: str, min_flights: int = 1) -> list[list[str]]:
+    """
+    Return the filters of every route, airport or airline with at least min_flights flights
+    """
+    columns = {"flight": ["ORIGIN", "DEST"], "airport": ["ORIGIN"],
+               "airline": ["OP_CARRIER_AIRLINE_ID"]}[kind]
+    counts = _model.df.groupby(columns).size()
+    counts = counts[counts >= min_flights]
+    if kind == "flight":
+        return [list(key) for key in counts.index]
+    return [[str(key)] for key in counts.index]
+
+def group_name(kind: str, filt: list[str]) -> str:
+    """
+    Return the folder name of a route, airport or airline
+    """
+    if kind == "airline":
+        return f"{float(filt[0]):.0f}"
+    return "-".join(filt)
+
+def report_groups(kind: str, filts: list[list[str]], output: str, formats: list[str]):
+    """
+    Write the charts, chart data and information of several groups of a search state
+    : param kind : "flight", "airport" or "airline"
+    : param filts : the filter of every group
+    : param output : the folder of the report
+    : param formats : image formats of the charts, e.g. ["png", "svg"]
+    : return : a list of the kind, name and number of flights of every group
+    """
+    state = _model.states[KINDS[kind]]
+    rows = []
+    for filt in filts:
+        folder = os.path.join(output, kind, group_name(kind, filt))
+        os.makedirs(folder, exist_ok=True)
+        data, avg_delay = state.avg_flight_delay(filt, ALL_SELECTED, ALL_SELECTED)
+        on_time = state.percent_on_time(filt, ALL_SELECTED, ALL_SELECTED)[1]
+        time_block = state.percent_time_block(filt, ALL_SELECTED, ALL_SELECTED)[1]
+        percentiles = state.delay_percentiles(filt, ALL_SELECTED, ALL_SELECTED)
+        for name, series in (("avg_delay", avg_delay), ("on_time", on_time),
+                             ("time_block", time_block)):
+            series.to_csv(os.path.join(folder, f"{name}.csv"))
+            if series.empty or (name != "avg_delay" and not series.sum()):
+                continue
+            CHARTS[name](_figure, series)
+            for image_format in formats:
+                _figure.savefig(os.path.join(folder, f"{name}.{image_format}"))
+        state.get_breakdown(data).to_csv(os.path.join(folder, "breakdown.csv"), index=False)
+        with open(os.path.join(folder, "info.json"), "w", encoding="utf-8") as file:
+            json.dump({"kind": kind, "filter": filt, "flights": len(data),
+                       "info": state.get_info_str(data, percentiles)}, file, indent=2)
+        rows.append((kind, group_name(kind, filt), len(data)))
+    return rows
+
+def generate_report(output: str, kinds: list[str], formats: list[str], processes: int = None,
+                    min_flights: int = 1, batch_size: int = 50):
+    """
+    Write the report of every group of the selected kinds using a process pool
+    and an index.csv of the groups written
+    : param batch_size : number of groups sent to a worker at a time
+    """
+    os.makedirs(output, exist_ok=True)
+    rows = []
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=processes, initializer=load_worker) as pool:
+        groups = {kind: pool.submit(list_groups, kind, min_flights) for kind in kinds}
+        futures = []
+        num_groups = 0
+        for kind in kinds:
+            filts = groups[kind].result()
+            num_groups += len(filts)
+            for first in range(0, len(filts), batch_size):
+                futures.append(pool.submit(report_groups, kind, filts[first:first + batch_size],
+                                           output, formats))
+        for future in as_completed(futures):
+            rows.extend(future.result())
+            print(f"{len(rows)}/{num_groups} groups done "
+                  f"({time.perf_counter() - start:.0f} s)", flush=True)
+    with open(os.path.join(output, "index.csv"), "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(["KIND", "NAME", "FLIGHTS"])
+        writer.writerows(sorted(rows))
+
+def main():
+    """
+    Parse the command line arguments and generate the report
+    """
+    parser = argparse.ArgumentParser(description="Write the charts, chart data and "
+                                                 "information of every route, airport "
+                                                 "and airline without the UI.")
+    parser.add_argument("-o", "--output", default="reports", help="output folder")
+    parser.add_argument("-k", "--kinds", nargs="+", choices=list(KINDS), default=list(KINDS),
+                        help="groups to report")
+    parser.add_argument("-f", "--formats", nargs="+", choices=["png", "svg"], default=["png"],
+                        help="image formats of the charts")
+    parser.add_argument("-p", "--processes", type=int, default=None,
+                        help="number of worker processes, the number of CPUs by default")
+    parser.add_argument("-m", "--min-flights", type=int, default=1,
+                        help="skip groups with fewer flights")
+    args = parser.parse_args()
+    generate_report(args.output, args.kinds, args.formats, args.processes, args.min_flights)
+
+if __name__ == "__main__":
+    main()
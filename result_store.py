@@ -0,0 +1,67 @@
+"""Store of the chart data and information already computed by the search states"""
+import threading
+from collections import OrderedDict
+
+class ResultStore:
+    """
+    A least recently used store of results by query key. The results are the small
+    series and strings shown by the search tabs, so a store of a few thousand of them
+    takes little memory, and the oldest ones are dropped past max_entries.
+    """
+    def __init__(self, max_entries: int = 2048) -> None:
+        self.__max_entries = max_entries
+        self.__results = OrderedDict()
+        self.__lock = threading.Lock()
+        self.__hits = 0
+        self.__misses = 0
+
+    @property
+    def hits(self):
+        """
+        Getter for hits attribute
+        """
+        return self.__hits
+
+    @property
+    def misses(self):
+        """
+        Getter for misses attribute
+        """
+        return self.__misses
+
+    def __len__(self) -> int:
+        return len(self.__results)
+
+    def __contains__(self, key) -> bool:
+        return key in self.__results
+
+    def get(self, key):
+        """
+        Return the result of a query key, None if it is not stored
+        """
+        with self.__lock:
+            result = self.__results.get(key)
+            if result is None:
+                self.__misses += 1
+            else:
+                self.__hits += 1
+                self.__results.move_to_end(key)
+            return result
+
+    def put(self, key, result):
+        """
+        Store the result of a query key, dropping the least recently used past
+        max_entries
+        """
+        with self.__lock:
+            self.__results[key] = result
+            self.__results.move_to_end(key)
+            while len(self.__results) > self.__max_entries:
+                self.__results.popitem(last=False)
+
+    def clear(self):
+        """
+        Forget every result
+        """
+        with self.__lock:
+            self.__results.clear()
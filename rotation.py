@@ -0,0 +1,59 @@
+"""Aircraft rotation analysis to split departure delays into propagated and originated"""
+import numpy as np
+import pandas as pd
+from indexing import day_numbers
+
+MIN_TURNAROUND = 30
+
+def hhmm_to_minutes(times: np.ndarray) -> np.ndarray:
+    """
+    Convert hhmm clock times (e.g. 1435.0) into minutes after midnight
+    """
+    return times // 100 * 60 + times % 100
+
+def compute_rotation_delays(dataframe: pd.DataFrame,
+                            min_turnaround: int = MIN_TURNAROUND) -> pd.DataFrame:
+    """
+    Follow every aircraft (TAIL_NUM) through its flights in scheduled order and split
+    each departure delay into the part caused by the late arrival of its previous
+    flight and the part that originated at the airport.
+    The inbound delay of a flight is the arrival delay of the previous flight of the
+    same aircraft if it landed at the airport of departure on the same or previous
+    day. Only the inbound delay exceeding the slack of the scheduled ground time over
+    min_turnaround minutes is propagated, the ground time counting the days between
+    the scheduled arrival and the next scheduled departure.
+    : return : a dataframe with INBOUND_DELAY, PROPAGATED_DELAY and ORIGINATED_DELAY
+               columns aligned with the dataframe, NaN for flights that did not depart
+    """
+    dep_delay = dataframe["DEP_DELAY"].to_numpy(dtype=np.float64)
+    arr_delay = dataframe["ARR_DELAY"].to_numpy(dtype=np.float64)
+    tails, _ = pd.factorize(dataframe["TAIL_NUM"])
+    days = day_numbers(dataframe["FL_DATE"])
+    sched_dep = (hhmm_to_minutes(dataframe["DEP_TIME"].to_numpy(dtype=np.float64))
+                 - dep_delay) % 1440
+    sched_arr = (hhmm_to_minutes(dataframe["ARR_TIME"].to_numpy(dtype=np.float64))
+                 - arr_delay) % 1440
+    flown = np.flatnonzero((tails >= 0) & ~np.isnan(sched_dep))
+    # Sort the flights once by aircraft, then by scheduled departure
+    order = flown[np.lexsort((days[flown] * 1440 + sched_dep[flown], tails[flown]))]
+    prev, cur = order[:-1], order[1:]
+    origins = dataframe["ORIGIN"].to_numpy()
+    dests = dataframe["DEST"].to_numpy()
+    linked = ((tails[prev] == tails[cur]) & (dests[prev] == origins[cur])
+              & (days[cur] - days[prev] <= 1) & ~np.isnan(arr_delay[prev]))
+    inbound = np.zeros(len(order))
+    inbound[1:] = np.where(linked, np.maximum(arr_delay[prev], 0), 0)
+    # Minutes from the first day, an arrival before the departure clock time lands the
+    # next day, so a leg on the day before is not given a day less of ground time
+    departure = days * 1440 + sched_dep
+    arrival = days * 1440 + sched_arr + np.where(sched_arr < sched_dep, 1440, 0)
+    slack = np.full(len(order), np.inf)
+    slack[1:] = np.where(linked,
+                         np.maximum(departure[cur] - arrival[prev] - min_turnaround, 0),
+                         np.inf)
+    late = np.maximum(dep_delay[order], 0)
+    propagated = np.minimum(late, np.maximum(inbound - slack, 0))
+    result = pd.DataFrame(np.nan, index=dataframe.index,
+                          columns=["INBOUND_DELAY", "PROPAGATED_DELAY", "ORIGINATED_DELAY"])
+    result.iloc[order] = np.column_stack([inbound, propagated, late - propagated])
+    return result
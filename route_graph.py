@@ -0,0 +1,99 @@
+"""Compact route network of airports for connection searches"""
+import numpy as np
+import pandas as pd
+
+class RouteGraph:
+    """
+    Directed graph of the routes between airports stored as CSR adjacency arrays,
+    for outgoing and incoming routes, with the flight count, average arrival delay
+    and cancellation rate of every route.
+    """
+    def __init__(self, airports: np.ndarray, matrices: dict) -> None:
+        self.__airports = airports
+        self.__codes = {airport: code for code, airport in enumerate(airports)}
+        flights = np.nan_to_num(matrices["FLIGHTS"])
+        self.__outgoing = self.__to_csr(flights, matrices)
+        self.__incoming = self.__to_csr(flights.T, {key: matrix.T
+                                                    for key, matrix in matrices.items()})
+
+    @staticmethod
+    def __to_csr(flights: np.ndarray, matrices: dict):
+        """
+        Convert dense matrices into CSR arrays of the edges with at least one flight
+        : return : a tuple of the row pointers, the column of every edge and a dict
+                   of the statistics of every edge
+        """
+        rows, columns = np.nonzero(flights)
+        indptr = np.concatenate([[0], np.cumsum(np.bincount(rows, minlength=len(flights)))])
+        edges = {"FLIGHTS": flights[rows, columns],
+                 "ARR_DELAY": np.nan_to_num(matrices["ARR_DELAY"][rows, columns]),
+                 "CANCELLED": np.nan_to_num(matrices["CANCELLED"][rows, columns])}
+        return indptr, columns, edges
+
+    @property
+    def airports(self):
+        """
+        Getter for airports attribute
+        """
+        return self.__airports
+
+    def neighbours(self, airport: str, incoming: bool = False):
+        """
+        Return the positions of the edges and the codes of the airports reachable from
+        an airport, or the airports that fly to it if incoming is True
+        """
+        indptr, columns, _ = self.__incoming if incoming else self.__outgoing
+        code = self.__codes.get(airport)
+        if code is None:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        edges = np.arange(indptr[code], indptr[code + 1])
+        return edges, columns[edges]
+
+    def destinations(self) -> dict:
+        """
+        Return a dict of the set of destination airports of every origin airport
+        """
+        indptr, columns, _ = self.__outgoing
+        return {self.__airports[code]: set(self.__airports[columns[start:end]])
+                for code, (start, end) in enumerate(zip(indptr[:-1], indptr[1:])) if start < end}
+
+    def connections(self, origin: str, dest: str, min_flights: int = 1,
+                    cancel_penalty: float = 180, limit: int = 20) -> pd.DataFrame:
+        """
+        Return the direct route and one-stop itineraries from origin to dest ranked by
+        score = combined arrival delay + cancellation risk * cancel_penalty
+        : param min_flights : legs with fewer flights are left out
+        : param cancel_penalty : minutes a cancellation is considered to cost
+        : param limit : maximum number of one-stop itineraries
+        : return : a dataframe with one row per itinerary, best first
+        """
+        out_edges, via_out = self.neighbours(origin)
+        in_edges, via_in = self.neighbours(dest, incoming=True)
+        _, out_pos, in_pos = np.intersect1d(via_out, via_in, assume_unique=True,
+                                            return_indices=True)
+        first, second = out_edges[out_pos], in_edges[in_pos]
+        out_stats, in_stats = self.__outgoing[2], self.__incoming[2]
+        itineraries = pd.DataFrame({
+            "VIA": self.__airports[via_out[out_pos]],
+            "FIRST_LEG_FLIGHTS": out_stats["FLIGHTS"][first],
+            "SECOND_LEG_FLIGHTS": in_stats["FLIGHTS"][second],
+            "ARR_DELAY": out_stats["ARR_DELAY"][first] + in_stats["ARR_DELAY"][second],
+            "CANCEL_RISK": 1 - (1 - out_stats["CANCELLED"][first])
+                           * (1 - in_stats["CANCELLED"][second])})
+        itineraries = itineraries[(itineraries["FIRST_LEG_FLIGHTS"] >= min_flights) &
+                                  (itineraries["SECOND_LEG_FLIGHTS"] >= min_flights)]
+        itineraries = itineraries.assign(SCORE=itineraries["ARR_DELAY"]
+                                         + itineraries["CANCEL_RISK"] * cancel_penalty)
+        itineraries = itineraries.nsmallest(limit, "SCORE")
+        direct = out_edges[via_out == self.__codes.get(dest, -1)]
+        if len(direct) and out_stats["FLIGHTS"][direct[0]] >= min_flights:
+            edge = direct[0]
+            direct_route = pd.DataFrame({"VIA": ["Direct"],
+                                         "FIRST_LEG_FLIGHTS": [out_stats["FLIGHTS"][edge]],
+                                         "SECOND_LEG_FLIGHTS": [np.nan],
+                                         "ARR_DELAY": [out_stats["ARR_DELAY"][edge]],
+                                         "CANCEL_RISK": [out_stats["CANCELLED"][edge]]})
+            direct_route["SCORE"] = (direct_route["ARR_DELAY"]
+                                     + direct_route["CANCEL_RISK"] * cancel_penalty)
+            itineraries = pd.concat([direct_route, itineraries])
+        return itineraries.reset_index(drop=True)
@@ -1,16 +1,23 @@
 """Frames for data exploration tabs of Flight within USA displayer"""
 import tkinter as tk
-from tkinter import ttk
+from tkinter import ttk, filedialog
 from abc import ABC, abstractmethod
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
 import matplotlib
+import charts
+from export import FORMATS
+from indexing import hours_in_range
+from prefix_index import PrefixIndex
+from instrumentation import instrumentation
 matplotlib.use("TkAgg")
 
 class SearchTab(tk.Frame, ABC):
     """
     Abstract Frame for user to select subsets of data to view information.
     """
+    breakdown_heading = "Airline ID"
+
     def __init__(self, parent, controller, data, **kwargs) -> None:
         super().__init__(parent, **kwargs)
         self.controller = controller
@@ -19,32 +26,46 @@ class SearchTab(tk.Frame, ABC):
         self.init_components()
         self.graph_command = [self.graph.plot_avg_delay_graph,
                               self.graph.plot_on_time_graph,
-                              self.graph.plot_dep_time_graph]
+                              self.graph.plot_dep_time_graph,
+                              self.graph.plot_percentile_graph]
         self.cur_graph = self.graph_command[0]
 
     def init_components(self):
         """
-        Create a graph frame, text, scrollbar to show statistics and a sortbar
-        for user to select subsets of data.
-        """
-        self.text = tk.Text(self, width=29, state="disabled")
-        scroll_bar = tk.Scrollbar(self, command=self.text.yview)
+        Create a label of notes about the filter, a graph frame, text, scrollbar to show
+        statistics, a table of the breakdown by airline or airport and a sortbar for user
+        to select subsets of data and export them.
+        """
+        info_frame = tk.Frame(self)
+        self.__note = tk.StringVar()
+        tk.Label(info_frame, textvariable=self.__note, wraplength=230,
+                 justify="left").pack(side="top")
+        text_frame = tk.Frame(info_frame)
+        self.text = tk.Text(text_frame, width=29, state="disabled")
+        scroll_bar = tk.Scrollbar(text_frame, command=self.text.yview)
         self.text.config(yscrollcommand=scroll_bar.set)
+        self.breakdown = BreakdownTable(info_frame, self.breakdown_heading)
         graph_and_bt = self.create_graph_and_buttons()
         self.sort_bar = SortBar(self)
+        ExportFrame(self.sort_bar, self.controller).pack(side="bottom", pady=5)
         self.sort_bar.add_label("*The line graph will not be plotted*\n"+
                                 "*if all the flights are in one week*")
         self.sort_bar.add_checkboxes()
-        self.text.pack(side="left", fill="y")
+        self.sort_bar.add_date_range(self.controller.get_dates())
+        self.text.pack(side="left", fill="both", expand=True)
         scroll_bar.pack(side="left", fill="y")
+        self.breakdown.pack(side="bottom", fill="x")
+        text_frame.pack(side="top", fill="both", expand=True)
+        info_frame.pack(side="left", fill="y")
         graph_and_bt.pack(side="left", fill="both",expand="True")
         self.sort_bar.pack(side="right", padx=10)
 
     def create_graph_and_buttons(self):
         """
-        Create a frame widget consisted of a graph figure and 3 buttons
-        to plot average delay graph, percentage of on-time flight graph
-        and percentage of flight departed in each time block graph.
+        Create a frame widget consisted of a graph figure and 4 buttons
+        to plot average delay graph, percentage of on-time flight graph,
+        percentage of flight departed in each time block graph and delay
+        percentiles graph.
         : return : a frame widget with figure and buttons
         """
         center_frame = tk.Frame(self)
@@ -56,24 +77,38 @@ class SearchTab(tk.Frame, ABC):
                                  command=self.handle_on_time_button)
         time_blk = tk.Button(button_frame, text="% Departure Time Block",
                              command=self.handle_time_blk_button)
+        percentile = tk.Button(button_frame, text="Delay Percentiles",
+                               command=self.handle_percentile_button)
         self.graph.pack(side="top", fill="both", expand=True)
         avg_delay.pack(side="left")
         on_time.pack(side="left")
         time_blk.pack(side="left")
+        percentile.pack(side="left")
         button_frame.pack(side="bottom")
         return center_frame
 
     def get_selected_filter(self):
         """
-        Get the value of combobox(es) and checkboxes selected by user
-        : return : a tuple consisted of lists of selected filter
+        Get the value of combobox(es), checkboxes, date range and departure hours
+        selected by user
+        : return : a tuple consisted of lists of selected filter, the date range, the
+                   days of the week and the departure hours
         """
         a_code = []
         for combo_box in self.sort_bar.cb_list:
             a_code.append(combo_box.cb_val)
         wk = self.sort_bar.checkboxes.week_var
         tb = self.sort_bar.checkboxes.time_blk_var
-        return a_code, wk, tb
+        weekdays = self.sort_bar.checkboxes.weekday_var
+        hours = self.sort_bar.checkboxes.hours_var
+        return a_code, wk, tb, self.sort_bar.date_range.selected_range, weekdays, hours
+
+    def get_granularity(self):
+        """
+        Get the granularity of the average delay graph selected by user
+        : return : "Weekly", "Daily", "Weekday" or "Hourly"
+        """
+        return self.sort_bar.date_range.granularity
 
     def get_available_dest(self):
         """
@@ -92,6 +127,12 @@ class SearchTab(tk.Frame, ABC):
         self.text.insert("end", text)
         self.text["state"] = "disabled"
 
+    def update_breakdown(self, rows):
+        """
+        Update the breakdown table
+        """
+        self.breakdown.update_rows(rows)
+
     def update_lower_box(self, *args):
         """
         Update the choices available of the destination airport combobox
@@ -99,10 +140,32 @@ class SearchTab(tk.Frame, ABC):
         new_load = self.get_available_dest()
         self.sort_bar.cb_list[1].update_load(new_load)
 
+    def show_filter(self, a_code: list[str], date_range=None, granularity: str = None,
+                    note: str = ""):
+        """
+        Select a filter, e.g. from another tab drilling down into this one, with every
+        week, time block, day of the week and hour and the average delay graph to be
+        plotted
+        : param a_code : the value of every combobox
+        : param date_range : a tuple of start and end dates, None for every date
+        : param granularity : the granularity of the average delay graph, None to keep it
+        : param note : a note about the filter, shown until another graph is plotted
+        """
+        self.__note.set(note)
+        self.sort_bar.checkboxes.select_all()
+        for index, (combo_box, value) in enumerate(zip(self.sort_bar.cb_list, a_code)):
+            combo_box.cb_val = value
+            if index == 0 and len(self.sort_bar.cb_list) > 1:
+                self.update_lower_box()
+        self.sort_bar.date_range.select(date_range, granularity)
+        self.cur_graph = self.graph_command[0]
+
     def handle_avg_button(self):
         """
         Event handler for Average Delay Button.
         """
+        instrumentation.begin("Average Delay")
+        self.__note.set("")
         self.cur_graph = self.graph_command[0]
         self.after(1,self.controller.avg_delay_flight)
 
@@ -110,6 +173,8 @@ class SearchTab(tk.Frame, ABC):
         """
         Event handler for % On-time Flight Button
         """
+        instrumentation.begin("% On-time Flight")
+        self.__note.set("")
         self.cur_graph = self.graph_command[1]
         self.after(1, self.controller.percent_on_time)
 
@@ -117,9 +182,20 @@ class SearchTab(tk.Frame, ABC):
         """
         Event handler for % Departure Time Block
         """
+        instrumentation.begin("% Departure Time Block")
+        self.__note.set("")
         self.cur_graph = self.graph_command[2]
         self.after(1,self.controller.percent_time_blk)
 
+    def handle_percentile_button(self):
+        """
+        Event handler for Delay Percentiles Button
+        """
+        instrumentation.begin("Delay Percentiles")
+        self.__note.set("")
+        self.cur_graph = self.graph_command[3]
+        self.after(1, self.controller.delay_percentile)
+
     @abstractmethod
     def init_sort_bar(self):
         """
@@ -158,6 +234,8 @@ class AirportTab(SearchTab):
         self.sort_bar.add_cb_box("Airport:", sorted(self.data.keys()))
 
 class AirlineTab(SearchTab):
+    breakdown_heading = "Airport"
+
     def __init__(self, parent, controller, data, **kwargs) -> None:
         super().__init__(parent, controller, data, **kwargs)
         self.init_sort_bar()
@@ -175,6 +253,7 @@ class SortBar(tk.Frame):
     def __init__(self, parent, **kwargs) -> None:
         super().__init__(parent, **kwargs)
         self.__checkboxes: CheckBoxFrame
+        self.__date_range: DateRangeFrame
         self.__cb_list = []
 
     @property
@@ -191,6 +270,13 @@ class SortBar(tk.Frame):
         """
         return self.__checkboxes
 
+    @property
+    def date_range(self):
+        """
+        Getter for date_range attribute
+        """
+        return self.__date_range
+
     def add_cb_box(self, label: str, load: list):
         """
         Add a combobox to the frame
@@ -205,9 +291,17 @@ class SortBar(tk.Frame):
         """
         Add a checkbox frame
         """
-        self.__checkboxes = CheckBoxFrame(self)
+        self.__checkboxes = CheckBoxFrame(self, days_and_hours=True)
         self.__checkboxes.pack(side="bottom")
 
+    def add_date_range(self, dates: list):
+        """
+        Add a date range frame
+        : param dates : the dates available in the data
+        """
+        self.__date_range = DateRangeFrame(self, dates)
+        self.__date_range.pack(side="bottom")
+
     def add_label(self, text:str):
         """
         Add a label widget
@@ -215,19 +309,101 @@ class SortBar(tk.Frame):
         label = tk.Label(self, text=text)
         label.pack(side="bottom")
 
+class ExportFrame(tk.Frame):
+    """
+    A frame for user to export the flights under the filter into a file, written in
+    a background thread while a progress bar shows how much is done
+    """
+    SCOPES = {"Flights shown": "selection", "All flights under filter": "all"}
+    POLL_INTERVAL = 100
+
+    def __init__(self, parent, controller, **kwargs) -> None:
+        super().__init__(parent, **kwargs)
+        self.controller = controller
+        self.__job = None
+        self.__progress = tk.DoubleVar(value=0)
+        self.__status = tk.StringVar()
+        self.init_components()
+
+    def init_components(self):
+        """
+        Create comboboxes for the file format and the flights to export, a button
+        to start or cancel the export, a progress bar and a status label
+        """
+        self.__format = ComboboxFrame(self, "Export format:", list(FORMATS))
+        self.__scope = ComboboxFrame(self, "Export:", list(self.SCOPES))
+        self.__button = tk.Button(self, text="Export", command=self.handle_export_button)
+        progress_bar = ttk.Progressbar(self, variable=self.__progress, maximum=1.0,
+                                       length=150)
+        status = tk.Label(self, textvariable=self.__status, wraplength=200)
+        self.__format.pack(side="top")
+        self.__scope.pack(side="top")
+        self.__button.pack(side="top")
+        progress_bar.pack(side="top")
+        status.pack(side="top")
+
+    def handle_export_button(self):
+        """
+        Event handler for Export Button, ask for the file and start the export,
+        or cancel the export running
+        """
+        if self.__job is not None:
+            self.__job.cancel()
+            return
+        file_format = self.__format.cb_val
+        scope = self.SCOPES.get(self.__scope.cb_val)
+        if file_format not in FORMATS or scope is None:
+            self.__status.set("Invalid export format or flights to export")
+            return
+        path = filedialog.asksaveasfilename(defaultextension=FORMATS[file_format],
+                                            filetypes=[(file_format,
+                                                        f"*{FORMATS[file_format]}")])
+        if not path:
+            return
+        self.__progress.set(0)
+        self.__job = self.controller.export_data(scope, path, file_format)
+        self.__button.config(text="Cancel")
+        self.poll_export()
+
+    def poll_export(self):
+        """
+        Show the progress of the export until its thread finishes
+        """
+        job = self.__job
+        self.__progress.set(job.progress)
+        if job.is_alive():
+            self.__status.set(f"Exporting... {job.rows} flights written")
+            self.after(self.POLL_INTERVAL, self.poll_export)
+            return
+        self.__job = None
+        self.__button.config(text="Export")
+        if job.error:
+            self.__status.set(f"Export failed: {job.error}")
+        elif job.canceled:
+            self.__status.set("Export canceled")
+        else:
+            self.__status.set(f"Exported {job.rows} flights")
+
 class CheckBoxFrame(tk.Frame):
     """
-    A frame consisted of checkboxes for user to select subsets of data
+    A frame consisted of checkboxes for user to select subsets of data, with the days
+    of the week and departure hours when days_and_hours is True
     """
     WEEK = ["Week 1", "Week 2", "Week 3", "Week 4", "Week 5"]
     TIME_BLK = ["Early Morning", "Morning", "Afternoon", "Evening", "Night"]
+    WEEKDAY = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
 
-    def __init__(self, parent, **kwargs) -> None:
+    def __init__(self, parent, days_and_hours: bool = False, **kwargs) -> None:
         super().__init__(parent, **kwargs)
+        self.days_and_hours = days_and_hours
         self.wk_numpicks = 5
         self.time_blk_numpicks = 5
+        self.weekday_numpicks = 7
         self.__week_var = [tk.BooleanVar(value=True) for _ in range(5)]
         self.__time_blk_var = [tk.BooleanVar(value=True) for _ in range(5)]
+        self.__weekday_var = [tk.BooleanVar(value=True) for _ in range(7)]
+        self.__first_hour = tk.IntVar(value=0)
+        self.__last_hour = tk.IntVar(value=23)
         self.init_components()
 
     @property
@@ -246,9 +422,38 @@ class CheckBoxFrame(tk.Frame):
         time_blk_lst = [var.get() for var in self.__time_blk_var]
         return time_blk_lst
 
+    @property
+    def weekday_var(self):
+        """
+        Get the value of the day of the week checkboxes, Monday first
+        """
+        return [var.get() for var in self.__weekday_var]
+
+    @property
+    def hours_var(self):
+        """
+        Get the departure hours from the first to the last hour selected, wrapping
+        past midnight
+        """
+        return hours_in_range(self.__first_hour.get(), self.__last_hour.get())
+
+    def select_all(self):
+        """
+        Check every checkbox and select every departure hour
+        """
+        for variable in self.__week_var + self.__time_blk_var + self.__weekday_var:
+            variable.set(True)
+        self.wk_numpicks = len(self.__week_var)
+        self.time_blk_numpicks = len(self.__time_blk_var)
+        self.weekday_numpicks = len(self.__weekday_var)
+        self.__first_hour.set(0)
+        self.__last_hour.set(23)
+
     def init_components(self):
         """
-        Create 2 sets of comboboxes, week of the month and departure time block
+        Create 2 sets of comboboxes, week of the month and departure time block, and
+        with days_and_hours a set of day of the week comboboxes and 2 spinboxes of the
+        first and last departure hour
         """
         week_label = tk.Label(self,text="Week of the month (min: 2):")
         week_label.pack(anchor="w")
@@ -264,6 +469,26 @@ class CheckBoxFrame(tk.Frame):
                                       variable=self.__time_blk_var[_],
                                       command=self.checkmin(self.__time_blk_var[_],1,"time_blk"))
             checkbox.pack(anchor="w")
+        if not self.days_and_hours:
+            return
+        weekday_label = tk.Label(self, text="Day of the week (min: 1):")
+        weekday_label.pack(anchor="w")
+        weekday_frame = tk.Frame(self)
+        for day, name in enumerate(self.WEEKDAY):
+            checkbox = tk.Checkbutton(weekday_frame, text=name,
+                                      variable=self.__weekday_var[day],
+                                      command=self.checkmin(self.__weekday_var[day], 1,
+                                                            "weekday"))
+            checkbox.grid(row=day // 4, column=day % 4, sticky="w")
+        weekday_frame.pack(anchor="w")
+        hour_label = tk.Label(self, text="Departure hours (from, to):")
+        hour_label.pack(anchor="w")
+        hour_frame = tk.Frame(self)
+        for variable in (self.__first_hour, self.__last_hour):
+            spinbox = tk.Spinbox(hour_frame, from_=0, to=23, width=3, wrap=True,
+                                 state="readonly", textvariable=variable)
+            spinbox.pack(side="left")
+        hour_frame.pack(anchor="w")
 
     def checkmin(self, var, minpick, check_type):
         """
@@ -275,35 +500,84 @@ class CheckBoxFrame(tk.Frame):
         : return : a function that prevent unchecking checkboxes if the amount of checkboxes
                    checked is lower than the minimum setted.
         """
+        numpicks = f"{check_type}_numpicks"
         def update_num_picks():
             if not var.get():
-                if check_type == "wk":
-                    if self.wk_numpicks > minpick:
-                        self.wk_numpicks -= 1
-                    else:
-                        var.set(True)
+                if getattr(self, numpicks) > minpick:
+                    setattr(self, numpicks, getattr(self, numpicks) - 1)
                 else:
-                    if self.time_blk_numpicks > minpick:
-                        self.time_blk_numpicks -= 1
-                    else:
-                        var.set(True)
+                    var.set(True)
             else:
-                if check_type == "wk":
-                    self.wk_numpicks += 1
-                else:
-                    self.time_blk_numpicks += 1
+                setattr(self, numpicks, getattr(self, numpicks) + 1)
         return update_num_picks
 
+class DateRangeFrame(tk.Frame):
+    """
+    A frame consisted of comboboxes for user to select the start and end dates
+    and the granularity of the average delay graph
+    """
+    GRANULARITY = ["Weekly", "Daily", "Weekday", "Hourly"]
+
+    def __init__(self, parent, dates: list, **kwargs) -> None:
+        super().__init__(parent, **kwargs)
+        self.__dates = dates
+        self.__start: ComboboxFrame
+        self.__end: ComboboxFrame
+        self.__granularity: ComboboxFrame
+        self.init_components()
+
+    @property
+    def selected_range(self):
+        """
+        Get the start and end dates selected, None if the whole data is selected
+        """
+        selected = (self.__start.cb_val, self.__end.cb_val)
+        if selected == (self.__dates[0], self.__dates[-1]):
+            return None
+        return selected
+
+    @property
+    def granularity(self):
+        """
+        Get the granularity selected
+        """
+        return self.__granularity.cb_val
+
+    def select(self, date_range=None, granularity: str = None):
+        """
+        Select the start and end dates of date_range, every date when None, and the
+        granularity unless it is None
+        """
+        start, end = date_range if date_range else (self.__dates[0], self.__dates[-1])
+        self.__start.cb_val = start
+        self.__end.cb_val = end
+        if granularity is not None:
+            self.__granularity.cb_val = granularity
+
+    def init_components(self):
+        """
+        Create 3 comboboxes, start date, end date and granularity
+        """
+        self.__start = ComboboxFrame(self, "Start date:", self.__dates)
+        self.__end = ComboboxFrame(self, "End date:", self.__dates,
+                                   default=len(self.__dates) - 1)
+        self.__granularity = ComboboxFrame(self, "Average delay graph by:", self.GRANULARITY)
+        self.__start.pack(side="top")
+        self.__end.pack(side="top")
+        self.__granularity.pack(side="top")
+
 class ComboboxFrame(tk.Frame):
     """
     A frame consisted of a label indicating the values of the combobox
     and a combobox
     """
-    def __init__(self, parent, label: str, load: list, **kwargs) -> None:
+    def __init__(self, parent, label: str, load: list, default: int = 0, **kwargs) -> None:
         super().__init__(parent, **kwargs)
         self.__cb_val = tk.StringVar()
         self.__label = label
         self.__load = load
+        self.__index = PrefixIndex(load)
+        self.__default = default
         self.init_components()
 
     @property
@@ -313,13 +587,20 @@ class ComboboxFrame(tk.Frame):
         """
         return self.__cb_val.get()
 
+    @cb_val.setter
+    def cb_val(self, value):
+        """
+        Select a value of the combobox
+        """
+        self.__cb_val.set(value)
+
     def init_components(self):
         """
         Create a label and a combobox with values recieved when initiated.
         """
         cb_box_label = tk.Label(self, text=self.__label)
         self.__cb_box = ttk.Combobox(self, textvariable=self.__cb_val, values=self.__load)
-        self.__cb_box.current(newindex=0)
+        self.__cb_box.current(newindex=self.__default)
         cb_box_label.pack()
         self.__cb_box.pack()
         self.__cb_box.bind("<KeyRelease>", self.search)
@@ -338,6 +619,7 @@ class ComboboxFrame(tk.Frame):
         : param new_load : a list of values to add to combobox
         """
         self.__load = new_load
+        self.__index = PrefixIndex(new_load)
         self.__cb_box["values"] = self.__load
         self.__cb_box.current(newindex=0)
 
@@ -349,11 +631,7 @@ class ComboboxFrame(tk.Frame):
         if not inputted_val:
             self.__cb_box["values"] = self.__load
         else:
-            option = []
-            for item in self.__load:
-                if item.startswith(inputted_val.upper()):
-                    option.append(item)
-            self.__cb_box["values"] = option
+            self.__cb_box["values"] = self.__index.matches(inputted_val)
 
 class SearchTabGraphFrame(tk.Frame):
     """A frame that show graphs for Search tabs"""
@@ -372,54 +650,158 @@ class SearchTabGraphFrame(tk.Frame):
         toolbar.update()
         self.canvas.get_tk_widget().pack(side="top", fill="both", expand=True)
 
+    def draw(self, plot, data):
+        """
+        Plot the data on the figure with a function of charts and draw the canvas
+        """
+        with instrumentation.stage("plot"):
+            plot(self.canvas.figure, data)
+        with instrumentation.stage("canvas draw"):
+            self.canvas.draw()
+
     def plot_avg_delay_graph(self, data):
         """
         Plot Average Delay Line Graph based on the data recieved
         : param data : data to be used to plot graph
         """
-        self.canvas.figure.clf()
-        ax = self.canvas.figure.subplots()
-        tick_label = [f"Week {i}" for i in data.index]
-        ax.set_xlabel("Week of the Month")
-        ax.set_ylabel("Average Delay Time (mins)")
-        ax.set_title("Average Delays")
-        ax.set_xticks(data.index, tick_label)
-        ax.plot(data.index, data["DEP_DELAY"], label="Departure Delay", color="lime")
-        ax.plot(data.index, data["ARR_DELAY"], label="Arrival Delay", color="red")
-        ax.legend(loc="lower left", bbox_to_anchor=(0,1))
-        ax.grid(axis="y")
-        self.canvas.draw()
+        self.draw(charts.plot_avg_delay, data)
 
     def plot_on_time_graph(self, data):
         """
         Plot Percentage of on-time flights Graph based on the data recieved
         : param data : data to be used to plot graph
         """
-        self.canvas.figure.clf()
-        ax = self.canvas.figure.subplots()
-        colors = ["lime","darkorange","cyan","red","magenta","blue"]
-        pie = ax.pie(data, colors=colors, startangle=90)
-        percent = 100.*data/data.sum()
-        labels = ["{0} - {1:1.2f} %".format(i, j) for i, j in zip(data.index,percent)]
-        ax.set_title("Percentage of Flight departing on-time")
-        ax.legend(pie[0], labels, title="Flight", loc="lower right",
-                bbox_to_anchor=(1,0), fontsize=8,
-                bbox_transform=self.canvas.figure.transFigure, ncol=2)
-        self.canvas.draw()
+        self.draw(charts.plot_on_time, data)
 
     def plot_dep_time_graph(self, data):
         """
         Plot Percentage of flight in each time block Graph based on the data recieved
         : param data : data to be used to plot graph
         """
-        self.canvas.figure.clf()
-        ax = self.canvas.figure.subplots()
-        colors = ["lime","darkorange","cyan","red","magenta"]
-        pie = ax.pie(data, colors=colors, startangle=90)
-        percent = 100.*data/data.sum()
-        labels = ["{0} - {1:1.2f} %".format(i, j) for i, j in zip(data.index,percent)]
-        ax.set_title("Percentage of Flight in each Time Block")
-        ax.legend(pie[0], labels, title="Time Block", loc="lower right",
-                bbox_to_anchor=(1,0), fontsize=8,
-                bbox_transform=self.canvas.figure.transFigure, ncol=2)
-        self.canvas.draw()
+        self.draw(charts.plot_dep_time, data)
+
+    def plot_percentile_graph(self, data):
+        """
+        Plot Delay Percentiles Line Graph based on the data recieved
+        : param data : data to be used to plot graph
+        """
+        self.draw(charts.plot_percentiles, data)
+
+class BreakdownTable(tk.Frame):
+    """
+    A table of the number of flights and average delays of every airline or airport.
+    Only the rows in view are inserted into the Treeview, so it stays fast to fill and
+    scroll with hundreds of rows, and clicking a heading sorts the rows already received.
+    """
+    VISIBLE_ROWS = 12
+    COLUMNS = (("key", 75, "{:.0f}"), ("flights", 55, "{:.0f}"),
+               ("dep_delay", 90, "{:.2f}"), ("arr_delay", 90, "{:.2f}"))
+
+    def __init__(self, parent, key_heading: str, **kwargs) -> None:
+        super().__init__(parent, **kwargs)
+        self.__headings = (key_heading, "Flights", "AVG DEP Delay", "AVG ARR Delay")
+        self.__rows = None
+        self.__first = 0
+        self.__sort_column = None
+        self.__descending = False
+        self.init_components()
+
+    def init_components(self):
+        """
+        Create a Treeview with a heading for every column and a scrollbar
+        """
+        self.table = ttk.Treeview(self, columns=[column[0] for column in self.COLUMNS],
+                                  show="headings", height=self.VISIBLE_ROWS)
+        for position, (column, width, _) in enumerate(self.COLUMNS):
+            self.table.heading(column, text=self.__headings[position],
+                               command=lambda x=position: self.sort_by(x))
+            self.table.column(column, width=width, anchor="center")
+        self.scroll_bar = tk.Scrollbar(self, command=self.scroll)
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.table.bind(sequence, self.handle_mouse_wheel)
+        self.table.pack(side="left", fill="x", expand=True)
+        self.scroll_bar.pack(side="left", fill="y")
+
+    def update_rows(self, rows):
+        """
+        Show new rows, sorted by the column selected last
+        : param rows : a DataFrame with the key, number of flights, average departure
+                       and arrival delay columns in order
+        """
+        self.__rows = rows
+        self.__first = 0
+        if self.__sort_column is not None:
+            self.__rows = self.sorted_rows()
+        self.render()
+
+    def sorted_rows(self):
+        """
+        Return the rows sorted by the selected column, missing values last
+        """
+        return self.__rows.sort_values(self.__rows.columns[self.__sort_column],
+                                       ascending=not self.__descending,
+                                       na_position="last", kind="stable")
+
+    def sort_by(self, position: int):
+        """
+        Event handler for a heading, sort by its column, in the other direction when
+        it is already sorted by it
+        """
+        if self.__rows is None:
+            return
+        self.__descending = position == self.__sort_column and not self.__descending
+        self.__sort_column = position
+        for column, (name, _, _) in enumerate(self.COLUMNS):
+            arrow = (" ▼" if self.__descending else " ▲") if column == position else ""
+            self.table.heading(name, text=self.__headings[column] + arrow)
+        self.__rows = self.sorted_rows()
+        self.__first = 0
+        self.render()
+
+    def scroll(self, *args):
+        """
+        Scroll the rows in view, called by the scrollbar like Treeview.yview
+        """
+        if self.__rows is None:
+            return
+        if args[0] == "moveto":
+            first = int(float(args[1]) * len(self.__rows))
+        else:
+            step = self.VISIBLE_ROWS if args[2] == "pages" else 1
+            first = self.__first + int(args[1]) * step
+        self.__first = max(0, min(first, len(self.__rows) - self.VISIBLE_ROWS))
+        self.render()
+
+    def handle_mouse_wheel(self, event):
+        """
+        Event handler for the mouse wheel over the table
+        """
+        if event.num == 5 or event.delta < 0:
+            self.scroll("scroll", 1, "units")
+        else:
+            self.scroll("scroll", -1, "units")
+        return "break"
+
+    def render(self):
+        """
+        Insert the rows in view into the Treeview and move the scrollbar
+        """
+        self.table.delete(*self.table.get_children())
+        if self.__rows is None or self.__rows.empty:
+            self.scroll_bar.set(0, 1)
+            return
+        last = self.__first + self.VISIBLE_ROWS
+        for row in self.__rows.iloc[self.__first:last].itertuples(index=False):
+            self.table.insert("", "end", values=[self.format_value(value, column[2])
+                                                 for value, column in zip(row, self.COLUMNS)])
+        self.scroll_bar.set(self.__first / len(self.__rows),
+                            min(last, len(self.__rows)) / len(self.__rows))
+
+    @staticmethod
+    def format_value(value, pattern: str) -> str:
+        """
+        Format a value of the table, "-" if it is missing and airport codes as they are
+        """
+        if isinstance(value, str):
+            return value
+        return "-" if value != value else pattern.format(value)
@@ -0,0 +1,328 @@
+"""Local HTTP server answering delay queries of Flight within USA displayer as JSON"""
+import argparse
+import json
+import threading
+import time
+from collections import deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+import numpy as np
+import pandas as pd
+from indexing import hours_in_range
+from model import FlightDataModel, SearchState
+from percentiles import DelayPercentileIndex
+
+class QueryError(Exception):
+    """
+    Error of a request that cannot be answered, sent back with status 400
+    """
+
+class LatencyMetrics:
+    """
+    Thread-safe count, error count and recent latencies of the requests of every endpoint
+    """
+    def __init__(self, window: int = 10000) -> None:
+        self.__lock = threading.Lock()
+        self.__window = window
+        self.__latencies = {}
+        self.__counts = {}
+        self.__errors = {}
+
+    def record(self, endpoint: str, seconds: float, error: bool = False):
+        """
+        Record the latency of a request
+        """
+        with self.__lock:
+            if endpoint not in self.__latencies:
+                self.__latencies[endpoint] = deque(maxlen=self.__window)
+                self.__counts[endpoint] = 0
+                self.__errors[endpoint] = 0
+            self.__latencies[endpoint].append(seconds)
+            self.__counts[endpoint] += 1
+            self.__errors[endpoint] += error
+
+    def summary(self) -> dict:
+        """
+        Return the number of requests and errors and the mean, P50, P95 and P99 latency
+        in milliseconds of the recent requests of every endpoint
+        """
+        with self.__lock:
+            latencies = {endpoint: np.array(values) * 1000
+                         for endpoint, values in self.__latencies.items()}
+            counts, errors = dict(self.__counts), dict(self.__errors)
+        summary = {}
+        for endpoint, values in latencies.items():
+            p50, p95, p99 = np.percentile(values, [50, 95, 99])
+            summary[endpoint] = {"requests": counts[endpoint], "errors": errors[endpoint],
+                                 "mean_ms": values.mean(), "p50_ms": p50, "p95_ms": p95,
+                                 "p99_ms": p99}
+        return summary
+
+class FlightQueryService:
+    """
+    Answer the queries of the endpoints from the search states of a model.
+    Only the read-only methods of the search states are used so one model can be shared
+    by every thread, the model's own sorted, series and info attributes are not touched.
+    """
+    KINDS = {"flight": 0, "airport": 1, "airline": 2}
+    UNCACHED = ("/metrics",)
+
+    def __init__(self, model: FlightDataModel, cache_size: int = 4096) -> None:
+        self.__model = model
+        self.__cache = OrderedDict()
+        self.__cache_size = cache_size
+        self.__cache_lock = threading.Lock()
+        self.__storytelling = None
+        self.__storytelling_lock = threading.Lock()
+        self.metrics = LatencyMetrics()
+        self.__endpoints = {"/avg_delay": self.avg_delay,
+                            "/status": self.status,
+                            "/time_blocks": self.time_blocks,
+                            "/info": self.info,
+                            "/storytelling": self.storytelling,
+                            "/metrics": lambda params: self.metrics.summary()}
+
+    @property
+    def endpoints(self):
+        """
+        Getter for the paths of the endpoints
+        """
+        return list(self.__endpoints)
+
+    def handle(self, path: str, params: dict):
+        """
+        Answer a request and record its latency. The data never changes, so the answers
+        of the last cache_size distinct requests are kept and sent again.
+        : param params : the query string parsed by parse_qs
+        : return : a tuple of the HTTP status and a JSON serializable payload
+        """
+        start = time.perf_counter()
+        endpoint = self.__endpoints.get(path)
+        if endpoint is None:
+            return 404, {"error": f"Unknown endpoint {path}", "endpoints": self.endpoints}
+        key = (path, tuple(sorted((name, tuple(values)) for name, values in params.items())))
+        with self.__cache_lock:
+            answer = self.__cache.get(key)
+            if answer is not None:
+                self.__cache.move_to_end(key)
+        if answer is None:
+            try:
+                answer = 200, endpoint(params)
+            except QueryError as error:
+                answer = 400, {"error": str(error)}
+            except Exception as error:
+                answer = 500, {"error": f"{type(error).__name__}: {error}"}
+            if answer[0] != 500 and path not in self.UNCACHED:
+                with self.__cache_lock:
+                    self.__cache[key] = answer
+                    if len(self.__cache) > self.__cache_size:
+                        self.__cache.popitem(last=False)
+        self.metrics.record(path, time.perf_counter() - start, answer[0] != 200)
+        return answer
+
+    def parse_filter(self, params: dict):
+        """
+        Convert the query parameters into the arguments of the search state methods
+        : param params : by (flight, airport or airline), filter (comma separated, e.g.
+                         ATL,LAX for a flight), and the optional weeks (weeks of the month,
+                         e.g. 1,2), time_blocks (e.g. Morning,Night), start and end dates,
+                         weekdays (1 for Monday to 7, e.g. 6,7) and hours (first and last
+                         departure hour, e.g. 22-6)
+        : return : a tuple of the search state, filter, week, time_blk, date_range,
+                   weekdays and hours
+        """
+        kind = params.get("by", ["flight"])[0]
+        if kind not in self.KINDS:
+            raise QueryError(f"by must be one of {', '.join(self.KINDS)}")
+        filt = params.get("filter", [""])[0].split(",")
+        if len(filt) != (2 if kind == "flight" else 1) or not all(filt):
+            raise QueryError("filter must be ORIGIN,DEST for a flight or one code otherwise")
+        try:
+            weeks = [int(week) for week in params.get("weeks", ["1,2,3,4,5"])[0].split(",")]
+            days = [int(day) for day in params.get("weekdays", ["1,2,3,4,5,6,7"])[0].split(",")]
+            first, last = (int(hour) for hour in params.get("hours", ["0-23"])[0].split("-"))
+            if kind == "airline":
+                float(filt[0])
+        except ValueError as error:
+            raise QueryError(str(error)) from error
+        if not all(1 <= week <= 5 for week in weeks):
+            raise QueryError("weeks must be weeks of the month from 1 to 5, e.g. 1,2")
+        if not all(1 <= day <= 7 for day in days):
+            raise QueryError("weekdays must be days of the week from 1 (Monday) to 7, e.g. 6,7")
+        if not (0 <= first <= 23 and 0 <= last <= 23):
+            raise QueryError("hours must be two hours from 0 to 23, e.g. 22-6")
+        blocks = params.get("time_blocks", [",".join(SearchState.time_blocks)])[0].split(",")
+        unknown = set(blocks) - set(SearchState.time_blocks)
+        if unknown:
+            raise QueryError(f"Unknown time blocks {', '.join(sorted(unknown))}")
+        week = [i + 1 in weeks for i in range(5)]
+        time_blk = [blk in blocks for blk in SearchState.time_blocks]
+        weekdays = [i + 1 in days for i in range(7)]
+        date_range = None
+        if "start" in params or "end" in params:
+            date_range = (params.get("start", ["1900-01-01"])[0],
+                          params.get("end", ["2100-12-31"])[0])
+            try:
+                pd.Timestamp(date_range[0]), pd.Timestamp(date_range[1])
+            except ValueError as error:
+                raise QueryError(str(error)) from error
+        return (self.__model.states[self.KINDS[kind]], filt, week, time_blk, date_range,
+                weekdays, hours_in_range(first, last))
+
+    @staticmethod
+    def to_json(data):
+        """
+        Convert a Series or DataFrame into JSON serializable data, dates as ISO strings
+        and NaN as null
+        """
+        return json.loads(data.to_json(date_format="iso"))
+
+    def avg_delay(self, params: dict):
+        """
+        Return the average delays in each week, or each day, day of the week or departure
+        hour if granularity is Daily, Weekday or Hourly
+        """
+        state, filt, week, time_blk, date_range, weekdays, hours = self.parse_filter(params)
+        granularity = params.get("granularity", ["Weekly"])[0]
+        return self.to_json(state.avg_flight_delay(filt, week, time_blk, date_range,
+                                                   granularity, weekdays, hours)[1])
+
+    def status(self, params: dict):
+        """
+        Return the number of flights in each status
+        """
+        return self.to_json(self.__state_series("percent_on_time", params))
+
+    def time_blocks(self, params: dict):
+        """
+        Return the number of flights in each departure time block
+        """
+        return self.to_json(self.__state_series("percent_time_block", params))
+
+    def __state_series(self, method: str, params: dict):
+        """
+        Return the Series returned by a method of the search state of the request
+        """
+        state, filt, week, time_blk, date_range, weekdays, hours = self.parse_filter(params)
+        return getattr(state, method)(filt, week, time_blk, date_range, weekdays, hours)[1]
+
+    def info(self, params: dict):
+        """
+        Return the delay statistics text, the delay percentiles and the breakdown by
+        airline or airport
+        """
+        state, filt, week, time_blk, date_range, weekdays, hours = self.parse_filter(params)
+        data = state.sort_data(filt, week, time_blk, date_range, weekdays, hours)
+        percentiles = state.delay_percentiles(filt, week, time_blk, date_range, weekdays,
+                                              hours)
+        return {"flights": len(data),
+                "info": state.get_info_str(data, percentiles),
+                "breakdown": json.loads(state.get_breakdown(data).to_json(orient="records")),
+                "percentiles": {column: {f"P{q}": None if np.isnan(value) else value
+                                         for q, value in zip(DelayPercentileIndex.PERCENTILES,
+                                                             np.asarray(values, dtype=float))}
+                                for column, values in percentiles.items()}}
+
+    def storytelling(self, params: dict):
+        """
+        Return the aggregates of the data storytelling page, computed on the first request
+        """
+        with self.__storytelling_lock:
+            if self.__storytelling is None:
+                text, dep_delay, arr_delay, avg_delay, status_week, status_time = \
+                    self.__model.get_data_story_telling_data()
+                histograms = {}
+                for name, delays in (("DEP_DELAY", dep_delay), ("ARR_DELAY", arr_delay)):
+                    counts, edges = np.histogram(delays.index, bins=50, weights=delays)
+                    histograms[name] = {"counts": counts.astype(np.int64).tolist(),
+                                        "edges": edges.tolist()}
+                self.__storytelling = {"info": text,
+                                       "delay_histograms": histograms,
+                                       "avg_delay_by_day": self.to_json(avg_delay),
+                                       "status_by_week": self.to_json(status_week),
+                                       "status_by_time_block": self.to_json(status_time)}
+        return self.__storytelling
+
+class ThreadPoolHTTPServer(HTTPServer):
+    """
+    HTTP server handling the requests in a fixed pool of threads instead of a new
+    thread for every request
+    """
+    def __init__(self, address, handler, threads: int = 16) -> None:
+        super().__init__(address, handler)
+        self.__pool = ThreadPoolExecutor(max_workers=threads)
+
+    def process_request(self, request, client_address):
+        self.__pool.submit(self.process_request_thread, request, client_address)
+
+    def process_request_thread(self, request, client_address):
+        """
+        Handle a request in a thread of the pool
+        """
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.__pool.shutdown(wait=True)
+
+def make_handler(service: FlightQueryService):
+    """
+    Return a request handler class answering GET requests with the service
+    """
+    class QueryRequestHandler(BaseHTTPRequestHandler):
+        """
+        Request handler that sends the answer of the service as JSON
+        """
+        protocol_version = "HTTP/1.1"
+        # Headers and body are written separately, avoid waiting for delayed ACKs
+        disable_nagle_algorithm = True
+        # Close idle keep-alive connections so they do not hold a thread of the pool
+        timeout = 5
+
+        def do_GET(self):
+            """
+            Answer a GET request
+            """
+            url = urlsplit(self.path)
+            status, payload = service.handle(url.path, parse_qs(url.query))
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            """
+            Do not log every request, the latencies are in the /metrics endpoint
+            """
+
+    return QueryRequestHandler
+
+def main():
+    """
+    Parse the command line arguments, load the datasets and serve until interrupted
+    """
+    parser = argparse.ArgumentParser(description="Serve the delay statistics as JSON.")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    parser.add_argument("--port", type=int, default=8000, help="port to listen on")
+    parser.add_argument("--threads", type=int, default=16, help="number of worker threads")
+    args = parser.parse_args()
+    service = FlightQueryService(FlightDataModel())
+    server = ThreadPoolHTTPServer((args.host, args.port), make_handler(service), args.threads)
+    print(f"Serving {', '.join(service.endpoints)} on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,518 @@
+"""SQLite backend of the search states for datasets larger than memory"""
+from __future__ import annotations
+import json
+import os
+import sqlite3
+from contextlib import closing
+import numpy as np
+import pandas as pd
+from indexing import build_calendar, day_numbers
+from instrumentation import instrumentation
+from model import FlightDataModel, SearchByFlight, SearchByAirport, SearchByAirline
+from percentiles import DelayPercentileIndex, percentiles_from_counts
+from prefix_sums import DailyPrefixSums
+from rotation import MIN_TURNAROUND
+
+DATASETS = ("Jan_2020_ontime.csv", "Airline_dataset.csv")
+DATABASE = "flights.sqlite"
+# Stored as the user_version of the database, which is rebuilt when it differs
+SCHEMA_VERSION = 3
+# Runs of days written as BETWEEN conditions, more are passed as one JSON array of dates
+# so a statement stays under the 999 parameters of older SQLite builds
+MAX_DATE_RUNS = 100
+# Columns of the delay dataset only used to join it with the on-time dataset
+JOIN_COLUMNS = ("FL_DATE", "AIRLINE_ID", "ORIGIN_AIRPORT", "DEST_AIRPORT", "DEP_TIME",
+                "ARR_TIME")
+# The group indexes also hold every column the aggregations read, so GROUP BY queries
+# of a group are answered from the index without looking up the rows
+AGGREGATED = ("FL_DATE", "DEP_HOUR", "WEEK", "STATUS", "DEP_DELAY", "ARR_DELAY")
+INDEXES = {"flights_route": ("ORIGIN", "DEST") + AGGREGATED,
+           "flights_origin": ("ORIGIN",) + AGGREGATED,
+           "flights_airline": ("OP_CARRIER_AIRLINE_ID",) + AGGREGATED,
+           "flights_week": ("WEEK",),
+           "flights_hour": ("DEP_HOUR", "FL_DATE")}
+
+# Same rules as compute_rotation_delays: flights of every aircraft in scheduled order,
+# the modulo is written so negative minutes wrap like in Python
+ROTATION_SQL = """
+INSERT INTO rotation (id, INBOUND_DELAY, PROPAGATED_DELAY, ORIGINATED_DELAY)
+WITH flown AS (
+    SELECT rowid AS id, TAIL_NUM, ORIGIN, DEST, ARR_DELAY,
+           MAX(DEP_DELAY, 0) AS LATE,
+           CAST(julianday(FL_DATE) AS INTEGER) AS DAY,
+           (((CAST(DEP_TIME AS INTEGER) / 100 * 60 + CAST(DEP_TIME AS INTEGER) % 100
+              - DEP_DELAY) % 1440) + 1440) % 1440 AS SCHED_DEP,
+           (((CAST(ARR_TIME AS INTEGER) / 100 * 60 + CAST(ARR_TIME AS INTEGER) % 100
+              - ARR_DELAY) % 1440) + 1440) % 1440 AS SCHED_ARR
+    FROM joined
+    WHERE TAIL_NUM IS NOT NULL AND DEP_TIME IS NOT NULL AND DEP_DELAY IS NOT NULL
+), previous AS (
+    SELECT id, ORIGIN, DAY, LATE, SCHED_DEP,
+           LAG(DEST) OVER w AS PREV_DEST, LAG(DAY) OVER w AS PREV_DAY,
+           LAG(ARR_DELAY) OVER w AS PREV_ARR_DELAY, LAG(SCHED_ARR) OVER w AS PREV_SCHED_ARR,
+           LAG(SCHED_DEP) OVER w AS PREV_SCHED_DEP
+    FROM flown
+    WINDOW w AS (PARTITION BY TAIL_NUM ORDER BY DAY * 1440 + SCHED_DEP, id)
+), linked AS (
+    SELECT id, LATE,
+           CASE WHEN PREV_DEST = ORIGIN AND DAY - PREV_DAY <= 1
+                     AND PREV_ARR_DELAY IS NOT NULL
+                THEN MAX(PREV_ARR_DELAY, 0) END AS INBOUND,
+           MAX((DAY - PREV_DAY) * 1440 + SCHED_DEP - PREV_SCHED_ARR
+               - CASE WHEN PREV_SCHED_ARR < PREV_SCHED_DEP THEN 1440 ELSE 0 END
+               - :turnaround, 0) AS SLACK
+    FROM previous
+), propagation AS (
+    SELECT id, LATE, COALESCE(INBOUND, 0) AS INBOUND,
+           CASE WHEN INBOUND IS NULL THEN 0 ELSE MIN(LATE, MAX(INBOUND - SLACK, 0)) END
+               AS PROPAGATED
+    FROM linked
+)
+SELECT id, INBOUND, PROPAGATED, LATE - PROPAGATED FROM propagation
+"""
+
+def date_runs(days) -> list[tuple[str, str]]:
+    """
+    Merge the selected dates into runs of consecutive days
+    : return : a list of the first and last date of each run, written as YYYY-MM-DD
+    """
+    codes = np.unique(day_numbers(days))
+    breaks = np.flatnonzero(np.diff(codes) != 1)
+    firsts = np.concatenate([codes[:1], codes[breaks + 1]]).astype("datetime64[D]")
+    lasts = np.concatenate([codes[breaks], codes[-1:]]).astype("datetime64[D]")
+    return list(zip(firsts.astype(str).tolist(), lasts.astype(str).tolist()))
+
+def where_clause(columns: list[str], key, days, hours: list) -> tuple[str, list]:
+    """
+    Return the WHERE condition and its parameters selecting the flights of a group
+    on the selected days and departure hours
+    : param columns : key columns of the group, empty to select every group
+    : param key : the group key, a tuple when several columns are used
+    : param days : dates selected
+    : param hours : departure hours selected, including None for flights without a
+                    departure time, or None for every flight
+    """
+    conditions, params = [], []
+    if columns:
+        conditions.extend(f"{column} = ?" for column in columns)
+        params.extend(key if len(columns) > 1 else [key])
+    runs = date_runs(days)
+    if len(runs) > MAX_DATE_RUNS:
+        conditions.append("FL_DATE IN (SELECT value FROM json_each(?))")
+        params.append(json.dumps(list(pd.DatetimeIndex(days).strftime("%Y-%m-%d"))))
+    else:
+        dates = " OR ".join(["FL_DATE BETWEEN ? AND ?"] * len(runs))
+        conditions.append(f"({dates})" if runs else "0")
+        params.extend(date for run in runs for date in run)
+    if hours is None:
+        return " AND ".join(conditions), params
+    selected = [int(hour) for hour in hours if hour is not None]
+    condition = f"DEP_HOUR IN ({', '.join('?' * len(selected))})"
+    if None in hours:
+        condition = f"({condition} OR DEP_HOUR IS NULL)"
+    conditions.append(condition)
+    params.extend(selected)
+    return " AND ".join(conditions), params
+
+class FlightDatabase:
+    """
+    The cleaned and joined datasets stored in an indexed SQLite database, built by
+    reading the csv files in chunks so the datasets never have to fit in memory.
+    """
+    CHUNK_SIZE = 100_000
+
+    def __init__(self, path: str) -> None:
+        self.__path = path
+        self.__connection = sqlite3.connect(path)
+        self.__calendar = None
+        self.__statuses = None
+
+    @classmethod
+    def open(cls, folder: str, path: str = None) -> FlightDatabase:
+        """
+        Open the database of the datasets in folder, building it first when it does not
+        exist or the datasets are newer
+        : param path : the database file, DATABASE in folder by default
+        """
+        path = path or os.path.join(folder, DATABASE)
+        datasets = [os.path.join(folder, name) for name in DATASETS]
+        if not (os.path.exists(path) and
+                os.path.getmtime(path) >= max(map(os.path.getmtime, datasets)) and
+                cls.schema_version(path) == SCHEMA_VERSION):
+            cls.build(folder, path)
+        return cls(path)
+
+    @staticmethod
+    def schema_version(path: str) -> int:
+        """
+        Return the schema version the database at path was built with
+        """
+        with closing(sqlite3.connect(path)) as connection:
+            return connection.execute("PRAGMA user_version").fetchone()[0]
+
+    @classmethod
+    def build(cls, folder: str, path: str, chunksize: int = CHUNK_SIZE):
+        """
+        Build the database from the datasets in folder: load both csv files chunk by chunk,
+        join them, compute the aircraft rotation delays and index the flights
+        """
+        temp_path = path + ".tmp"
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        connection = sqlite3.connect(temp_path)
+        try:
+            connection.execute("PRAGMA journal_mode = OFF")
+            connection.execute("PRAGMA synchronous = OFF")
+            for chunk in pd.read_csv(os.path.join(folder, DATASETS[0]), chunksize=chunksize):
+                chunk = FlightDataModel.derive_columns(FlightDataModel.clean_ontime(chunk))
+                chunk["FL_DATE"] = chunk["FL_DATE"].dt.strftime("%Y-%m-%d")
+                chunk["WEEK"] = chunk["WEEK"].astype(np.int64)
+                # NULL instead of -1 for the flights without a departure time
+                chunk["DEP_HOUR"] = chunk["DEP_HOUR"].astype("Int64").where(
+                    chunk["DEP_HOUR"] >= 0)
+                cls.__drop_unnamed(chunk).to_sql("ontime", connection, if_exists="append",
+                                                 index=False)
+            delay_columns = None
+            for chunk in pd.read_csv(os.path.join(folder, DATASETS[1]), chunksize=chunksize):
+                chunk = FlightDataModel.clean_delays(chunk)
+                chunk["FL_DATE"] = chunk["FL_DATE"].dt.strftime("%Y-%m-%d")
+                chunk = cls.__drop_unnamed(chunk)
+                delay_columns = [column for column in chunk.columns
+                                 if column not in JOIN_COLUMNS]
+                chunk.to_sql("delays", connection, if_exists="append", index=False)
+            connection.execute("CREATE INDEX delays_key ON delays "
+                               "(FL_DATE, ORIGIN_AIRPORT, DEST_AIRPORT, DEP_TIME, ARR_TIME)")
+            # IS instead of = so missing times match each other like in pandas.merge
+            selected = "".join(f", d.{column}" for column in delay_columns)
+            connection.execute(f"CREATE TABLE joined AS SELECT o.*{selected} "
+                               "FROM ontime o LEFT JOIN delays d "
+                               "ON d.FL_DATE = o.FL_DATE AND d.ORIGIN_AIRPORT = o.ORIGIN "
+                               "AND d.DEST_AIRPORT = o.DEST AND d.DEP_TIME IS o.DEP_TIME "
+                               "AND d.ARR_TIME IS o.ARR_TIME ORDER BY o.rowid, d.rowid")
+            connection.execute("DROP TABLE ontime")
+            connection.execute("DROP TABLE delays")
+            connection.execute("CREATE TABLE rotation (id INTEGER PRIMARY KEY, "
+                               "INBOUND_DELAY REAL, PROPAGATED_DELAY REAL, "
+                               "ORIGINATED_DELAY REAL)")
+            connection.execute(ROTATION_SQL, {"turnaround": MIN_TURNAROUND})
+            connection.execute("CREATE TABLE flights AS SELECT j.*, r.INBOUND_DELAY, "
+                               "r.PROPAGATED_DELAY, r.ORIGINATED_DELAY FROM joined j "
+                               "LEFT JOIN rotation r ON r.id = j.rowid ORDER BY j.rowid")
+            connection.execute("DROP TABLE joined")
+            connection.execute("DROP TABLE rotation")
+            for name, columns in INDEXES.items():
+                connection.execute(f"CREATE INDEX {name} ON flights ({', '.join(columns)})")
+            connection.execute("ANALYZE")
+            connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            connection.commit()
+            connection.execute("VACUUM")
+        finally:
+            connection.close()
+        os.replace(temp_path, path)
+
+    @staticmethod
+    def __drop_unnamed(chunk: pd.DataFrame) -> pd.DataFrame:
+        """
+        Drop the empty columns created by trailing commas in the csv files
+        """
+        return chunk.drop(columns=chunk.columns[chunk.columns.str.contains("unnamed",
+                                                                           case=False)])
+
+    def query(self, sql: str, params=()) -> pd.DataFrame:
+        """
+        Return the result of a query as a dataframe
+        """
+        return pd.read_sql_query(sql, self.__connection, params=params)
+
+    @property
+    def calendar(self):
+        """
+        Getter for calendar attribute, the ISO week and the week of the month of every date
+        """
+        if self.__calendar is None:
+            weeks = self.query("SELECT FL_DATE, MIN(WEEK) AS WEEK FROM flights "
+                               "GROUP BY FL_DATE")
+            weeks["FL_DATE"] = pd.to_datetime(weeks["FL_DATE"], format="%Y-%m-%d")
+            self.__calendar = build_calendar(weeks)
+        return self.__calendar
+
+    @property
+    def statuses(self):
+        """
+        Getter for statuses attribute, the distinct statuses of the flights
+        """
+        if self.__statuses is None:
+            self.__statuses = self.query("SELECT DISTINCT STATUS FROM flights "
+                                         "WHERE STATUS IS NOT NULL")["STATUS"].tolist()
+        return self.__statuses
+
+    def destinations(self) -> dict:
+        """
+        Return a dict of the set of destination airports of every origin airport
+        """
+        routes = self.query("SELECT DISTINCT ORIGIN, DEST FROM flights")
+        return {origin: set(dests) for origin, dests in routes.groupby("ORIGIN")["DEST"]}
+
+    def airlines(self) -> list[str]:
+        """
+        Return the airline IDs as sorted strings
+        """
+        airlines = self.query("SELECT DISTINCT OP_CARRIER_AIRLINE_ID FROM flights")
+        return sorted(airlines["OP_CARRIER_AIRLINE_ID"].apply(str))
+
+    def chunks(self, columns: list[str], chunksize: int = CHUNK_SIZE):
+        """
+        Yield the columns of every flight in chunks of at most chunksize rows
+        """
+        yield from pd.read_sql_query(f"SELECT {', '.join(columns)} FROM flights ORDER BY rowid",
+                                     self.__connection, chunksize=chunksize)
+
+    def filtered_chunks(self, days, hours: list[int], chunksize: int = CHUNK_SIZE):
+        """
+        Yield every column of the flights of every group on the selected days and
+        departure hours in chunks, with the fraction of the flights read. A connection of
+        its own is opened so the chunks can be read from another thread.
+        """
+        where, params = where_clause([], None, days, hours)
+        with closing(sqlite3.connect(self.__path)) as connection:
+            total = connection.execute(f"SELECT COUNT(*) FROM flights WHERE {where}",
+                                       params).fetchone()[0]
+            read = 0
+            for chunk in pd.read_sql_query(f"SELECT * FROM flights WHERE {where} "
+                                           "ORDER BY rowid", connection, params=params,
+                                           chunksize=chunksize):
+                read += len(chunk)
+                chunk["FL_DATE"] = pd.to_datetime(chunk["FL_DATE"], format="%Y-%m-%d")
+                yield chunk, read / max(total, 1)
+
+    def flights(self, group_columns: list[str], key, days, hours: list,
+                columns: list[str] = None) -> pd.DataFrame:
+        """
+        Return the flights of a group on the selected days and departure hours, indexed
+        by row number like the in-memory dataframe
+        : param columns : columns to return, every column by default
+        """
+        where, params = where_clause(group_columns, key, days, hours)
+        selected = ", ".join(columns) if columns else "*"
+        data = self.query(f"SELECT rowid - 1 AS ROW_ID, {selected} FROM flights "
+                          f"WHERE {where} ORDER BY rowid", params)
+        data["FL_DATE"] = pd.to_datetime(data["FL_DATE"], format="%Y-%m-%d")
+        return data.set_index("ROW_ID").rename_axis(None)
+
+class SQLiteDailyTotals:
+    """
+    Flight counts, delay sums and status counts aggregated by GROUP BY queries, with
+    the interface of DailyPrefixSums keyed by departure hour
+    """
+    def __init__(self, database: FlightDatabase, keys: list[str]) -> None:
+        self.__database = database
+        self.__keys = keys
+
+    def __select(self):
+        """
+        Return the aggregate expressions of the totals and their parameters
+        """
+        statuses = self.__database.statuses
+        sql = ("COUNT(*) AS FLIGHTS, "
+               "TOTAL(DEP_DELAY) AS DEP_DELAY_SUM, COUNT(DEP_DELAY) AS DEP_DELAY_COUNT, "
+               "TOTAL(ARR_DELAY) AS ARR_DELAY_SUM, COUNT(ARR_DELAY) AS ARR_DELAY_COUNT"
+               + "".join(f', SUM(STATUS = ?) AS "{status}"' for status in statuses))
+        return sql, list(statuses)
+
+    def totals(self, key, days, hours: list[int]) -> pd.Series:
+        """
+        Return the totals of a group over the selected days and departure hours
+        """
+        select, select_params = self.__select()
+        where, params = where_clause(self.__keys, key, days, hours)
+        totals = self.__database.query(f"SELECT {select} FROM flights WHERE {where}",
+                                       select_params + params)
+        return totals.iloc[0].fillna(0)
+
+    def group_totals(self, days, hours: list) -> pd.DataFrame:
+        """
+        Return the totals of every group over the selected days and departure hours
+        """
+        select, select_params = self.__select()
+        where, params = where_clause([], None, days, hours)
+        columns = ", ".join(self.__keys)
+        not_null = "".join(f" AND {column} IS NOT NULL" for column in self.__keys)
+        totals = self.__database.query(f"SELECT {columns}, {select} FROM flights "
+                                       f"WHERE {where}{not_null} GROUP BY {columns}",
+                                       select_params + params)
+        return totals.set_index(self.__keys)
+
+    def weekly_group_totals(self, days: pd.Series, hours: list) -> pd.DataFrame:
+        """
+        Return the totals of every group in every selected week from one query of the
+        totals of every group on every day
+        : param days : a Series of the week of each selected date, indexed by date
+        """
+        select, select_params = self.__select()
+        where, params = where_clause([], None, days.index, hours)
+        columns = ", ".join(self.__keys)
+        not_null = "".join(f" AND {column} IS NOT NULL" for column in self.__keys)
+        daily = self.__database.query(f"SELECT FL_DATE, {columns}, {select} FROM flights "
+                                      f"WHERE {where}{not_null} GROUP BY FL_DATE, {columns}",
+                                      select_params + params)
+        dates = pd.to_datetime(daily.pop("FL_DATE"), format="%Y-%m-%d")
+        daily.insert(0, "WEEK", days.reindex(dates).to_numpy())
+        return daily.groupby(["WEEK"] + self.__keys).sum()
+
+    def daily(self, key, days, hours: list[int]) -> pd.DataFrame:
+        """
+        Return the totals of a group for each selected day, without days that have no flight
+        """
+        select, select_params = self.__select()
+        where, params = where_clause(self.__keys, key, days, hours)
+        daily = self.__database.query(f"SELECT FL_DATE, {select} FROM flights WHERE {where} "
+                                      "GROUP BY FL_DATE ORDER BY FL_DATE",
+                                      select_params + params)
+        daily["FL_DATE"] = pd.to_datetime(daily["FL_DATE"], format="%Y-%m-%d")
+        return daily.set_index("FL_DATE")
+
+    def time_block_totals(self, key, days, hours: list[int]) -> pd.DataFrame:
+        """
+        Return the totals of a group in each selected departure hour over the selected
+        days, without hours that have no flight
+        """
+        select, select_params = self.__select()
+        where, params = where_clause(self.__keys, key, days, hours)
+        totals = self.__database.query(f"SELECT DEP_HOUR, {select} FROM flights "
+                                       f"WHERE {where} GROUP BY DEP_HOUR ORDER BY DEP_HOUR",
+                                       select_params + params)
+        # Integer hours like the in-memory index, even without any row
+        totals = totals[totals["DEP_HOUR"].notna()]
+        return totals.set_index(totals["DEP_HOUR"].astype(np.int64)).drop(columns="DEP_HOUR")
+
+    def time_block_counts(self, key, days) -> pd.Series:
+        """
+        Return the number of flights of a group in each departure hour over the selected
+        days, like value_counts
+        """
+        where, params = where_clause(self.__keys, key, days, None)
+        counts = self.__database.query("SELECT DEP_HOUR, COUNT(*) AS count FROM flights "
+                                       f"WHERE {where} AND DEP_HOUR IS NOT NULL "
+                                       "GROUP BY DEP_HOUR", params)
+        counts = counts.set_index("DEP_HOUR")["count"].rename_axis(None)
+        return counts.sort_values(ascending=False)
+
+    average_delay = staticmethod(DailyPrefixSums.average_delay)
+
+    def status_counts(self, totals: pd.Series) -> pd.Series:
+        """
+        Return the number of flights of each status in the totals, like value_counts
+        """
+        counts = totals[self.__database.statuses].astype(np.int64)
+        return counts[counts > 0].sort_values(ascending=False).rename("count")
+
+class SQLitePercentileIndex:
+    """
+    Delay percentiles computed from the counts of each distinct delay value returned by
+    GROUP BY queries, with the interface of DelayPercentileIndex
+    """
+    def __init__(self, database: FlightDatabase, keys: list[str],
+                 columns=("DEP_DELAY", "ARR_DELAY")) -> None:
+        self.__database = database
+        self.__keys = keys
+        self.__columns = columns
+
+    def __value_counts(self, key, days, hours: list[int], column: str,
+                       by: str = None) -> pd.DataFrame:
+        """
+        Return the number of occurrences of every value of a delay column, in order
+        : param by : a column to count the values of each of its values separately
+        """
+        where, params = where_clause(self.__keys, key, days, hours)
+        groups = f"{by}, {column}" if by else column
+        return self.__database.query(f"SELECT {groups}, COUNT(*) AS COUNT FROM flights "
+                                     f"WHERE {where} AND {column} IS NOT NULL "
+                                     f"GROUP BY {groups} ORDER BY {groups}", params)
+
+    def percentiles(self, key, days, hours: list[int], column: str,
+                    qs=DelayPercentileIndex.PERCENTILES):
+        """
+        Return the percentiles of a delay column for a group under the filter
+        """
+        counts = self.__value_counts(key, days, hours, column)
+        return percentiles_from_counts(counts[column].to_numpy(dtype=np.float64),
+                                       counts["COUNT"].to_numpy(), qs)
+
+    def weekly_percentiles(self, key, days: pd.Series, hours: list[int],
+                           qs=DelayPercentileIndex.PERCENTILES):
+        """
+        Return a dataframe of percentiles of every delay column for each week
+        """
+        weekly = []
+        for column in self.__columns:
+            counts = self.__value_counts(key, days.index, hours, column, by="WEEK")
+            rows = {week: percentiles_from_counts(group[column].to_numpy(dtype=np.float64),
+                                                  group["COUNT"].to_numpy(), qs)
+                    for week, group in counts.groupby("WEEK", sort=True)}
+            weekly.append(pd.DataFrame.from_dict(rows, orient="index",
+                                                 columns=[f"{column} P{q}" for q in qs]))
+        weekly = pd.concat(weekly, axis=1).sort_index().rename_axis("WEEK")
+        return weekly.dropna(how="all")
+
+class SQLiteSearchState:
+    """
+    Mixin replacing the in-memory indexes of a search state by queries on the database,
+    so only the flights of the selected group are loaded
+    """
+    # Columns of the flights used by the charts and the delay statistics
+    COLUMNS = ["FL_DATE", "WEEK", "DAY_OF_WEEK", "ORIGIN", "DEST", "OP_CARRIER_AIRLINE_ID",
+               "DISTANCE", "DEP_TIME_BLK", "DEP_HOUR", "STATUS", "DEP_DELAY", "ARR_DELAY",
+               "INBOUND_DELAY", "PROPAGATED_DELAY", "ORIGINATED_DELAY"]
+
+    def __init__(self, database: FlightDatabase) -> None:
+        self._df = None
+        self._database = database
+        self._last_query = None
+        self._calendar = database.calendar
+        self._percentile_index = SQLitePercentileIndex(database, self._group_columns)
+        self._prefix_sums = SQLiteDailyTotals(database, self._group_columns)
+        self._group_index = None
+
+    def build_group_index(self):
+        """
+        Nothing to build, the flights of a group are found by the indexes of the database
+        """
+
+    def group_rows(self, filt: list[str]) -> pd.DataFrame:
+        """
+        Return every flight of the selected group
+        """
+        return self._database.flights(self._group_columns, self.group_key(filt),
+                                      self._calendar.index, None, self.COLUMNS)
+
+    @instrumentation.timed("sort_data")
+    def sort_data(self, filt: list[str], week: list[bool], time_blk: list[bool],
+                  date_range=None, weekdays: list[bool] = None, hours: list[int] = None):
+        """
+        Return the flights of the selected group on the selected days and departure hours.
+        The flights of the last filter are kept since every chart of a filter asks for them.
+        """
+        query = (tuple(filt), tuple(week), tuple(time_blk), date_range,
+                 None if weekdays is None else tuple(weekdays),
+                 None if hours is None else tuple(hours))
+        if self._last_query is None or self._last_query[0] != query:
+            data = self._database.flights(self._group_columns, self.group_key(filt),
+                                          self.select_days(week, date_range, weekdays).index,
+                                          self.select_hours(time_blk, hours), self.COLUMNS)
+            self._last_query = (query, data)
+        return self._last_query[1]
+
+class SQLiteSearchByFlight(SQLiteSearchState, SearchByFlight):
+    """
+    A state for querying the database using flight as the filter
+    """
+
+class SQLiteSearchByAirport(SQLiteSearchState, SearchByAirport):
+    """
+    A state for querying the database using airport as the filter
+    """
+
+class SQLiteSearchByAirline(SQLiteSearchState, SearchByAirline):
+    """
+    A state for querying the database using airline as the filter
+    """
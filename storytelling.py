@@ -0,0 +1,134 @@
+"""Aggregates of the Overall Delay Statistics page computed in one pass over chunks"""
+import numpy as np
+import pandas as pd
+from percentiles import percentiles_from_counts
+
+class StreamingDelayStats:
+    """
+    Running count, mean, variance and extremes of a delay column, merged chunk by
+    chunk, and a histogram of every distinct delay from which the median, mode and
+    quartiles are read. Delays are whole minutes so the histogram stays small no
+    matter how many flights are added.
+    """
+    def __init__(self) -> None:
+        self.__count = 0
+        self.__mean = 0.0
+        self.__m2 = 0.0
+        self.__min = np.inf
+        self.__max = -np.inf
+        self.__histogram = pd.Series(dtype=np.int64)
+
+    @property
+    def histogram(self):
+        """
+        Getter for histogram attribute, the number of flights of every delay in order
+        """
+        return self.__histogram
+
+    def update(self, values):
+        """
+        Add the delays of a chunk, missing delays are skipped
+        """
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+        count, mean = len(values), values.mean()
+        m2 = ((values - mean) ** 2).sum()
+        # Combine the moments of the chunk with the running ones (Chan et al.)
+        total = self.__count + count
+        delta = mean - self.__mean
+        self.__mean += delta * count / total
+        self.__m2 += m2 + delta ** 2 * self.__count * count / total
+        self.__count = total
+        self.__min = min(self.__min, values.min())
+        self.__max = max(self.__max, values.max())
+        distinct, counts = np.unique(values, return_counts=True)
+        self.__histogram = self.__histogram.add(pd.Series(counts, index=distinct),
+                                                fill_value=0).astype(np.int64)
+
+    def describe(self) -> pd.Series:
+        """
+        Return the statistics of the delays added, like Series.describe with the
+        median and mode added
+        """
+        std = np.sqrt(self.__m2 / (self.__count - 1)) if self.__count > 1 else np.nan
+        values = self.__histogram.index.to_numpy(dtype=np.float64)
+        counts = self.__histogram.to_numpy()
+        low, median, high = percentiles_from_counts(values, counts, (25, 50, 75))
+        mode = values[np.argmax(counts)] if len(counts) else np.nan
+        return pd.Series({"count": self.__count,
+                          "mean": self.__mean if self.__count else np.nan,
+                          "std": std,
+                          "min": self.__min if self.__count else np.nan,
+                          "25%": low, "50%": median, "75%": high,
+                          "max": self.__max if self.__count else np.nan,
+                          "median": median, "mode": mode})
+
+class StorytellingStats:
+    """
+    Delay statistics, average delays by day of the month and flight status counts by
+    week and by departure time block accumulated over chunks of flights, so they
+    are computed without loading every flight at once.
+    """
+    COLUMNS = ["DEP_DELAY", "ARR_DELAY", "DAY_OF_MONTH", "WEEK", "STATUS", "DEP_TIME_BLK"]
+
+    def __init__(self, time_blocks: list[str]) -> None:
+        self.__time_blocks = list(time_blocks)
+        self.__delays = {"DEP_DELAY": StreamingDelayStats(),
+                         "ARR_DELAY": StreamingDelayStats()}
+        self.__day_totals = None
+        self.__status_week = None
+        self.__status_time = None
+
+    @property
+    def delays(self):
+        """
+        Getter for delays attribute, the StreamingDelayStats of every delay column
+        """
+        return self.__delays
+
+    @staticmethod
+    def __add(total, part):
+        """
+        Add the counters of a chunk to the running ones
+        """
+        return part if total is None else total.add(part, fill_value=0)
+
+    def update(self, chunk: pd.DataFrame):
+        """
+        Add a chunk of flights with the COLUMNS columns
+        """
+        for column, stats in self.__delays.items():
+            stats.update(chunk[column])
+        delays = chunk[["DEP_DELAY", "ARR_DELAY"]]
+        days = delays.groupby(chunk["DAY_OF_MONTH"])
+        self.__day_totals = self.__add(self.__day_totals,
+                                       days.sum().join(days.count(), rsuffix="_COUNT"))
+        # ISO weeks are UInt32 in the flight frame and int64 in the database
+        weeks = chunk["WEEK"].astype(np.int64)
+        self.__status_week = self.__add(self.__status_week,
+                                        chunk.groupby([weeks, "STATUS"]).size())
+        self.__status_time = self.__add(self.__status_time,
+                                        chunk.groupby(["DEP_TIME_BLK", "STATUS"]).size())
+
+    def avg_delay_by_day(self) -> pd.DataFrame:
+        """
+        Return the average departure and arrival delay of each day of the month
+        """
+        totals = self.__day_totals.sort_index()
+        return pd.DataFrame({column: totals[column] / totals[f"{column}_COUNT"]
+                             for column in ("DEP_DELAY", "ARR_DELAY")})
+
+    def status_by_week(self) -> pd.DataFrame:
+        """
+        Return the number of flights of each status in each week
+        """
+        return self.__status_week.astype(np.int64).unstack("STATUS").sort_index()
+
+    def status_by_time_block(self) -> pd.DataFrame:
+        """
+        Return the number of flights of each status in each departure time block
+        """
+        counts = self.__status_time.astype(np.int64).unstack("STATUS")
+        return counts.reindex(self.__time_blocks)
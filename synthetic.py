@@ -0,0 +1,192 @@
+"""Generate synthetic datasets shaped like the January 2020 csv files at a chosen scale"""
+import argparse
+import os
+import numpy as np
+import pandas as pd
+
+# Number of flights in Jan_2020_ontime.csv, the size of scale 1
+BASE_FLIGHTS = 607_346
+MAX_SCALE = 50
+NUM_AIRPORTS = 350
+NUM_TAILS = 5_500
+CHUNK_SIZE = 500_000
+# Carrier code and airline ID of the carriers of the on-time dataset, most flights first
+CARRIERS = (("WN", 19393), ("DL", 19790), ("AA", 19805), ("OO", 20304), ("UA", 19977),
+            ("YX", 20452), ("MQ", 20398), ("B6", 20409), ("OH", 20397), ("9E", 20363),
+            ("AS", 19930), ("YV", 20378), ("EV", 20366), ("NK", 20416), ("F9", 20436),
+            ("G4", 20368), ("HA", 19690))
+# Share of the flights leaving in each hour of the day
+HOURS = np.array([2, 1, 0.5, 0.5, 0.5, 4, 12, 13, 12, 11, 11, 11, 11, 11, 11, 11, 11,
+                  11, 10, 10, 9, 7, 5, 3], dtype=np.float64)
+# Departure time block of the on-time dataset of each hour
+TIME_BLOCKS = np.array(["0001-0559"] * 6 + [f"{hour:02d}00-{hour:02d}59" for hour in range(6, 24)])
+ONTIME_COLUMNS = ["DAY_OF_MONTH", "DAY_OF_WEEK", "OP_UNIQUE_CARRIER", "OP_CARRIER_AIRLINE_ID",
+                  "OP_CARRIER", "TAIL_NUM", "OP_CARRIER_FL_NUM", "ORIGIN_AIRPORT_ID", "ORIGIN",
+                  "DEST_AIRPORT_ID", "DEST", "DEP_TIME", "DEP_DEL15", "DEP_TIME_BLK",
+                  "ARR_TIME", "ARR_DEL15", "CANCELLED", "DIVERTED", "DISTANCE", "Unnamed: 21"]
+
+def zipf_weights(size: int, exponent: float) -> np.ndarray:
+    """
+    Return weights summing to 1 falling like a power law, so a few airports or
+    carriers get most of the flights like in the real data
+    """
+    weights = 1 / np.arange(1, size + 1) ** exponent
+    return weights / weights.sum()
+
+def airport_codes(rng: np.random.Generator, size: int) -> np.ndarray:
+    """
+    Return distinct random 3-letter airport codes
+    """
+    codes = set()
+    while len(codes) < size:
+        codes.add("".join(rng.choice(list("ABCDEFGHIJKLMNOPQRSTUVWXYZ"), 3)))
+    return np.array(sorted(codes))
+
+def add_minutes(hhmm: np.ndarray, minutes: np.ndarray) -> np.ndarray:
+    """
+    Add minutes to times in hhmm and wrap them around midnight, e.g. 2350 + 20 is 10
+    """
+    total = (hhmm // 100 * 60 + hhmm % 100 + minutes) % (24 * 60)
+    return total // 60 * 100 + total % 60
+
+class SyntheticFlights:
+    """
+    Generator of the on-time and delay datasets. The airports, carriers, tail numbers
+    and routes are drawn once so every chunk of flights shares them.
+    """
+    def __init__(self, seed: int = 0) -> None:
+        self.__rng = np.random.default_rng(seed)
+        rng = self.__rng
+        self.__airports = airport_codes(rng, NUM_AIRPORTS)
+        self.__airport_ids = rng.choice(np.arange(10_000, 16_000), NUM_AIRPORTS, replace=False)
+        self.__airport_weights = zipf_weights(NUM_AIRPORTS, 0.8)
+        self.__carrier_weights = zipf_weights(len(CARRIERS), 0.7)
+        self.__tails = np.array([f"N{number}{rng.choice(list('ABCDEJKLMNZ'))}"
+                                 for number in rng.choice(np.arange(100, 9999), NUM_TAILS,
+                                                          replace=False)])
+        # Distances of every pair of airports from random positions on a plane
+        positions = rng.uniform(0, 2_400, (NUM_AIRPORTS, 2))
+        distances = np.linalg.norm(positions[:, None] - positions[None, :], axis=2)
+        self.__distances = np.maximum(np.round(distances), 70)
+
+    def ontime_chunk(self, size: int) -> pd.DataFrame:
+        """
+        Return size random flights with the columns of Jan_2020_ontime.csv
+        """
+        rng = self.__rng
+        origin = rng.choice(NUM_AIRPORTS, size, p=self.__airport_weights)
+        dest = rng.choice(NUM_AIRPORTS, size, p=self.__airport_weights)
+        same = dest == origin
+        while same.any():
+            dest[same] = rng.choice(NUM_AIRPORTS, same.sum(), p=self.__airport_weights)
+            same = dest == origin
+        carrier = rng.choice(len(CARRIERS), size, p=self.__carrier_weights)
+        day = rng.integers(1, 32, size)
+        hour = rng.choice(24, size, p=HOURS / HOURS.sum())
+        scheduled = hour * 100 + rng.integers(0, 60, size)
+        dep_delay = np.round(rng.gamma(0.9, 18, size) - 12)
+        arr_delay = np.round(dep_delay + rng.normal(-5, 12, size))
+        distance = self.__distances[origin, dest]
+        dep_time = add_minutes(scheduled, dep_delay).astype(np.float64)
+        arr_time = add_minutes(dep_time.astype(np.int64),
+                               np.round(distance / 8 + 30 + arr_delay - dep_delay)).astype(
+                                   np.float64)
+        cancelled = rng.random(size) < 0.02
+        diverted = (rng.random(size) < 0.002) & ~cancelled
+        dep_time[cancelled] = np.nan
+        arr_time[cancelled | diverted] = np.nan
+        dep_del15 = np.where(cancelled, np.nan, dep_delay >= 15)
+        arr_del15 = np.where(cancelled | diverted, np.nan, arr_delay >= 15)
+        codes = np.array([code for code, _ in CARRIERS])[carrier]
+        chunk = pd.DataFrame({"DAY_OF_MONTH": day,
+                              "DAY_OF_WEEK": (day + 1) % 7 + 1,
+                              "OP_UNIQUE_CARRIER": codes,
+                              "OP_CARRIER_AIRLINE_ID": np.array([id_ for _, id_ in
+                                                                 CARRIERS])[carrier],
+                              "OP_CARRIER": codes,
+                              "TAIL_NUM": self.__tails[rng.integers(0, NUM_TAILS, size)],
+                              "OP_CARRIER_FL_NUM": rng.integers(1, 7_000, size),
+                              "ORIGIN_AIRPORT_ID": self.__airport_ids[origin],
+                              "ORIGIN": self.__airports[origin],
+                              "DEST_AIRPORT_ID": self.__airport_ids[dest],
+                              "DEST": self.__airports[dest],
+                              "DEP_TIME": dep_time,
+                              "DEP_DEL15": dep_del15,
+                              "DEP_TIME_BLK": TIME_BLOCKS[hour],
+                              "ARR_TIME": arr_time,
+                              "ARR_DEL15": arr_del15,
+                              "CANCELLED": cancelled.astype(np.float64),
+                              "DIVERTED": diverted.astype(np.float64),
+                              "DISTANCE": distance,
+                              "Unnamed: 21": np.nan})
+        chunk["DEP_DELAY"] = dep_delay
+        chunk["ARR_DELAY"] = np.where(diverted, np.nan, arr_delay)
+        return chunk
+
+    def delay_chunk(self, flights: pd.DataFrame, overlap: float) -> pd.DataFrame:
+        """
+        Return the rows of Airline_dataset.csv of a chunk of flights. Only a fraction
+        overlap of the flights flown are found in it and as many rows again are
+        flights missing from the on-time dataset, like the real datasets.
+        """
+        rng = self.__rng
+        flown = flights[flights["CANCELLED"] == 0]
+        kept = flown[rng.random(len(flown)) < overlap]
+        extra = flown.sample(n=int(len(flown) * (1 - overlap)), random_state=rng,
+                             replace=True).copy()
+        # Shifted departure so the extra rows do not match any flight of the on-time data
+        extra["DEP_TIME"] = add_minutes(extra["DEP_TIME"].to_numpy(np.int64), 1)
+        rows = pd.concat([kept, extra]).sample(frac=1, random_state=rng)
+        return pd.DataFrame({"FL_DATE": "1/" + rows["DAY_OF_MONTH"].astype(str) + "/20",
+                             "AIRLINE_ID": rows["OP_CARRIER_AIRLINE_ID"],
+                             "ORIGIN_AIRPORT": rows["ORIGIN"],
+                             "DEST_AIRPORT": rows["DEST"],
+                             "DEP_TIME": rows["DEP_TIME"],
+                             "DEP_DELAY": rows["DEP_DELAY"],
+                             "ARR_TIME": rows["ARR_TIME"],
+                             "ARR_DELAY": rows["ARR_DELAY"],
+                             "Unnamed: 8": np.nan})
+
+    def write(self, folder: str, scale: float = 1, overlap: float = 0.97,
+              chunksize: int = CHUNK_SIZE) -> int:
+        """
+        Write Jan_2020_ontime.csv and Airline_dataset.csv into folder, chunk by chunk so
+        the largest scales fit in memory
+        : param scale : number of flights as a multiple of the real dataset, 1 to 50
+        : param overlap : fraction of the flights flown found in the delay dataset
+        : return : the number of flights written
+        """
+        if not 0 < scale <= MAX_SCALE:
+            raise ValueError(f"scale must be above 0 and at most {MAX_SCALE}")
+        os.makedirs(folder, exist_ok=True)
+        total = int(BASE_FLIGHTS * scale)
+        ontime_path = os.path.join(folder, "Jan_2020_ontime.csv")
+        delay_path = os.path.join(folder, "Airline_dataset.csv")
+        for start in range(0, total, chunksize):
+            flights = self.ontime_chunk(min(chunksize, total - start))
+            header = start == 0
+            flights[ONTIME_COLUMNS].to_csv(ontime_path, mode="w" if header else "a",
+                                           header=header, index=False)
+            self.delay_chunk(flights, overlap).to_csv(delay_path, mode="w" if header else "a",
+                                                      header=header, index=False)
+        return total
+
+def main():
+    """
+    Parse the command line arguments and write the datasets
+    """
+    parser = argparse.ArgumentParser(description="Write synthetic on-time and delay "
+                                                 "datasets shaped like the real ones.")
+    parser.add_argument("-o", "--output", default="datasets", help="output folder")
+    parser.add_argument("-s", "--scale", type=float, default=1,
+                        help=f"number of flights as a multiple of the real dataset "
+                             f"({BASE_FLIGHTS} flights), up to {MAX_SCALE}")
+    parser.add_argument("--overlap", type=float, default=0.97,
+                        help="fraction of the flights found in the delay dataset")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the random generator")
+    args = parser.parse_args()
+    total = SyntheticFlights(args.seed).write(args.output, args.scale, args.overlap)
+    print(f"{total} flights written into {args.output}")
+
+if __name__ == "__main__":
+    main()
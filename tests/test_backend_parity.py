@@ -0,0 +1,100 @@
+"""Tests that the in-memory and SQLite backends give the same results"""
+import os
+import pandas as pd
+import pytest
+from model import FlightDataModel
+from leaderboard import Leaderboard
+from synthetic import SyntheticFlights
+
+EVERYTHING = [True] * 5
+# (weeks, time blocks, date range, days of the week, departure hours)
+FILTERS = [(EVERYTHING, EVERYTHING, None, None, None),
+           ([True, False, True, True, True], [True, True, False, True, True], None, None,
+            None),
+           (EVERYTHING, [False, True, True, False, False], ("2020-01-25", "2020-01-10"),
+            None, None),
+           (EVERYTHING, EVERYTHING, None, [True, True, False, True, True, False, True],
+            [22, 23, 0, 1, 2, 3, 4, 5, 6]),
+           ([False, True, True, True, False], EVERYTHING, ("2020-01-05", "2020-01-28"),
+            [False] * 5 + [True] * 2, list(range(6, 14)))]
+GRANULARITIES = ["Weekly", "Daily", "Weekday", "Hourly"]
+
+@pytest.fixture(scope="module")
+def models(tmp_path_factory):
+    """
+    Return the in-memory and SQLite models of a small synthetic dataset
+    """
+    folder = tmp_path_factory.mktemp("parity")
+    SyntheticFlights(seed=1).write(str(folder / "datasets"), scale=0.02)
+    cwd = os.getcwd()
+    os.chdir(folder)
+    try:
+        yield FlightDataModel("memory"), FlightDataModel("sqlite")
+    finally:
+        os.chdir(cwd)
+
+def search_filters(memory: FlightDataModel):
+    """
+    Return the busiest, a middle and a missing filter of every search state
+    """
+    filters = []
+    for index, state in enumerate(memory.states):
+        flights = state.group_totals(EVERYTHING, EVERYTHING)["FLIGHTS"]
+        keys = flights.sort_values(ascending=False, kind="stable").index
+        for key in (keys[0], keys[len(keys) // 2]):
+            filters.append((index, [str(part) for part in key] if isinstance(key, tuple)
+                            else [str(key)]))
+    filters.append((1, ["ZZZ"]))
+    return filters
+
+def assert_same(expected, result):
+    """
+    Assert two chart data are equal, up to the rounding of the sums of each backend
+    """
+    if isinstance(expected, pd.Series):
+        pd.testing.assert_series_equal(result, expected, check_dtype=False)
+    else:
+        pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+
+@pytest.mark.parametrize("selection", FILTERS)
+def test_search_results_are_the_same(models, selection):
+    memory, sqlite = models
+    week, time_blk, date_range, weekdays, hours = selection
+    for index, filt in search_filters(memory):
+        args = (index, filt, week, time_blk, date_range, weekdays, hours)
+        for chart in FlightDataModel.CHARTS:
+            options = [{"granularity": granularity} for granularity in GRANULARITIES]
+            for option in options if chart == "avg_delay" else [{}]:
+                assert_same(memory.get_chart_data(index, chart, *args[1:], **option)[1],
+                            sqlite.get_chart_data(index, chart, *args[1:], **option)[1])
+        info, breakdown = memory.get_info_data(*args)
+        sqlite_info, sqlite_breakdown = sqlite.get_info_data(*args)
+        assert sqlite_info == info
+        pd.testing.assert_frame_equal(sqlite_breakdown.reset_index(drop=True),
+                                      breakdown.reset_index(drop=True), check_dtype=False)
+
+@pytest.mark.parametrize("selection", FILTERS[:3])
+def test_leaderboards_are_the_same(models, selection):
+    memory, sqlite = models
+    week, time_blk, date_range, _, _ = selection
+    for index in range(3):
+        for metric in Leaderboard.METRICS:
+            for expected, result in zip(
+                    memory.get_leaderboard(index, metric, 10, 5, week, time_blk, date_range),
+                    sqlite.get_leaderboard(index, metric, 10, 5, week, time_blk, date_range)):
+                pd.testing.assert_frame_equal(result, expected)
+
+def test_storytelling_data_is_the_same(models):
+    memory, sqlite = models
+    expected, result = (memory.get_data_story_telling_data(),
+                        sqlite.get_data_story_telling_data())
+    assert result[0] == expected[0]
+    for expected_data, data in zip(expected[1:], result[1:]):
+        assert_same(expected_data, data)
+
+def test_airline_overview_is_the_same(models):
+    memory, sqlite = models
+    expected = memory.get_airline_weekly(EVERYTHING, [True, False, True, True, True])
+    result = sqlite.get_airline_weekly(EVERYTHING, [True, False, True, True, True])
+    for metric, data in expected.items():
+        pd.testing.assert_frame_equal(result[metric], data)
@@ -0,0 +1,33 @@
+"""Tests of the bootstrap confidence intervals"""
+import numpy as np
+import pandas as pd
+from bootstrap import confidence_interval, grouped_confidence_intervals, resample_means
+
+def test_interval_covers_the_mean():
+    rng = np.random.default_rng(0)
+    # Whole minutes like the delays, resampled with the multinomial draws
+    delays = rng.normal(10, 30, 5000).round()
+    low, high = confidence_interval(delays)
+    assert low < delays.mean() < high
+    assert high - low < 4 * 1.96 * delays.std() / np.sqrt(len(delays))
+    # Distinct values, resampled by index
+    values = rng.exponential(20, 300)
+    low, high = confidence_interval(values)
+    assert low < values.mean() < high
+
+def test_missing_values_are_ignored():
+    assert np.isnan(confidence_interval(np.array([np.nan, np.nan]))).all()
+    assert confidence_interval(np.array([5.0, np.nan, 5.0])) == (5.0, 5.0)
+    assert len(resample_means(np.arange(10.0), resamples=37)) == 37
+
+def test_grouped_intervals_cover_the_mean_of_each_group():
+    rng = np.random.default_rng(1)
+    groups = pd.Series(np.repeat([3, 1, 2], 400), name="WEEK")
+    data = pd.DataFrame({"DEP_DELAY": rng.normal(groups * 10, 15).round(),
+                         "ARR_DELAY": rng.normal(5, 15, len(groups))})
+    intervals = grouped_confidence_intervals(data, groups)
+    means = data.groupby(groups).mean()
+    assert list(intervals.index) == [1, 2, 3] and intervals.index.name == "WEEK"
+    for column in data.columns:
+        assert (intervals[f"{column}_LOW"] < means[column]).all()
+        assert (means[column] < intervals[f"{column}_HIGH"]).all()
@@ -0,0 +1,60 @@
+"""Tests of the detection of disrupted airport days"""
+import numpy as np
+import pandas as pd
+import pytest
+from disruptions import DisruptionDetector, disruption_str
+
+DATES = pd.date_range("2020-01-01", "2020-01-31")
+
+def airport_flights(origin: str, per_day: int, rng, delays: dict = None,
+                    cancel_rates: dict = None) -> pd.DataFrame:
+    """
+    Return the flights of an airport on every day of DATES with ordinary delays and
+    cancellations, except on the days given
+    : param delays : day of the month: average departure delay of that day
+    : param cancel_rates : day of the month: share of the flights canceled that day
+    """
+    days = []
+    for date in DATES:
+        delay = (delays or {}).get(date.day, 8)
+        canceled = rng.random(per_day) < (cancel_rates or {}).get(date.day, 0.02)
+        dep_delay = np.round(rng.normal(delay, 10, per_day))
+        days.append(pd.DataFrame({"ORIGIN": origin, "FL_DATE": date,
+                                  "STATUS": np.where(canceled, "Canceled", "On-time"),
+                                  "DEP_DELAY": np.where(canceled, np.nan, dep_delay)}))
+    return pd.concat(days, ignore_index=True)
+
+@pytest.fixture(name="detector")
+def fixture_detector():
+    """
+    Return a detector of three airports added in chunks: a long delay day at ATL on
+    January 10, a day of cancellations at ORD on January 20 and none at DEN
+    """
+    rng = np.random.default_rng(7)
+    flights = pd.concat([airport_flights("ATL", 60, rng, delays={10: 90}),
+                         airport_flights("ORD", 40, rng, cancel_rates={20: 0.6}),
+                         airport_flights("DEN", 50, rng)], ignore_index=True)
+    flights = flights.sample(frac=1, random_state=0)
+    detector = DisruptionDetector()
+    for start in range(0, len(flights), 1000):
+        detector.update(flights.iloc[start:start + 1000])
+    return detector
+
+def test_planted_outlier_days_are_flagged(detector):
+    disruptions = detector.detect()
+    flagged = list(zip(disruptions["ORIGIN"], disruptions["FL_DATE"].dt.day,
+                       disruptions["CAUSE"]))
+    assert flagged == [("ATL", 10, "Delays"), ("ORD", 20, "Cancellations")]
+    assert disruptions["SCORE"].is_monotonic_decreasing
+
+def test_days_with_few_flights_are_left_out(detector):
+    assert detector.detect(min_flights=100).empty
+
+def test_matrices_total_every_flight(detector):
+    airports, dates, totals = detector.matrices()
+    assert set(airports) == {"ATL", "ORD", "DEN"}
+    assert dates.equals(pd.DatetimeIndex(DATES, name="FL_DATE"))
+    assert totals["FLIGHTS"].sum() == (60 + 40 + 50) * len(DATES)
+
+def test_sentences_of_no_disruption():
+    assert disruption_str(pd.DataFrame()).startswith("No airport")
@@ -0,0 +1,42 @@
+"""Tests of the downsampled lines of the average delay graph"""
+import matplotlib
+matplotlib.use("Agg")
+import numpy as np
+import pandas as pd
+import pytest
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+import charts
+from downsample import DownsampledLine
+
+def draw(figure: Figure):
+    """
+    Draw a figure on an Agg canvas
+    """
+    FigureCanvasAgg(figure).draw()
+
+def test_empty_series_draws_an_empty_line():
+    figure = Figure()
+    ax = figure.subplots()
+    line = DownsampledLine(ax, np.array([], dtype="datetime64[ns]"), [], [], [])
+    ax.set_xlim(0, 1)
+    draw(figure)
+    assert line.shown == 0
+    assert len(line.line.get_xdata()) == 0
+
+def test_long_series_is_reduced_to_the_pixel_columns():
+    figure = Figure(figsize=(4, 3), dpi=50)
+    ax = figure.subplots()
+    x = np.arange(100_000, dtype=np.float64)
+    line = DownsampledLine(ax, x, np.sin(x))
+    assert line.shown <= 4 * line.buckets()
+
+@pytest.mark.parametrize("index_name", ["WEEK", "FL_DATE", "DAY_OF_WEEK", "DEP_HOUR"])
+def test_average_delay_chart_of_a_filter_without_flights(index_name):
+    index = (pd.DatetimeIndex([], name=index_name) if index_name == "FL_DATE"
+             else pd.Index([], dtype=np.int64, name=index_name))
+    columns = [f"{column}{suffix}" for column in ("DEP_DELAY", "ARR_DELAY")
+               for suffix in ("", "_LOW", "_HIGH")]
+    figure = Figure()
+    charts.plot_avg_delay(figure, pd.DataFrame(columns=columns, index=index, dtype=float))
+    draw(figure)
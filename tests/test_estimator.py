@@ -0,0 +1,57 @@
+"""Tests of the backoff and the day of the week of the delay estimator"""
+import numpy as np
+import pandas as pd
+import pytest
+from estimator import DelayEstimator
+
+TIME_BLOCKS = ["Early Morning", "Morning", "Afternoon", "Evening", "Night"]
+
+@pytest.fixture(name="estimator")
+def fixture_estimator() -> DelayEstimator:
+    """
+    Return an estimator of 40 morning flights of airline 1 from AAA to BBB, delayed by
+    30 minutes on Mondays and 10 minutes otherwise, and 40 on time flights from AAA to
+    CCC
+    """
+    weekdays = np.tile(np.arange(1, 8), 12)[:80]
+    return DelayEstimator.build(pd.DataFrame({
+        "ORIGIN": ["AAA"] * 80,
+        "DEST": ["BBB"] * 40 + ["CCC"] * 40,
+        "OP_CARRIER_AIRLINE_ID": [1.0] * 40 + [2.0] * 40,
+        "DEP_TIME_BLK": ["Morning"] * 80,
+        "DEP_DELAY": np.where(weekdays == 1, 30.0, 10.0) * ([1] * 40 + [0] * 40),
+        "ARR_DELAY": [5.0] * 40 + [0.0] * 40,
+        "DAY_OF_WEEK": weekdays,
+        "CANCELLED": [0.0] * 80}), TIME_BLOCKS)
+
+def test_estimates_back_off_to_the_groups_with_data(estimator):
+    levels = {(origin, dest, airline, dep_time): estimator.estimate(
+        origin, dest, airline, 2, dep_time)["LEVEL"]
+              for origin, dest, airline, dep_time in [("AAA", "BBB", 1, 900),
+                                                      ("AAA", "BBB", 1, 1500),
+                                                      ("AAA", "BBB", 2, 900),
+                                                      ("AAA", "DDD", 1, 900),
+                                                      ("ZZZ", "BBB", 1, 900)]}
+    assert list(levels.values()) == ["Route, airline and time block", "Route", "Route",
+                                     "Origin airport", "All flights"]
+
+def test_most_specific_estimate_is_shrunk_toward_the_route():
+    estimate = DelayEstimator.build(pd.DataFrame({
+        "ORIGIN": ["AAA"] * 20, "DEST": ["BBB"] * 20,
+        "OP_CARRIER_AIRLINE_ID": [1.0] * 10 + [2.0] * 10,
+        "DEP_TIME_BLK": ["Morning"] * 20, "DEP_DELAY": [20.0] * 10 + [0.0] * 10,
+        "ARR_DELAY": [0.0] * 20, "DAY_OF_WEEK": [2] * 20, "CANCELLED": [0.0] * 20}),
+        TIME_BLOCKS).estimate("AAA", "BBB", 1, 2, 900)
+    assert 10 < estimate["DEP_DELAY"] < 20
+    assert estimate["FLIGHTS"] == 10
+
+def test_monday_delays_are_above_other_days(estimator):
+    monday = estimator.estimate("AAA", "BBB", 1, 1, 900)
+    tuesday = estimator.estimate("AAA", "BBB", 1, 2, 900)
+    assert monday["DEP_DELAY"] > tuesday["DEP_DELAY"]
+    assert monday["TIME_BLOCK"] == "Morning"
+
+@pytest.mark.parametrize("weekday", [0, 8, -1])
+def test_weekdays_outside_the_week_are_rejected(estimator, weekday):
+    with pytest.raises(ValueError, match="weekday"):
+        estimator.estimate("AAA", "BBB", 1, weekday, 900)
@@ -0,0 +1,70 @@
+"""Tests of the streaming export of filtered flights"""
+import numpy as np
+import pandas as pd
+import pytest
+from export import ExportJob
+
+@pytest.fixture(name="flights")
+def fixture_flights():
+    """
+    Return a few flights with a date, text, whole number and missing delay columns
+    """
+    return pd.DataFrame({"FL_DATE": pd.to_datetime(["2020-01-01", "2020-01-02", "2020-01-02",
+                                                    "2020-01-31", "2020-01-31"]),
+                         "ORIGIN": ["ATL", "ORD", "ATL", "DEN", "SEA"],
+                         "FLIGHTS": np.array([1, 1, 1, 1, 1], dtype=np.int64),
+                         "DEP_DELAY": [3.0, np.nan, -2.0, 45.0, 0.0]})
+
+def chunks(flights: pd.DataFrame, size: int = 2):
+    """
+    Yield the flights in chunks with the fraction of the flights read
+    """
+    for start in range(0, len(flights), size):
+        yield flights.iloc[start:start + size], min(start + size, len(flights)) / len(flights)
+
+def export(flights: pd.DataFrame, path: str, file_format: str) -> ExportJob:
+    """
+    Return the job of an export run to its end
+    """
+    job = ExportJob(chunks(flights), path, file_format)
+    job.start()
+    job.join()
+    return job
+
+def test_csv_round_trip(flights, tmp_path):
+    path = tmp_path / "flights.csv"
+    job = export(flights, str(path), "CSV")
+    assert job.error is None
+    assert (job.rows, job.progress) == (len(flights), 1.0)
+    result = pd.read_csv(path, parse_dates=["FL_DATE"])
+    pd.testing.assert_frame_equal(result, flights, check_dtype=False)
+
+def test_json_lines_round_trip(flights, tmp_path):
+    path = tmp_path / "flights.jsonl"
+    job = export(flights, str(path), "JSON lines")
+    assert job.error is None
+    assert len(path.read_text(encoding="utf-8").splitlines()) == len(flights)
+    result = pd.read_json(path, lines=True, convert_dates=["FL_DATE"])
+    result["FL_DATE"] = result["FL_DATE"].dt.tz_localize(None)
+    pd.testing.assert_frame_equal(result, flights, check_dtype=False)
+
+def test_canceled_export_removes_the_file(flights, tmp_path):
+    path = tmp_path / "flights.csv"
+    job = ExportJob(chunks(flights), str(path), "CSV")
+    job.cancel()
+    job.start()
+    job.join()
+    assert job.canceled
+    assert job.rows == 0
+    assert not path.exists()
+
+def test_failed_export_removes_the_file(flights, tmp_path):
+    def failing():
+        yield flights.iloc[:2], 0.4
+        raise OSError("disk full")
+    path = tmp_path / "flights.jsonl"
+    job = ExportJob(failing(), str(path), "JSON lines")
+    job.start()
+    job.join()
+    assert job.error == "OSError: disk full"
+    assert not path.exists()
@@ -0,0 +1,44 @@
+"""Tests of the calendar of the weeks of the month and the time block codes"""
+import warnings
+import numpy as np
+import pandas as pd
+from indexing import build_calendar, select_days, time_block_codes
+
+def calendar(start: str, end: str) -> pd.DataFrame:
+    """
+    Return the calendar of every date from start to end inclusive
+    """
+    dates = pd.date_range(start, end, freq="D", name="FL_DATE")
+    flights = pd.DataFrame({"FL_DATE": dates, "WEEK": dates.isocalendar().week.to_numpy()})
+    return build_calendar(flights)
+
+def test_every_week_selects_every_day_across_a_year_boundary():
+    days = calendar("2020-12-01", "2021-01-31")
+    assert len(select_days(days, [True] * 5)) == 62
+    # Friday 1 to Sunday 3 January 2021 are in ISO week 53 of 2020
+    assert (days.loc["2021-01-01":"2021-01-03", "MONTH_WEEK"] == 1).all()
+    assert days.loc["2021-01-04", "MONTH_WEEK"] == 2
+
+def test_sixth_week_of_a_month_is_in_the_last_week():
+    # August 2021 starts on a Sunday and ends on a Tuesday, six weeks from Monday
+    days = calendar("2021-08-01", "2021-08-31")
+    assert len(select_days(days, [True] * 5)) == 31
+    assert days.loc["2021-08-01", "MONTH_WEEK"] == 1
+    assert days.loc["2021-08-02", "MONTH_WEEK"] == 2
+    assert (days.loc["2021-08-23":"2021-08-31", "MONTH_WEEK"] == 5).all()
+
+def test_weeks_of_january_2020():
+    days = calendar("2020-01-01", "2020-01-31")
+    counts = days["MONTH_WEEK"].value_counts().sort_index()
+    assert counts.tolist() == [5, 7, 7, 7, 5]
+    assert (days["MONTH_WEEK"] == days["WEEK"]).all()
+
+def test_flights_without_a_departure_hour_have_no_time_block():
+    flights = pd.DataFrame({"DEP_HOUR": np.array([-1, 0, 5, 23], dtype=np.int8),
+                            "DEP_TIME_BLK": ["Night", None, "Morning", None]})
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        hours = time_block_codes(flights, list(range(24)), "DEP_HOUR")
+        blocks = time_block_codes(flights, ["Morning", "Night"])
+    assert hours.tolist() == [-1, 0, 5, 23]
+    assert blocks.tolist() == [1, -1, 0, -1]
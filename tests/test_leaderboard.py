@@ -0,0 +1,34 @@
+"""Tests of the ranking of the leaderboard"""
+import numpy as np
+import pandas as pd
+from leaderboard import Leaderboard
+
+def test_ties_are_ordered_by_key_whatever_the_group_order():
+    values = pd.Series([0.0, 0.5, 0.0, 0.0, 0.2, 0.0], index=["F", "A", "B", "E", "C", "D"])
+    for order in (np.arange(6), np.arange(6)[::-1], np.array([3, 0, 5, 1, 4, 2])):
+        shuffled = values.iloc[order]
+        assert list(Leaderboard.top_k(shuffled, 3, largest=False).index) == ["B", "D", "E"]
+        assert list(Leaderboard.top_k(shuffled, 4, largest=True).index) == ["A", "C", "B", "D"]
+
+def test_route_keys_break_ties():
+    index = pd.MultiIndex.from_tuples([("B", "A"), ("A", "C"), ("A", "B")])
+    values = pd.Series([1.0, 1.0, 1.0], index=index)
+    assert list(Leaderboard.top_k(values, 2).index) == [("A", "B"), ("A", "C")]
+
+def test_k_larger_than_the_groups_and_zero():
+    values = pd.Series([3.0, 1.0, 2.0], index=[30, 10, 20])
+    assert list(Leaderboard.top_k(values, 10).index) == [30, 20, 10]
+    assert Leaderboard.top_k(values, 0).empty
+
+def test_rank_uses_the_same_order_as_a_full_sort():
+    rng = np.random.default_rng(0)
+    totals = pd.DataFrame({"FLIGHTS": rng.integers(1, 50, 500).astype(float)},
+                          index=pd.Index(np.arange(500), name="KEY"))
+    totals["Canceled"] = np.minimum(rng.integers(0, 3, 500), totals["FLIGHTS"])
+    worst, best = Leaderboard(totals).rank("Cancellation Rate", 20)
+    rate = totals["Canceled"] / totals["FLIGHTS"]
+    expected = rate.to_frame("rate").reset_index().sort_values(["rate", "KEY"],
+                                                                ascending=[False, True])
+    assert list(worst.index) == list(expected["KEY"][:20])
+    expected = expected.sort_values(["rate", "KEY"])
+    assert list(best.index) == list(expected["KEY"][:20])
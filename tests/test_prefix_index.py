@@ -0,0 +1,31 @@
+"""Tests of the prefix index of the autocomplete and the identifier search"""
+import numpy as np
+import pandas as pd
+from prefix_index import PrefixIndex, IdentifierLookup
+
+def test_matches_are_ranked_by_weight():
+    index = PrefixIndex(["ATL", "AUS", "abq", "ORD", "ANC"], [10, 50, 30, 90, 30])
+    assert index.matches("a") == ["AUS", "abq", "ANC", "ATL"]
+    assert index.matches("AT") == ["ATL"]
+    assert index.matches("X") == []
+
+def test_matches_without_weights_keep_the_order_of_the_keys():
+    index = PrefixIndex(["SFO", "SEA", "SAN", "LAX"])
+    assert index.matches("s") == ["SFO", "SEA", "SAN"]
+
+def test_limit_keeps_the_highest_weights():
+    rng = np.random.default_rng(0)
+    keys = [f"N{number:04d}" for number in range(1000)]
+    weights = rng.integers(0, 20, size=len(keys))
+    index = PrefixIndex(keys, weights)
+    expected = [keys[i] for i in np.lexsort((np.arange(len(keys)), -weights))]
+    for limit in (0, 1, 7, 999, 1000, 5000):
+        assert index.matches("n", limit) == expected[:limit]
+    assert index.matches("N01", 3) == [key for key in expected if key.startswith("N01")][:3]
+
+def test_identifiers_are_ranked_by_number_of_flights():
+    lookup = IdentifierLookup(pd.Series(["N102", "N101", "N102", None, "N2", "N102", "N101"]))
+    assert lookup.matches("N1") == [("N102", 3), ("N101", 2)]
+    assert lookup.matches("n", 1) == [("N102", 3)]
+    assert lookup.rows("N101").tolist() == [1, 6]
+    assert len(lookup.rows("N999")) == 0
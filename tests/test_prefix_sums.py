@@ -0,0 +1,52 @@
+"""Tests of the totals of the daily prefix sums against a scan of the flights"""
+import numpy as np
+import pandas as pd
+import pytest
+from prefix_sums import DailyPrefixSums
+
+HOURS = list(range(24))
+
+@pytest.fixture(name="flights")
+def fixture_flights() -> pd.DataFrame:
+    """
+    Return random flights of five airports over three weeks, some without a departure
+    hour
+    """
+    rng = np.random.default_rng(0)
+    size = 3000
+    hours = rng.integers(-1, 24, size)
+    return pd.DataFrame({
+        "ORIGIN": rng.choice(["AAA", "BBB", "CCC", "DDD", "EEE"], size),
+        "FL_DATE": pd.Timestamp("2020-01-01") + pd.to_timedelta(rng.integers(0, 21, size),
+                                                               unit="D"),
+        "DEP_HOUR": hours,
+        "DEP_DELAY": np.where(hours < 0, np.nan, rng.normal(10, 20, size).round()),
+        "ARR_DELAY": rng.normal(5, 20, size).round(),
+        "STATUS": np.where(hours < 0, "Canceled", rng.choice(["On-time", "Delayed"], size))})
+
+def scanned(flights: pd.DataFrame, days, hours: list) -> pd.DataFrame:
+    """
+    Return the flight count and delay sums of every airport by scanning the flights
+    """
+    selected = flights[flights["FL_DATE"].isin(days)
+                       & flights["DEP_HOUR"].isin([-1 if hour is None else hour
+                                                   for hour in hours])]
+    grouped = selected.groupby("ORIGIN")
+    return pd.DataFrame({"FLIGHTS": grouped.size().astype(np.float64),
+                         "DEP_DELAY_SUM": grouped["DEP_DELAY"].sum(),
+                         "ARR_DELAY_COUNT": grouped["ARR_DELAY"].count().astype(np.float64)})
+
+@pytest.mark.parametrize("hours", [HOURS + [None], HOURS, list(range(6, 20)), [23, 0, 1],
+                                   []])
+def test_group_totals_match_a_scan(flights, hours):
+    prefix_sums = DailyPrefixSums(flights, ["ORIGIN"], HOURS, "DEP_HOUR")
+    dates = pd.date_range("2020-01-01", "2020-01-21")
+    for days in (dates, dates[3:10], dates[dates.dayofweek >= 5]):
+        totals = prefix_sums.group_totals(days, hours)
+        expected = scanned(flights, days, hours)
+        result = totals.loc[totals["FLIGHTS"] > 0, expected.columns].sort_index()
+        pd.testing.assert_frame_equal(result, expected, check_names=False)
+        for airport in expected.index:
+            pd.testing.assert_series_equal(
+                prefix_sums.totals(airport, days, hours)[expected.columns],
+                expected.loc[airport], check_names=False)
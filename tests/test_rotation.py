@@ -0,0 +1,55 @@
+"""Tests of the split of departure delays into propagated and originated"""
+import sqlite3
+import numpy as np
+import pandas as pd
+from rotation import compute_rotation_delays, MIN_TURNAROUND
+from sqlite_backend import ROTATION_SQL
+
+def legs(rows):
+    """
+    Return flights of one aircraft from (date, origin, dest, dep_time, dep_delay,
+    arr_time, arr_delay) tuples
+    """
+    columns = ["FL_DATE", "ORIGIN", "DEST", "DEP_TIME", "DEP_DELAY", "ARR_TIME", "ARR_DELAY"]
+    flights = pd.DataFrame(rows, columns=columns)
+    flights["FL_DATE"] = pd.to_datetime(flights["FL_DATE"])
+    flights["TAIL_NUM"] = "N1"
+    return flights
+
+def sql_rotation(flights: pd.DataFrame) -> pd.DataFrame:
+    """
+    Return the rotation delays computed by ROTATION_SQL, indexed like the flights
+    """
+    connection = sqlite3.connect(":memory:")
+    joined = flights.assign(FL_DATE=flights["FL_DATE"].dt.strftime("%Y-%m-%d"))
+    joined.to_sql("joined", connection, index=False)
+    connection.execute("CREATE TABLE rotation (id INTEGER PRIMARY KEY, INBOUND_DELAY REAL, "
+                       "PROPAGATED_DELAY REAL, ORIGINATED_DELAY REAL)")
+    connection.execute(ROTATION_SQL, {"turnaround": MIN_TURNAROUND})
+    result = pd.read_sql_query("SELECT * FROM rotation ORDER BY id", connection)
+    connection.close()
+    return result.set_index(result["id"] - 1).drop(columns="id")
+
+def test_overnight_ground_time_is_slack():
+    flights = legs([("2020-01-01", "AAA", "BBB", 800, 0, 1000, 60),
+                    ("2020-01-02", "BBB", "CCC", 1100, 60, 1300, 60)])
+    for result in (compute_rotation_delays(flights), sql_rotation(flights)):
+        assert result.loc[1, "INBOUND_DELAY"] == 60
+        assert result.loc[1, "PROPAGATED_DELAY"] == 0
+        assert result.loc[1, "ORIGINATED_DELAY"] == 60
+
+def test_same_day_short_turnaround_propagates():
+    flights = legs([("2020-01-01", "AAA", "BBB", 800, 0, 1000, 60),
+                    ("2020-01-01", "BBB", "CCC", 1100, 60, 1300, 60)])
+    for result in (compute_rotation_delays(flights), sql_rotation(flights)):
+        # 60 minutes of ground time leave 30 minutes of slack over the turnaround
+        assert result.loc[1, "PROPAGATED_DELAY"] == 30
+        assert result.loc[1, "ORIGINATED_DELAY"] == 30
+
+def test_red_eye_arrival_after_midnight():
+    flights = legs([("2020-01-01", "AAA", "BBB", 2300, 0, 200, 120),
+                    ("2020-01-02", "BBB", "CCC", 430, 90, 700, 90)])
+    for result in (compute_rotation_delays(flights), sql_rotation(flights)):
+        # Scheduled in at 00:00 and out at 03:00, 150 minutes of slack
+        assert result.loc[1, "PROPAGATED_DELAY"] == 0
+        np.testing.assert_allclose(result["ORIGINATED_DELAY"], [0, 90])
@@ -0,0 +1,25 @@
+"""Tests of the query parameters of the HTTP query service"""
+import pytest
+from server import FlightQueryService, QueryError
+
+def query(**params) -> dict:
+    """
+    Return the parsed query string of an airport search with the given parameters
+    """
+    return {"by": ["airport"], "filter": ["ATL"]} | {key: [value]
+                                                     for key, value in params.items()}
+
+@pytest.mark.parametrize("weeks", ["0", "6", "1,2,9", "-1"])
+def test_weeks_outside_the_month_are_rejected(weeks):
+    with pytest.raises(QueryError, match="weeks"):
+        FlightQueryService(None).parse_filter(query(weeks=weeks))
+
+@pytest.mark.parametrize("weekdays", ["0", "8", "1,2,8"])
+def test_weekdays_outside_the_week_are_rejected(weekdays):
+    with pytest.raises(QueryError, match="weekdays"):
+        FlightQueryService(None).parse_filter(query(weekdays=weekdays))
+
+@pytest.mark.parametrize("hours", ["0-24", "-1-5"])
+def test_hours_outside_the_day_are_rejected(hours):
+    with pytest.raises(QueryError):
+        FlightQueryService(None).parse_filter(query(hours=hours))
@@ -0,0 +1,28 @@
+"""Tests of the WHERE conditions of the SQLite backend"""
+import sqlite3
+from contextlib import closing
+import pandas as pd
+from sqlite_backend import MAX_DATE_RUNS, date_runs, where_clause
+
+def test_consecutive_dates_are_merged_into_runs():
+    days = pd.to_datetime(["2020-01-03", "2020-01-01", "2020-01-02", "2020-01-05"])
+    assert date_runs(days) == [("2020-01-01", "2020-01-03"), ("2020-01-05", "2020-01-05")]
+    assert date_runs([]) == []
+
+def test_long_date_ranges_use_few_parameters():
+    dates = pd.date_range("2010-01-01", "2019-12-31", freq="D")
+    mondays = dates[dates.dayofweek == 0]
+    with closing(sqlite3.connect(":memory:")) as connection:
+        connection.execute("CREATE TABLE flights (ORIGIN TEXT, FL_DATE TEXT, DEP_HOUR INTEGER)")
+        connection.executemany("INSERT INTO flights VALUES ('AAA', ?, ?)",
+                               [(date, hour) for date in dates.strftime("%Y-%m-%d")
+                                for hour in (None, 8)])
+        for days, hours, expected in [(dates, None, 2 * len(dates)),
+                                      (dates, [8], len(dates)),
+                                      (mondays, [8, None], 2 * len(mondays)),
+                                      (dates[:0], None, 0)]:
+            where, params = where_clause(["ORIGIN"], "AAA", days, hours)
+            assert len(params) <= 2 * MAX_DATE_RUNS + 2
+            count = connection.execute(f"SELECT COUNT(*) FROM flights WHERE {where}",
+                                       params).fetchone()[0]
+            assert count == expected
@@ -0,0 +1,42 @@
+"""Tests of the streaming delay statistics of the Overall Delay Statistics page"""
+import numpy as np
+import pandas as pd
+import pytest
+from storytelling import StreamingDelayStats
+
+@pytest.fixture(name="delays")
+def fixture_delays():
+    """
+    Return whole minute delays, mostly small with a long tail and some missing
+    """
+    rng = np.random.default_rng(3)
+    delays = np.round(rng.exponential(20, size=10_000) - 10)
+    delays[rng.random(len(delays)) < 0.02] = np.nan
+    return pd.Series(delays)
+
+# (number of delays added, chunk size)
+@pytest.mark.parametrize("size, chunk_size", [(10_000, 10_000), (10_000, 999), (300, 1)])
+def test_describe_is_the_same_as_pandas(delays, size, chunk_size):
+    added = delays.iloc[:size]
+    stats = StreamingDelayStats()
+    for start in range(0, size, chunk_size):
+        stats.update(added.iloc[start:start + chunk_size])
+    result = stats.describe()
+    expected = added.describe()
+    pd.testing.assert_series_equal(result[expected.index], expected, check_dtype=False)
+    assert result["median"] == added.median()
+    assert result["mode"] == added.mode()[0]
+
+def test_histogram_counts_every_delay(delays):
+    stats = StreamingDelayStats()
+    stats.update(delays.iloc[:5000])
+    stats.update(delays.iloc[5000:])
+    pd.testing.assert_series_equal(stats.histogram, delays.value_counts().sort_index(),
+                                   check_names=False, check_index_type=False)
+
+def test_no_delays():
+    stats = StreamingDelayStats()
+    stats.update([np.nan, np.nan])
+    result = stats.describe()
+    assert result["count"] == 0
+    assert result.drop("count").isna().all()
@@ -0,0 +1,99 @@
+"""Tests of the idle time warm-up of the popular searches"""
+import os
+import pytest
+from model import FlightDataModel
+from synthetic import SyntheticFlights
+from warmup import WarmupScheduler
+
+EVERYTHING = [True] * 5
+
+class FakeWidget:
+    """
+    Stands in for the Tk root, the callbacks are run by the test instead of the event loop
+    """
+    def __init__(self) -> None:
+        self.callbacks = []
+
+    def after(self, delay: int, callback):
+        """
+        Queue a callback, the delay is ignored
+        """
+        self.callbacks.append(callback)
+
+    def bind_all(self, sequence: str, handler, add: str = None):
+        """
+        Ignore the bindings, input is sent by calling handle_input
+        """
+
+@pytest.fixture(name="model", scope="module")
+def fixture_model(tmp_path_factory):
+    """
+    Return the in-memory model of a small synthetic dataset
+    """
+    folder = tmp_path_factory.mktemp("warmup")
+    SyntheticFlights(seed=1).write(str(folder / "datasets"), scale=0.02)
+    cwd = os.getcwd()
+    os.chdir(folder)
+    try:
+        yield FlightDataModel("memory")
+    finally:
+        os.chdir(cwd)
+
+def run(widget: FakeWidget, steps: int = None) -> int:
+    """
+    Run the queued callbacks of the widget, at most steps of them
+    : return : the number of callbacks run
+    """
+    count = 0
+    while widget.callbacks and (steps is None or count < steps):
+        widget.callbacks.pop(0)()
+        count += 1
+    return count
+
+def test_popular_searches_are_stored(model):
+    widget = FakeWidget()
+    scheduler = WarmupScheduler(widget, model, limit=2)
+    scheduler.IDLE_DELAY = 0
+    scheduler.start()
+    steps = run(widget)
+    assert not scheduler.running
+    assert scheduler.done == scheduler.total
+    # The bootstrap of the average delays is split over several steps
+    assert steps > scheduler.total
+    for index, filt in model.popular_filters(2):
+        for chart in model.CHARTS:
+            data, _ = model.get_chart_data(index, chart, filt, EVERYTHING, EVERYTHING,
+                                           **WarmupScheduler.OPTIONS.get(chart, {}))
+            assert data is None
+
+def test_queries_are_found_as_the_warmup_goes(model):
+    widget = FakeWidget()
+    scheduler = WarmupScheduler(widget, model, limit=50)
+    scheduler.IDLE_DELAY = 0
+    scheduler.start()
+    run(widget, steps=3)
+    assert scheduler.running
+    assert 0 < scheduler.total < 10
+
+def test_input_puts_the_warmup_off(model):
+    widget = FakeWidget()
+    scheduler = WarmupScheduler(widget, model, limit=1)
+    scheduler.IDLE_DELAY = 60_000
+    scheduler.start()
+    scheduler.handle_input()
+    run(widget, steps=1)
+    assert scheduler.total == 0
+    assert len(widget.callbacks) == 1
+
+def test_steps_give_the_chart_data(model):
+    filt = next(filt for index, filt in model.popular_filters(1) if index == 1)
+    steps = model.iter_chart_data(1, "avg_delay", filt, EVERYTHING, [True, False] * 2 + [True],
+                                  granularity="Daily")
+    with pytest.raises(StopIteration) as stop:
+        while True:
+            next(steps)
+    _, series = stop.value.value
+    _, expected = model.states[1].avg_flight_delay(filt, EVERYTHING,
+                                                   [True, False] * 2 + [True],
+                                                   granularity="Daily")
+    assert series.equals(expected)
@@ -4,11 +4,23 @@ import tkinter as tk
 from model import Observer
 from search_tabs import FlightTab, AirportTab, AirlineTab
 from data_storytelling_tab import DataStoryTellingTab
+from heatmap_tab import HeatmapTab
+from leaderboard_tab import LeaderboardTab
+from disruptions_tab import DisruptionsTab
+from airline_overview_tab import AirlineOverviewTab
+from connections_tab import ConnectionsTab
+from comparison_tab import ComparisonTab
+from estimator_tab import EstimatorTab
+from identifier_tab import IdentifierTab
+from diagnostics_tab import DiagnosticsTab
+from instrumentation import instrumentation
 
 class UI(tk.Tk, Observer):
     """
     UI to show information about flights delay
     """
+    SEARCH_TABS = ["Search by Flight", "Search by Airport", "Search by Airline"]
+
     def __init__ (self, controller) -> None:
         super().__init__()
         self.title('Flight within USA displayer')
@@ -41,12 +53,23 @@ class UI(tk.Tk, Observer):
 
     def init_components(self):
         """
-        Create 5 tabs consist of
+        Create 14 tabs consist of
         -Search by Flight
         -Search by Airport
         -Search by Airline
+        -Search by Flight Number
+        -Compare
+        -Connections
+        -Delay Estimator
+        -Route Heatmap
+        -Leaderboard
+        -Disruptions
+        -Airline Overview
         -Overall Delay Statistics
+        -Diagnostics, hidden until Ctrl+Shift+D is pressed or recording is enabled
         -Exit
+        Search by Flight Number, Compare, Connections, Delay Estimator and Route Heatmap
+        are left out with the SQLite backend.
         """
         airport_codes = self.controller.get_airport()
         airline_codes = self.controller.get_airline()
@@ -60,14 +83,64 @@ class UI(tk.Tk, Observer):
         airline_tab = AirlineTab(self, self.controller, airline_codes)
         self.__notebook.add(airline_tab, text="Search by Airline")
         self.__tabs["Search by Airline"] = [airline_tab, False]
+        if self.controller.in_memory():
+            self.init_in_memory_tabs(airport_codes, airline_codes)
+        leaderboard_tab = LeaderboardTab(self, self.controller)
+        self.__notebook.add(leaderboard_tab, text="Leaderboard")
+        self.__tabs["Leaderboard"] = [leaderboard_tab, True]
+        disruptions_tab = DisruptionsTab(self, self.controller)
+        self.__notebook.add(disruptions_tab, text="Disruptions")
+        self.__tabs["Disruptions"] = [disruptions_tab, True]
+        airline_overview_tab = AirlineOverviewTab(self, self.controller)
+        self.__notebook.add(airline_overview_tab, text="Airline Overview")
+        self.__tabs["Airline Overview"] = [airline_overview_tab, True]
         data_story_telling_tab = DataStoryTellingTab(self, self.controller)
         self.__notebook.add(data_story_telling_tab, text="Overall Delay Statistics")
         self.__tabs["Overall Delay Statistics"] = [data_story_telling_tab, True]
+        diagnostics_tab = DiagnosticsTab(self)
+        self.__notebook.add(diagnostics_tab, text="Diagnostics")
+        self.__tabs["Diagnostics"] = [diagnostics_tab, True]
+        if not instrumentation.enabled:
+            self.__notebook.hide(diagnostics_tab)
+        self.bind_all("<Control-D>", self.toggle_diagnostics)
         self.__notebook.add(tk.Frame(self), text="Exit")
         self.__tabs["Exit"] = [0, True]
         self.__notebook.pack(expand=True, fill="both")
         self.__notebook.bind('<<NotebookTabChanged>>', self.on_tab_change)
 
+    def init_in_memory_tabs(self, airport_codes: dict, airline_codes: list):
+        """
+        Create the tabs before the leaderboard that need the whole dataframe loaded
+        """
+        identifier_tab = IdentifierTab(self, self.controller)
+        self.__notebook.add(identifier_tab, text="Search by Flight Number")
+        self.__tabs["Search by Flight Number"] = [identifier_tab, True]
+        comparison_tab = ComparisonTab(self, self.controller, sorted(airport_codes.keys()),
+                                       airline_codes)
+        self.__notebook.add(comparison_tab, text="Compare")
+        self.__tabs["Compare"] = [comparison_tab, True]
+        connections_tab = ConnectionsTab(self, self.controller, airport_codes)
+        self.__notebook.add(connections_tab, text="Connections")
+        self.__tabs["Connections"] = [connections_tab, True]
+        estimator_tab = EstimatorTab(self, self.controller, sorted(airport_codes.keys()),
+                                     airline_codes)
+        self.__notebook.add(estimator_tab, text="Delay Estimator")
+        self.__tabs["Delay Estimator"] = [estimator_tab, True]
+        heatmap_tab = HeatmapTab(self, self.controller)
+        self.__notebook.add(heatmap_tab, text="Route Heatmap")
+        self.__tabs["Route Heatmap"] = [heatmap_tab, True]
+
+    def toggle_diagnostics(self, event=None):
+        """
+        Show the hidden diagnostics tab, or hide it again
+        """
+        diagnostics_tab = self.__tabs["Diagnostics"][0]
+        if self.__notebook.tab(diagnostics_tab, "state") == "hidden":
+            self.__notebook.add(diagnostics_tab)
+            self.__notebook.select(diagnostics_tab)
+        else:
+            self.__notebook.hide(diagnostics_tab)
+
     def on_tab_change(self, event):
         """
         Event handler for notebook when current tab is changed
@@ -79,14 +152,31 @@ class UI(tk.Tk, Observer):
             self.controller.set_search_type(1)
         elif tab_text == "Search by Airline":
             self.controller.set_search_type(2)
-        elif tab_text == "Overall Delay Statistics":
+        elif tab_text in ("Search by Flight Number", "Compare", "Connections",
+                          "Delay Estimator", "Route Heatmap", "Leaderboard", "Disruptions",
+                          "Airline Overview", "Overall Delay Statistics", "Diagnostics"):
             return
         else:
             self.destroy()
         if not self.__tabs[tab_text][1]:
             self.__tabs[tab_text][1] = True
+            instrumentation.begin(f"Open {tab_text}")
             self.after(1,self.controller.avg_delay_flight)
 
+    def show_search_tab(self, tab_text: str, a_code: list[str], date_range=None,
+                        granularity: str = None, note: str = ""):
+        """
+        Select a search tab with a filter, e.g. drilling down from another tab
+        : param tab_text : one of SEARCH_TABS
+        : param note : a note about the filter shown in the tab
+        """
+        tab = self.__tabs[tab_text][0]
+        tab.show_filter(a_code, date_range, granularity, note)
+        # Marked as opened so selecting it does not plot the default filter first
+        self.__tabs[tab_text][1] = True
+        self.__notebook.select(tab)
+        self.controller.set_search_type(self.SEARCH_TABS.index(tab_text))
+
     def get_cur_tab(self):
         """
         Get the current tab.
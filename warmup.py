@@ -0,0 +1,128 @@
+"""Idle time precomputation of the searches of the most popular routes, airports and airlines"""
+import time
+from collections.abc import Generator, Iterator
+from instrumentation import instrumentation
+
+class WarmupScheduler:
+    """
+    Computes the information and the data of every chart of the routes, origin airports
+    and airlines with the most flights into the result store of the model while the UI
+    is idle, so their first search is as fast as a repeated one. The queries run one
+    at a time from the Tk event loop with the default selection of the search tabs, in
+    several short steps for those computed in steps, and a key press or click puts the
+    next step off until the UI is idle again.
+    """
+    # Milliseconds without any key press or click before warming up
+    IDLE_DELAY = 500
+    STEP_INTERVAL = 1
+    # Options of the charts as selected when a search tab is opened
+    OPTIONS = {"avg_delay": {"granularity": "Weekly"}}
+
+    def __init__(self, widget, model, limit: int = 50) -> None:
+        self.__widget = widget
+        self.__model = model
+        self.__limit = limit
+        self.__tasks = None
+        self.__steps = None
+        self.__done = 0
+        self.__total = 0
+        self.__last_input = 0.0
+        self.__running = False
+
+    @property
+    def done(self):
+        """
+        Getter for done attribute, the number of queries computed
+        """
+        return self.__done
+
+    @property
+    def total(self):
+        """
+        Getter for total attribute, the number of queries found so far, the popular
+        filters are found one at a time as the warm-up goes
+        """
+        return self.__total
+
+    @property
+    def running(self):
+        """
+        Getter for running attribute
+        """
+        return self.__running
+
+    def start(self):
+        """
+        Start warming up once the UI has been idle for IDLE_DELAY
+        """
+        for sequence in ("<KeyPress>", "<ButtonPress>", "<MouseWheel>"):
+            self.__widget.bind_all(sequence, self.handle_input, add="+")
+        self.__running = True
+        self.__last_input = time.monotonic()
+        self.__widget.after(self.IDLE_DELAY, self.step)
+
+    def stop(self):
+        """
+        Stop warming up, the results computed are kept
+        """
+        self.__running = False
+
+    def handle_input(self, event=None):
+        """
+        Event handler for any key press or click, put the warm-up off
+        """
+        self.__last_input = time.monotonic()
+
+    def queries(self) -> Iterator[tuple]:
+        """
+        Yield the queries of the popular filters one filter at a time: the group index of
+        a search state before its first filter, then the information and every chart of
+        each filter, as a method of the model with its arguments and options
+        """
+        everything = [True] * 5
+        indexed = set()
+        for index, filt in self.__model.popular_filters(self.__limit):
+            if index not in indexed:
+                indexed.add(index)
+                yield self.__model.states[index].build_group_index, (), {}
+            yield self.__model.get_info_data, (index, filt, everything, everything), {}
+            for chart in self.__model.CHARTS:
+                yield (self.__model.iter_chart_data, (index, chart, filt, everything, everything),
+                       self.OPTIONS.get(chart, {}))
+
+    @staticmethod
+    def query_steps(method, args: tuple, options: dict) -> Iterator:
+        """
+        Yield the steps of a query, a single one unless the method returns a generator
+        """
+        result = method(*args, **options)
+        if isinstance(result, Generator):
+            yield from result
+
+    def step(self):
+        """
+        Compute the next step of the current query, or start the next query, if the UI is
+        idle, otherwise wait until it is
+        """
+        if not self.__running:
+            return
+        idle = (time.monotonic() - self.__last_input) * 1000
+        if idle < self.IDLE_DELAY:
+            self.__widget.after(int(self.IDLE_DELAY - idle) + 1, self.step)
+            return
+        if self.__tasks is None:
+            self.__tasks = self.queries()
+        if self.__steps is None:
+            task = next(self.__tasks, None)
+            if task is None:
+                self.__running = False
+                return
+            self.__total += 1
+            self.__steps = self.query_steps(*task)
+        try:
+            with instrumentation.suspended():
+                next(self.__steps)
+        except StopIteration:
+            self.__steps = None
+            self.__done += 1
+        self.__widget.after(self.STEP_INTERVAL, self.step)